@@ -0,0 +1,221 @@
+"""
+Deterministic stand-ins for OpenAI and SERP API used by the offline benchmarks
+
+`FakeChatModel` answers each agent prompt with text of realistic length and
+shape (a headed blog with links, a hashtagged LinkedIn post, ...), derived from
+a CRC of the prompt so every run produces the same output. Latency is modelled
+as a fixed time-to-first-token plus completion tokens at a fixed rate.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.utils.prompt_budget import CHARS_PER_TOKEN
+
+VOCABULARY = (
+    "content strategy audience growth analytics marketing automation insight engagement workflow "
+    "platform data teams customers pipeline brand search ranking quality conversion experiment "
+    "innovation research trends adoption cloud security scale performance value results"
+).split()
+
+
+def _rng(*parts: str) -> random.Random:
+    return random.Random(zlib.crc32("\x1f".join(parts).encode()))
+
+
+def _sentence(rng: random.Random, keywords: List[str]) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(10, 20))]
+    if keywords and rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(keywords))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, keywords: List[str], sentences: int = 5) -> str:
+    return " ".join(_sentence(rng, keywords) for _ in range(sentences))
+
+
+def fake_blog(topic: str, words: int = 1500, keywords: Optional[List[str]] = None) -> str:
+    """Markdown blog with H1/H2/H3 headings, links and keyword mentions"""
+    rng = _rng("blog", topic)
+    keywords = keywords or topic.lower().split()[:3]
+    sections = [f"# {topic.title()}", _paragraph(rng, keywords)]
+    count = len(sections[1].split())
+    section = 1
+    while count < words:
+        heading = f"## Section {section}: {rng.choice(VOCABULARY).title()} {rng.choice(VOCABULARY)}"
+        body = [_paragraph(rng, keywords) for _ in range(2)]
+        if section % 2 == 0:
+            body.insert(1, f"### {rng.choice(VOCABULARY).title()} in practice")
+            body.append(f"Read more in [this guide](https://example.com/{section}).")
+        sections += [heading, *body]
+        count += sum(len(part.split()) for part in body)
+        section += 1
+    sections += ["## Conclusion", _paragraph(rng, keywords, 3)]
+    return "\n\n".join(sections)
+
+
+def fake_linkedin_post(topic: str) -> str:
+    rng = _rng("linkedin", topic)
+    lines = [f"🚀 {topic.title()} is changing how teams work.", _paragraph(rng, [], 3),
+             "✅ " + _sentence(rng, []), "✅ " + _sentence(rng, []), "💡 What is your take? Share below!",
+             "#ContentMarketing #Growth #" + "".join(w.title() for w in topic.split()[:2])]
+    return "\n\n".join(lines)
+
+
+def _answer(system: str, user: str) -> str:
+    """Response text for one agent prompt, keyed on its system message"""
+    if "query routing expert" in system:
+        return "blog"
+    if "SEO expert" in system:
+        return "content strategy, marketing automation, audience growth, search ranking, analytics"
+    if "hashtags" in system:
+        return "#ContentMarketing #Growth #Leadership #Innovation #B2B"
+    if "research planner" in system:
+        return "\n".join(f"{user} {suffix}" for suffix in ("statistics", "case studies", "trends 2024"))
+    if "DALL-E prompts" in system:
+        return f"A clean isometric illustration of {user[:80]}, soft lighting, vibrant palette"
+    if "expert researcher" in system:
+        rng = _rng("research", user)
+        return "\n\n".join(["## Key Findings", *(_paragraph(rng, []) for _ in range(4))])
+    if "LinkedIn" in system:
+        return fake_linkedin_post(user[:60])
+    if "blog" in system.lower():
+        return fake_blog(user[:60], words=1500)
+    return _paragraph(_rng("other", user), [])
+
+
+class FakeChatModel:
+    """ChatOpenAI stand-in with configurable time-to-first-token and tokens/second"""
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0, model: str = "fake-gpt",
+                 chunk_tokens: int = 8, **kwargs: Any):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.model_name = model
+        self.temperature = kwargs.get("temperature", 0.0)
+        self.chunk_tokens = chunk_tokens
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, messages: List[Any]) -> str:
+        with self._lock:
+            self.calls += 1
+        system = str(getattr(messages[0], "content", "")) if messages else ""
+        user = str(getattr(messages[-1], "content", "")) if len(messages) > 1 else ""
+        return _answer(system, user)
+
+    def _duration(self, text: str) -> float:
+        tokens = len(text) / CHARS_PER_TOKEN
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    @staticmethod
+    def _message(messages: List[Any], text: str) -> AIMessage:
+        prompt_tokens = sum(len(str(getattr(m, "content", m))) for m in messages) // CHARS_PER_TOKEN
+        completion_tokens = len(text) // CHARS_PER_TOKEN
+        return AIMessage(content=text, usage_metadata={
+            "input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+
+    def _chunks(self, text: str) -> List[str]:
+        size = self.chunk_tokens * CHARS_PER_TOKEN
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> AIMessage:
+        text = self._respond(messages)
+        time.sleep(self.latency + self._duration(text))
+        return self._message(messages, text)
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> AIMessage:
+        text = self._respond(messages)
+        await asyncio.sleep(self.latency + self._duration(text))
+        return self._message(messages, text)
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[AIMessageChunk]:
+        text = self._respond(messages)
+        time.sleep(self.latency)
+        for chunk in self._chunks(text):
+            time.sleep(self._duration(chunk))
+            yield AIMessageChunk(content=chunk)
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        text = self._respond(messages)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(text):
+            await asyncio.sleep(self._duration(chunk))
+            yield AIMessageChunk(content=chunk)
+
+
+class FakeImagesClient:
+    """OpenAI/AsyncOpenAI stand-in exposing images.generate"""
+
+    def __init__(self, latency: float = 0.0, use_async: bool = False):
+        self.latency = latency
+        self.images = SimpleNamespace(generate=self._agenerate if use_async else self._generate)
+
+    @staticmethod
+    def _response(prompt: str) -> SimpleNamespace:
+        image_id = zlib.crc32(prompt.encode())
+        return SimpleNamespace(data=[SimpleNamespace(url=f"https://images.example.com/{image_id}.png",
+                                                     revised_prompt=prompt)])
+
+    def _generate(self, prompt: str, **kwargs: Any) -> SimpleNamespace:
+        time.sleep(self.latency)
+        return self._response(prompt)
+
+    async def _agenerate(self, prompt: str, **kwargs: Any) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        return self._response(prompt)
+
+
+class SERPStub:
+    """Local SERP API answering every query with organic results after `latency` seconds.
+
+    Use as a context manager; `url` is the search endpoint.
+    """
+
+    def __init__(self, latency: float = 0.0, results: int = 10):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(stub.latency)
+                stub.requests += 1
+                body = json.dumps({"organic_results": [
+                    {"title": f"Result {i} for {self.path[:40]}", "link": f"https://example.com/{i}",
+                     "snippet": _sentence(_rng("serp", self.path, str(i)), [])}
+                    for i in range(stub.results)
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.latency = latency
+        self.results = results
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+    def __enter__(self) -> "SERPStub":
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
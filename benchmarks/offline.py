@@ -0,0 +1,251 @@
+"""
+Offline benchmark suite: the real workflow over a fake LLM and a local SERP stub
+
+No network or API key is needed and every run produces the same content, so the
+numbers only move when the code does. Workloads:
+
+- ``single``: sequential run() latency per content type
+- ``concurrent``: run_batch() on a thread pool and arun() under asyncio.gather
+- ``routing``: QueryHandlerAgent.route_query throughput, with and without the memo
+- ``scoring``: ContentOptimizer / QualityValidator throughput on generated content
+- ``bulk``: score_many() over a mixed archive against the per-document scorers
+
+Usage:
+    python benchmarks/offline.py [--llm-latency 0.02] [--tokens-per-second 2000]
+                                 [--concurrency 8] [--bulk-documents 2000] [--workers 4]
+                                 [--quick] [-o offline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fakes import FakeChatModel, FakeImagesClient, SERPStub, fake_blog, fake_linkedin_post  # noqa: E402
+from src.core.config import Config, RateLimitConfig  # noqa: E402
+from src.core.llm_registry import LLMRegistry  # noqa: E402
+from src.utils.bulk_scoring import score_many  # noqa: E402
+from src.utils.content_optimization import ContentOptimizer  # noqa: E402
+from src.utils.quality_validation import QualityValidator  # noqa: E402
+from src.utils.text_analysis import analyze  # noqa: E402
+from src.workflow.langgraph_workflow import ContentAlchemyWorkflow  # noqa: E402
+
+QUERIES = {
+    "blog": "Write a blog about {topic}",
+    "linkedin": "Create a LinkedIn post about {topic}",
+    "research": "Research the latest trends in {topic}",
+    "image": "Generate an image for {topic}",
+}
+TOPICS = ("edge computing", "remote team culture", "B2B content marketing", "AI in healthcare",
+          "sustainable supply chains", "developer productivity", "zero trust security", "fintech onboarding")
+ROUTING_QUERIES = [template.format(topic=topic) for topic in TOPICS for template in (
+    *QUERIES.values(), "Can you analyze {topic} for me", "I need an illustration of {topic}",
+    "Outline a guide on {topic}", "Tell me about {topic}",
+)]
+
+
+def build_workflow(args: argparse.Namespace, serp_url: str) -> ContentAlchemyWorkflow:
+    """Workflow with every external call replaced by a deterministic fake"""
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")  # the image agent checks it before calling
+    config = Config()
+    config.openai.api_key = "benchmark"
+    config.serp.api_key = "benchmark"
+    config.serp.base_url = serp_url
+    config.serp.cache_ttl = 0
+    config.cache.enabled = args.cache
+    config.cache.backend = "memory"
+    config.checkpoints.enabled = False
+    config.routing.cache_path = ""
+    config.rate_limits = RateLimitConfig()
+    config.monitoring.enabled = args.monitoring
+
+    workflow = ContentAlchemyWorkflow(config)
+    workflow.llm_registry = LLMRegistry(config, client_factory=lambda **kwargs: FakeChatModel(
+        latency=args.llm_latency, tokens_per_second=args.tokens_per_second, **kwargs))
+    workflow.image_generator.client = FakeImagesClient(args.image_latency)
+    workflow.image_generator.async_client = FakeImagesClient(args.image_latency, use_async=True)
+    return workflow
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_single(workflow: ContentAlchemyWorkflow, repeat: int) -> Dict[str, Any]:
+    results = {}
+    for agent_type, template in QUERIES.items():
+        queries = [template.format(topic=TOPICS[i % len(TOPICS)]) for i in range(repeat)]
+        workflow.run(queries[0])  # warm up graph and clients
+        results[agent_type] = latency_stats([timed(lambda q=q: workflow.run(q)) for q in queries])
+    return results
+
+
+def bench_concurrent(workflow: ContentAlchemyWorkflow, total: int, concurrency: int) -> Dict[str, Any]:
+    templates = list(QUERIES.values())
+    queries = [templates[i % len(templates)].format(topic=TOPICS[i % len(TOPICS)]) for i in range(total)]
+
+    elapsed = timed(lambda: workflow.run_batch(queries, max_concurrency=concurrency))
+
+    async def run_async() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(query: str) -> None:
+            async with semaphore:
+                await workflow.arun(query)
+        await asyncio.gather(*(one(q) for q in queries))
+
+    async_elapsed = timed(lambda: asyncio.run(run_async()))
+    return {
+        "runs": total,
+        "concurrency": concurrency,
+        "threads_runs_per_s": round(total / elapsed, 2),
+        "async_runs_per_s": round(total / async_elapsed, 2),
+    }
+
+
+def bench_routing(workflow: ContentAlchemyWorkflow, rounds: int) -> Dict[str, Any]:
+    handler = workflow.query_handler
+    queries = ROUTING_QUERIES * rounds
+    memo, handler.routing_cache = handler.routing_cache, None
+    uncached = timed(lambda: [handler.route_query(q) for q in queries])
+    handler.routing_cache = memo
+    cached = timed(lambda: [handler.route_query(q) for q in queries]) if memo is not None else None
+    return {
+        "queries": len(queries),
+        "engine_queries_per_s": round(len(queries) / uncached),
+        "memo_queries_per_s": round(len(queries) / cached) if cached else None,
+    }
+
+
+def bench_scoring(documents: int) -> Dict[str, Any]:
+    blogs = [fake_blog(TOPICS[i % len(TOPICS)] + f" part {i}", words=1500 + 100 * (i % 5)) for i in range(documents)]
+    posts = [fake_linkedin_post(TOPICS[i % len(TOPICS)] + f" {i}") for i in range(documents)]
+    keywords = ["content strategy", "marketing automation", "audience growth", "analytics", "search ranking"]
+    workloads = {
+        "optimize_for_seo": (blogs, lambda doc: ContentOptimizer.optimize_for_seo(doc, keywords)),
+        "validate_blog_quality": (blogs, QualityValidator.validate_blog_quality),
+        "extract_meta_description": (blogs, ContentOptimizer.extract_meta_description),
+        "optimize_for_linkedin": (posts, ContentOptimizer.optimize_for_linkedin),
+        "validate_linkedin_quality": (posts, QualityValidator.validate_linkedin_quality),
+        # What a finished blog costs: all three scorers sharing one analysis
+        "score_blog": (blogs, lambda doc: (ContentOptimizer.optimize_for_seo(doc, keywords),
+                                           QualityValidator.validate_blog_quality(doc),
+                                           ContentOptimizer.extract_meta_description(doc))),
+    }
+    results = {"documents": documents, "blog_words": round(statistics.fmean(len(b.split()) for b in blogs))}
+    for name, (docs, score) in workloads.items():
+        analyze.cache_clear()  # time cold scans, not memo hits from the previous workload
+        elapsed = timed(lambda: [score(doc) for doc in docs])
+        results[f"{name}_docs_per_s"] = round(len(docs) / elapsed)
+    return results
+
+
+def bench_bulk(documents: int, workers: int) -> Dict[str, Any]:
+    archive = [fake_blog(TOPICS[i % len(TOPICS)] + f" archive {i}", words=800 + 100 * (i % 15)) if i % 3
+               else fake_linkedin_post(TOPICS[i % len(TOPICS)] + f" archive {i}") for i in range(documents)]
+    keywords = ["content strategy", "marketing automation", "audience growth", "analytics", "search ranking"]
+
+    def per_document() -> None:
+        for doc in archive:
+            ContentOptimizer.optimize_for_seo(doc, keywords)
+            ContentOptimizer.optimize_for_linkedin(doc)
+            QualityValidator.validate_blog_quality(doc)
+            QualityValidator.validate_linkedin_quality(doc)
+
+    analyze.cache_clear()
+    baseline = timed(per_document)
+    analyze.cache_clear()
+    single = timed(lambda: score_many(archive, keywords, workers=1))
+    pooled = timed(lambda: score_many(archive, keywords, workers=workers))
+    return {
+        "documents": documents,
+        "workers": workers,
+        "per_document_docs_per_s": round(documents / baseline),
+        "score_many_docs_per_s": round(documents / single),
+        "score_many_pool_docs_per_s": round(documents / pooled),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "commit": commit}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ContentAlchemy offline with a deterministic fake LLM")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Fake time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0,
+                        help="Fake generation speed (0 = instant)")
+    parser.add_argument("--serp-latency", type=float, default=0.01, help="SERP stub response time, seconds")
+    parser.add_argument("--image-latency", type=float, default=0.05, help="Fake image generation time, seconds")
+    parser.add_argument("--repeat", type=int, default=10, help="Sequential runs per content type")
+    parser.add_argument("--runs", type=int, default=40, help="Runs in the concurrent workload")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent runs in the concurrent workload")
+    parser.add_argument("--documents", type=int, default=200, help="Documents in the scoring workload")
+    parser.add_argument("--bulk-documents", type=int, default=2000, help="Archive size in the bulk workload")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for score_many")
+    parser.add_argument("--cache", action="store_true", help="Enable the LLM response cache")
+    parser.add_argument("--monitoring", action="store_true", help="Enable run tracing")
+    parser.add_argument("--workloads", default="single,concurrent,routing,scoring,bulk",
+                        help="Comma-separated subset of workloads to run")
+    parser.add_argument("--quick", action="store_true", help="Tiny sizes and no latency, as a smoke test")
+    parser.add_argument("-o", "--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.llm_latency = args.tokens_per_second = args.serp_latency = args.image_latency = 0.0
+        args.repeat, args.runs, args.concurrency, args.documents = 2, 8, 4, 10
+        args.bulk_documents, args.workers = 20, 1
+
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    settings = {k: v for k, v in vars(args).items() if k not in ("output", "workloads")}
+    report: Dict[str, Any] = {"environment": environment(), "settings": settings, "results": {}}
+    with SERPStub(latency=args.serp_latency) as serp:
+        workflow = build_workflow(args, serp.url)
+        results = report["results"]
+        if "single" in workloads:
+            results["single"] = bench_single(workflow, args.repeat)
+        if "concurrent" in workloads:
+            results["concurrent"] = bench_concurrent(workflow, args.runs, args.concurrency)
+        if "routing" in workloads:
+            results["routing"] = bench_routing(workflow, max(1, args.repeat // 2))
+        if "scoring" in workloads:
+            results["scoring"] = bench_scoring(args.documents)
+        if "bulk" in workloads:
+            results["bulk"] = bench_bulk(args.bulk_documents, args.workers)
+        report["serp_requests"] = serp.requests
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Startup benchmark: cold start and per-session cost of the workflow
+
+Each scenario runs in a fresh interpreter so import costs are real:
+
+- ``lazy``: import the workflow and construct it (what a cold web start pays now)
+- ``eager``: the same, then build every agent, model client and the graph
+  (what every session paid when agents were created in the constructor)
+- ``sessions``: N sessions served by the shared workflow vs N eagerly built
+  per-session workflows
+
+Usage: python benchmarks/startup.py [--sessions 5] [--repeat 3] [-o startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIO = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+from src.core.config import Config
+from src.workflow.langgraph_workflow import ContentAlchemyWorkflow, get_workflow
+imported = time.perf_counter()
+
+mode, sessions = sys.argv[1], int(sys.argv[2])
+COMPONENTS = ("query_handler", "research_agent", "blog_writer", "linkedin_writer",
+              "image_generator", "strategist", "workflow")
+
+def materialize(workflow):
+    for name in COMPONENTS:
+        getattr(workflow, name)
+    workflow.image_generator.client
+
+if mode == "lazy":
+    ContentAlchemyWorkflow(Config())
+elif mode == "eager":
+    materialize(ContentAlchemyWorkflow(Config()))
+elif mode == "shared":
+    for _ in range(sessions):
+        materialize(get_workflow())
+elif mode == "per_session":
+    workflows = [ContentAlchemyWorkflow(Config()) for _ in range(sessions)]
+    for workflow in workflows:
+        materialize(workflow)
+done = time.perf_counter()
+
+print(json.dumps({
+    "import_s": imported - start,
+    "total_s": done - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in ("langchain_openai", "openai", "langgraph") if m in sys.modules],
+}))
+"""
+
+
+def run_scenario(mode: str, sessions: int = 1) -> Dict[str, Any]:
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "benchmark",
+               CHECKPOINT_ENABLED="false", CACHE_ENABLED="false")
+    output = subprocess.run(
+        [sys.executable, "-c", SCENARIO, mode, str(sessions)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "import_s": round(statistics.median(r["import_s"] for r in runs), 3),
+        "total_s": round(statistics.median(r["total_s"] for r in runs), 3),
+        "peak_rss_mb": round(statistics.median(r["peak_rss_mb"] for r in runs), 1),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure ContentAlchemy cold start and per-session cost")
+    parser.add_argument("--sessions", type=int, default=5, help="Sessions for the shared vs per-session scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (median is reported)")
+    parser.add_argument("-o", "--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "cold_start": {mode: summarize([run_scenario(mode) for _ in range(args.repeat)])
+                       for mode in ("lazy", "eager")},
+        "sessions": {
+            "count": args.sessions,
+            **{mode: summarize([run_scenario(mode, args.sessions) for _ in range(args.repeat)])
+               for mode in ("shared", "per_session")},
+        },
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,9 +27,24 @@ setup(
         "langchain-openai>=0.1.0,<0.2.0",
         "langchain-core>=0.2.27,<0.3.0",
         "langgraph>=0.2.0,<0.3.0",
+        "langgraph-checkpoint-sqlite>=1.0.0,<2.0.0",
         "streamlit>=1.39.0",
         "requests>=2.32.0",
+        "httpx>=0.27.0",
+        "numpy>=1.24,<3",
+        "aiohttp>=3.9.0",
         "python-dotenv>=1.0.0",
         "pydantic>=2.9.0",
+        "PyYAML>=6.0",
     ],
+    extras_require={
+        # ScoreTable.to_dataframe (src/utils/bulk_scoring.py)
+        "dataframe": ["pandas>=1.5"],
+    },
+    entry_points={
+        "console_scripts": [
+            "contentalchemy-batch=src.workflow.batch:main",
+            "contentalchemy-api=src.web_app.http_service:main",
+        ],
+    },
 )
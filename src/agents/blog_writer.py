@@ -1,35 +1,101 @@
 """
 SEO Blog Writer Agent - Creates search-optimized long-form content
 """
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Iterator, AsyncIterator, Union
+import re
 from langchain_core.messages import HumanMessage, SystemMessage
+from src.utils.content_metrics import DEFAULT_METRICS_BUDGET_MS, blog_metrics
+from src.utils.content_repair import RepairEdit, apply_edits, apply_edits_async
+from src.utils.prompt_budget import PromptBudget, truncate_to_tokens
+from src.utils.quality_validation import BLOG_TOO_SHORT, MISSING_H1
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+SINGLE_CALL_PATTERN = re.compile(r"^\s*KEYWORDS:\s*(?P<keywords>[^\n]*)\n\s*-{3,}\s*\n", re.IGNORECASE)
+H2_PATTERN = re.compile(r"^##\s+(?P<title>.*)$", re.MULTILINE)
+
+# Short drafts are repaired up to this length, leaving headroom over the 800-word minimum
+REPAIR_TARGET_WORDS = 950
+# Largest shortfall one section is asked to absorb; bigger gaps get new sections instead
+MAX_SECTION_GROWTH = 400
+# Expected completion tokens per requested word, for the repair budget check
+TOKENS_PER_WORD = 1.4
+
+
+class SingleCallStream:
+    """Passes a streamed single-call answer through, holding back its KEYWORDS header"""
+    
+    def __init__(self):
+        self.text = ""
+        self.sent: Optional[int] = None  # end of the text already passed on; None while the header is pending
+    
+    def _header_pending(self) -> bool:
+        head = self.text.lstrip().upper()
+        return head.startswith("KEYWORDS:") or "KEYWORDS:".startswith(head)
+    
+    def feed(self, chunk: str) -> str:
+        """Body text that can be shown now"""
+        self.text += chunk
+        if self.sent is None:
+            match = SINGLE_CALL_PATTERN.match(self.text)
+            if match:
+                self.sent = match.end()
+            elif self._header_pending():
+                return ""
+            else:
+                self.sent = 0  # no header: everything is body
+        body, self.sent = self.text[self.sent:], len(self.text)
+        return body
+    
+    def finish(self) -> str:
+        """Text still held back when the stream ends (an unterminated header is body, as in write_blog)"""
+        return self.text if self.sent is None else ""
 
 
 class SEOBlogWriterAgent:
     """Creates SEO-optimized blog content"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI", single_call: bool = False,
+                 prompt_budget: Optional[PromptBudget] = None, fast_llm: Optional["ChatOpenAI"] = None,
+                 metrics_budget_ms: float = DEFAULT_METRICS_BUDGET_MS):
         self.llm = llm
+        # Keyword extraction is short and runs on the cheaper model when one is given
+        self.fast_llm = fast_llm or llm
+        # When enabled, keywords and body come back from one LLM round-trip
+        self.single_call = single_call
+        # Caps how much of the research report goes into the blog prompt
+        self.prompt_budget = prompt_budget or PromptBudget(max_context_tokens=1500)
+        # Wall-clock allowance for scoring the finished draft (0 disables scoring)
+        self.metrics_budget_ms = metrics_budget_ms
     
-    def generate_keywords(self, topic: str) -> List[str]:
-        """Generate relevant SEO keywords"""
+    def _keyword_messages(self, topic: str) -> List[Any]:
         system_prompt = """You are an SEO expert. Generate 5-8 relevant keywords for the topic.
         Return as comma-separated list."""
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Topic: {topic}")
         ]
-        
-        response = self.llm.invoke(messages)
-        keywords = [k.strip() for k in response.content.split(",")]
+    
+    @staticmethod
+    def _parse_keywords(text: str) -> List[str]:
+        keywords = [k.strip() for k in text.split(",")]
         return keywords[:8]
     
-    def write_blog(self, topic: str, research_data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Generate SEO-optimized blog post"""
-        keywords = self.generate_keywords(topic)
-        
+    def generate_keywords(self, topic: str) -> List[str]:
+        """Generate relevant SEO keywords"""
+        response = self.fast_llm.invoke(self._keyword_messages(topic))
+        return self._parse_keywords(response.content)
+    
+    async def generate_keywords_async(self, topic: str) -> List[str]:
+        """Async variant of generate_keywords"""
+        response = await self.fast_llm.ainvoke(self._keyword_messages(topic))
+        return self._parse_keywords(response.content)
+    
+    def _blog_messages(self, topic: str, keywords: List[str],
+                       research_data: Dict[str, Any] = None) -> List[Any]:
         system_prompt = """You are an expert content writer specializing in SEO-optimized blog posts.
         Create engaging, well-structured content with:
         - Compelling headline
@@ -40,24 +106,45 @@ class SEOBlogWriterAgent:
         - Meta description
         - Natural keyword integration"""
         
+        keywords_text = ', '.join(keywords) if keywords else "choose 5-8 relevant SEO keywords yourself"
+        
         research_context = ""
-        if research_data:
-            research_context = f"\n\nResearch Context:\n{research_data.get('content', '')[:500]}"
+        if research_data and research_data.get('content'):
+            # Report sections come summary-first, so later paragraphs are dropped first
+            paragraphs = re.split(r"\n\s*\n", research_data['content'])
+            packed = self.prompt_budget.fit(paragraphs, system_prompt, topic, keywords_text)
+            if packed:
+                research_context = f"\n\nResearch Context:\n{packed}"
         
         user_prompt = f"""Topic: {topic}
-Keywords: {', '.join(keywords)}{research_context}
+Keywords: {keywords_text}{research_context}
 
 Write a comprehensive 1500-2000 word blog post optimized for SEO."""
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        
-        response = self.llm.invoke(messages)
-        
+    
+    def _single_call_messages(self, topic: str, research_data: Dict[str, Any] = None) -> List[Any]:
+        messages = self._blog_messages(topic, [], research_data)
+        user_prompt = messages[1].content + """
+
+Respond in exactly this format:
+KEYWORDS: comma-separated list of the keywords you used
+---
+<the full blog post in markdown>"""
+        return [messages[0], HumanMessage(content=user_prompt)]
+    
+    def _parse_single_call(self, text: str) -> Tuple[str, List[str]]:
+        """Split a single-call response into (blog body, keywords)"""
+        match = SINGLE_CALL_PATTERN.match(text)
+        if not match:
+            return text, []
+        return text[match.end():].strip(), self._parse_keywords(match.group("keywords"))
+    
+    def _blog_result(self, content: str, keywords: List[str]) -> Dict[str, Any]:
         # Calculate metrics
-        content = response.content
         word_count = len(content.split())
         read_time = max(1, word_count // 200)
         
@@ -66,6 +153,180 @@ Write a comprehensive 1500-2000 word blog post optimized for SEO."""
             "keywords": keywords,
             "word_count": word_count,
             "read_time": f"{read_time} min",
-            "seo_score": 85,
+            "seo_score": None,
+            **blog_metrics(content, keywords, self.metrics_budget_ms),
             "type": "blog"
         }
+    
+    def write_blog(self, topic: str, research_data: Dict[str, Any] = None,
+                   single_call: Optional[bool] = None) -> Dict[str, Any]:
+        """Generate SEO-optimized blog post"""
+        if self.single_call if single_call is None else single_call:
+            response = self.llm.invoke(self._single_call_messages(topic, research_data))
+            content, keywords = self._parse_single_call(response.content)
+            return self._blog_result(content, keywords)
+        
+        keywords = self.generate_keywords(topic)
+        response = self.llm.invoke(self._blog_messages(topic, keywords, research_data))
+        return self._blog_result(response.content, keywords)
+    
+    async def write_blog_async(self, topic: str, research_data: Dict[str, Any] = None,
+                               single_call: Optional[bool] = None) -> Dict[str, Any]:
+        """Async variant of write_blog"""
+        if self.single_call if single_call is None else single_call:
+            response = await self.llm.ainvoke(self._single_call_messages(topic, research_data))
+            content, keywords = self._parse_single_call(response.content)
+            return self._blog_result(content, keywords)
+        
+        keywords = await self.generate_keywords_async(topic)
+        response = await self.llm.ainvoke(self._blog_messages(topic, keywords, research_data))
+        return self._blog_result(response.content, keywords)
+    
+    def stream_blog(self, topic: str, research_data: Dict[str, Any] = None,
+                    single_call: Optional[bool] = None) -> Iterator[Union[str, Dict[str, Any]]]:
+        """Yield blog text chunks as they are generated, then the final result dict"""
+        if self.single_call if single_call is None else single_call:
+            stream = SingleCallStream()
+            for chunk in self.llm.stream(self._single_call_messages(topic, research_data)):
+                text = stream.feed(chunk.content)
+                if text:
+                    yield text
+            if stream.finish():
+                yield stream.finish()
+            yield self._blog_result(*self._parse_single_call(stream.text))
+            return
+        
+        keywords = self.generate_keywords(topic)
+        chunks = []
+        for chunk in self.llm.stream(self._blog_messages(topic, keywords, research_data)):
+            chunks.append(chunk.content)
+            yield chunk.content
+        yield self._blog_result("".join(chunks), keywords)
+    
+    async def astream_blog(self, topic: str, research_data: Dict[str, Any] = None,
+                           single_call: Optional[bool] = None) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Async variant of stream_blog"""
+        if self.single_call if single_call is None else single_call:
+            stream = SingleCallStream()
+            async for chunk in self.llm.astream(self._single_call_messages(topic, research_data)):
+                text = stream.feed(chunk.content)
+                if text:
+                    yield text
+            if stream.finish():
+                yield stream.finish()
+            yield self._blog_result(*self._parse_single_call(stream.text))
+            return
+        
+        keywords = await self.generate_keywords_async(topic)
+        chunks = []
+        async for chunk in self.llm.astream(self._blog_messages(topic, keywords, research_data)):
+            chunks.append(chunk.content)
+            yield chunk.content
+        yield self._blog_result("".join(chunks), keywords)
+    
+    @staticmethod
+    def _sections(content: str) -> List[Tuple[str, str]]:
+        """(heading, text) of each H2 section, in order"""
+        matches = list(H2_PATTERN.finditer(content))
+        ends = [m.start() for m in matches[1:]] + [len(content)]
+        return [(m.group("title").strip(), content[m.start():end].strip()) for m, end in zip(matches, ends)]
+    
+    @staticmethod
+    def _repair_messages(topic: str, content: str, keywords: List[str], instruction: str) -> List[Any]:
+        system_prompt = """You are an expert content writer improving an existing SEO blog post.
+        Keep its voice, facts and markdown style, and do not repeat what it already says."""
+        
+        user_prompt = f"""Topic: {topic}
+Keywords: {', '.join(keywords) or topic}
+
+Current draft:
+{content}
+
+{instruction}"""
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _length_edit(self, topic: str, content: str, keywords: List[str]) -> RepairEdit:
+        """Grow a short draft by expanding its thinnest section, or by adding sections"""
+        missing = max(REPAIR_TARGET_WORDS - len(content.split()), 1)
+        sections = self._sections(content)
+        if sections and missing <= MAX_SECTION_GROWTH:
+            title, section = min(sections, key=lambda item: len(item[1].split()))
+            words = len(section.split()) + missing
+            instruction = (f"Rewrite the section below to about {words} words, keeping its H2 heading. "
+                           f"Return only the rewritten section.\n\n{section}")
+            
+            def expand(draft: str, answer: str) -> str:
+                answer = answer.strip()
+                if not answer.startswith("#"):
+                    answer = section.split("\n", 1)[0] + "\n\n" + answer
+                return draft.replace(section, answer, 1)
+            
+            return RepairEdit(f"expanded: {title}", expand, self._repair_messages(topic, content, keywords, instruction),
+                              self.llm, int(words * TOKENS_PER_WORD))
+        
+        count = max(1, round(missing / 200))
+        instruction = (f"Write {count} new H2 section(s), about {missing} words in total, covering what the "
+                       f"draft leaves out. Return only the new sections in markdown.")
+        
+        def add_sections(draft: str, answer: str) -> str:
+            # New sections go before the conclusion when the draft has one
+            for title, section in self._sections(draft):
+                if "conclusion" in title.lower():
+                    return draft.replace(section, answer.strip() + "\n\n" + section, 1)
+            return draft.rstrip() + "\n\n" + answer.strip()
+        
+        return RepairEdit(f"added sections: {count}", add_sections,
+                          self._repair_messages(topic, content, keywords, instruction),
+                          self.llm, int(missing * TOKENS_PER_WORD))
+    
+    def _title_edit(self, topic: str, content: str, keywords: List[str]) -> RepairEdit:
+        """Add the missing H1: promote a plain title line, or ask the fast model for one"""
+        # A lone short first line that reads like a title (not a sentence)
+        first = content.strip().split("\n\n", 1)[0].strip()
+        if (first and "\n" not in first and not first.startswith("#") and len(first.split()) <= 15
+                and not first.endswith((".", ":"))):
+            title = first.strip("*_ ").removeprefix("Title:").strip()
+            return RepairEdit("title", lambda draft, _: draft.replace(first, f"# {title}", 1))
+        
+        messages = [
+            SystemMessage(content="You are an SEO expert. Write one compelling H1 title for this blog post. "
+                                  "Return only the title."),
+            HumanMessage(content=f"Topic: {topic}\nKeywords: {', '.join(keywords) or topic}\n\n"
+                                 f"Opening:\n{truncate_to_tokens(content.strip(), 300)}")
+        ]
+        
+        def add_title(draft: str, answer: str) -> str:
+            title = answer.strip().split("\n", 1)[0].lstrip("#").strip().strip('"')
+            return f"# {title or topic}\n\n{draft.lstrip()}"
+        
+        return RepairEdit("title", add_title, messages, self.fast_llm, 30)
+    
+    def _repair_edits(self, topic: str, draft: Dict[str, Any], issues: List[str]) -> List[RepairEdit]:
+        content, keywords = draft["content"], draft.get("keywords") or []
+        edits = []
+        if BLOG_TOO_SHORT in issues:
+            edits.append(self._length_edit(topic, content, keywords))
+        if MISSING_H1 in issues:
+            edits.append(self._title_edit(topic, content, keywords))
+        return edits
+    
+    def repair_blog(self, topic: str, draft: Dict[str, Any], issues: List[str],
+                    token_budget: int) -> Dict[str, Any]:
+        """Fix a draft's validation issues in place instead of rewriting it.
+        
+        The result carries the edits made (``repairs``) and the LLM tokens they
+        used (``repair_tokens``, at most `token_budget`).
+        """
+        content, applied, used = apply_edits(draft["content"], self._repair_edits(topic, draft, issues), token_budget)
+        return dict(self._blog_result(content, draft.get("keywords") or []), repairs=applied, repair_tokens=used)
+    
+    async def repair_blog_async(self, topic: str, draft: Dict[str, Any], issues: List[str],
+                                token_budget: int) -> Dict[str, Any]:
+        """Async variant of repair_blog"""
+        content, applied, used = await apply_edits_async(draft["content"], self._repair_edits(topic, draft, issues),
+                                                         token_budget)
+        return dict(self._blog_result(content, draft.get("keywords") or []), repairs=applied, repair_tokens=used)
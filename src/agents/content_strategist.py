@@ -1,19 +1,20 @@
 """
 Content Strategist Agent - Formats and organizes research into readable content
 """
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, Any
 from langchain_core.messages import HumanMessage, SystemMessage
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 
 class ContentStrategistAgent:
     """Formats and structures content strategically"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI"):
         self.llm = llm
     
-    def format_content(self, raw_content: str, format_type: str = "markdown") -> Dict[str, Any]:
-        """Format and structure content"""
+    def _format_messages(self, raw_content: str, format_type: str) -> list:
         system_prompt = f"""You are a content strategist. Format the provided content into 
         well-structured {format_type} with:
         - Clear hierarchy
@@ -25,17 +26,27 @@ class ContentStrategistAgent:
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Format this content:\n\n{raw_content}")
         ]
-        
-        response = self.llm.invoke(messages)
-        
+        return messages
+    
+    @staticmethod
+    def _format_result(content: str, format_type: str) -> Dict[str, Any]:
         return {
-            "formatted_content": response.content,
+            "formatted_content": content,
             "format_type": format_type,
             "type": "formatted"
         }
     
-    def create_content_plan(self, topic: str) -> Dict[str, Any]:
-        """Create a strategic content plan"""
+    def format_content(self, raw_content: str, format_type: str = "markdown") -> Dict[str, Any]:
+        """Format and structure content"""
+        response = self.llm.invoke(self._format_messages(raw_content, format_type))
+        return self._format_result(response.content, format_type)
+    
+    async def format_content_async(self, raw_content: str, format_type: str = "markdown") -> Dict[str, Any]:
+        """Async variant of format_content"""
+        response = await self.llm.ainvoke(self._format_messages(raw_content, format_type))
+        return self._format_result(response.content, format_type)
+    
+    def _plan_messages(self, topic: str) -> list:
         system_prompt = """Create a comprehensive content strategy including:
         - Content pillars
         - Target audience
@@ -47,9 +58,19 @@ class ContentStrategistAgent:
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Topic: {topic}")
         ]
-        
-        response = self.llm.invoke(messages)
-        
+        return messages
+    
+    def create_content_plan(self, topic: str) -> Dict[str, Any]:
+        """Create a strategic content plan"""
+        response = self.llm.invoke(self._plan_messages(topic))
+        return {
+            "strategy": response.content,
+            "type": "strategy"
+        }
+    
+    async def create_content_plan_async(self, topic: str) -> Dict[str, Any]:
+        """Async variant of create_content_plan"""
+        response = await self.llm.ainvoke(self._plan_messages(topic))
         return {
             "strategy": response.content,
             "type": "strategy"
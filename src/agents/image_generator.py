@@ -1,46 +1,138 @@
 """
 Image Generation Agent - Produces custom visuals with prompt optimization
 """
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
+from src.core.lazy import lazy_resource
+from src.core.rate_limit import OpenAIRateLimiter
+from src.core.telemetry import estimate_image_cost, span
+from src.utils.prompt_budget import PromptBudget
 import os
+import re
 import base64
+import httpx
 import requests
-from openai import OpenAI
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 
 class ImageGenerationAgent:
     """Generates images using DALL-E"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI", prompt_budget: Optional[PromptBudget] = None,
+                 rate_limiter: Optional[OpenAIRateLimiter] = None):
         self.llm = llm
+        self.rate_limiter = rate_limiter
+        # Only the research summary is useful for art direction
+        self.prompt_budget = prompt_budget or PromptBudget(max_context_tokens=200)
         self.api_key = os.getenv("OPENAI_API_KEY", "")
-        self.client = OpenAI(api_key=self.api_key)
         self.model = os.getenv("IMAGE_MODEL", "dall-e-3")
         self.default_size = os.getenv("IMAGE_SIZE", "1024x1024")
         self.quality = os.getenv("IMAGE_QUALITY", "standard")
     
-    def optimize_prompt(self, user_prompt: str) -> str:
-        """Optimize prompt for better image generation"""
+    # The openai SDK is slow to import, so its clients are created on the first image request
+    @lazy_resource
+    def client(self):
+        from openai import OpenAI
+        return OpenAI(api_key=self.api_key)
+    
+    @lazy_resource
+    def async_client(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.api_key)
+    
+    def _images_call(self, method, **params) -> Any:
+        """Call an images endpoint within the shared OpenAI budget, when one is configured"""
+        model, quality = params.get("model", self.model), params.get("quality", "standard")
+        with span("openai.images", "image", model=model, quality=quality) as current:
+            if self.rate_limiter is None:
+                response = method(**params)
+            else:
+                response = self.rate_limiter.call(lambda: method(**params), image=True)
+            current.set(cost_usd=estimate_image_cost(model, quality, params.get("n", 1)))
+            return response
+    
+    async def _images_call_async(self, method, **params) -> Any:
+        model, quality = params.get("model", self.model), params.get("quality", "standard")
+        with span("openai.images", "image", model=model, quality=quality) as current:
+            if self.rate_limiter is None:
+                response = await method(**params)
+            else:
+                response = await self.rate_limiter.acall(lambda: method(**params), image=True)
+            current.set(cost_usd=estimate_image_cost(model, quality, params.get("n", 1)))
+            return response
+    
+    def _prompt_messages(self, user_prompt: str, research_data: Dict[str, Any] = None) -> list:
         system_prompt = """You are an expert at creating DALL-E prompts. 
         Enhance the user's request with artistic details, style, lighting, and composition.
         Keep it under 400 characters. Return only the optimized prompt."""
         
-        messages = [
+        request = f"User request: {user_prompt}"
+        if research_data and research_data.get('content'):
+            paragraphs = re.split(r"\n\s*\n", research_data['content'])
+            packed = self.prompt_budget.fit(paragraphs, system_prompt, request)
+            if packed:
+                request += f"\n\nTopic background:\n{packed}"
+        
+        return [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=f"User request: {user_prompt}")
+            HumanMessage(content=request)
         ]
-        
+    
+    def optimize_prompt(self, user_prompt: str, research_data: Dict[str, Any] = None) -> str:
+        """Optimize prompt for better image generation"""
         try:
-            response = self.llm.invoke(messages)
+            response = self.llm.invoke(self._prompt_messages(user_prompt, research_data))
             return response.content.strip()
         except Exception as e:
             print(f"Prompt optimization error: {e}")
             # Return original if optimization fails
             return user_prompt
     
-    def generate_image(self, description: str, size: str = None) -> Dict[str, Any]:
+    async def optimize_prompt_async(self, user_prompt: str, research_data: Dict[str, Any] = None) -> str:
+        """Async variant of optimize_prompt"""
+        try:
+            response = await self.llm.ainvoke(self._prompt_messages(user_prompt, research_data))
+            return response.content.strip()
+        except Exception as e:
+            print(f"Prompt optimization error: {e}")
+            return user_prompt
+    
+    def _image_result(self, response: Any, optimized_prompt: str, description: str, image_size: str) -> Dict[str, Any]:
+        # Get the image URL
+        image_url = response.data[0].url
+        
+        # Optional: Download and convert to base64 for local storage
+        # image_data = self._download_image(image_url)
+        
+        return {
+            "image_url": image_url,
+            "prompt": optimized_prompt,
+            "original_request": description,
+            "size": image_size,
+            "model": self.model,
+            "quality": self.quality,
+            "type": "image",
+            "revised_prompt": response.data[0].revised_prompt if hasattr(response.data[0], 'revised_prompt') else optimized_prompt
+        }
+    
+    def _image_error_result(self, error: Exception, optimized_prompt: str, description: str, image_size: str) -> Dict[str, Any]:
+        error_message = str(error)
+        print(f"DALL-E API Error: {error_message}")
+        
+        # Return error info with placeholder
+        return {
+            "error": error_message,
+            "image_url": self._generate_placeholder_svg(description, error=True),
+            "prompt": optimized_prompt,
+            "original_request": description,
+            "size": image_size,
+            "type": "image"
+        }
+    
+    def generate_image(self, description: str, size: str = None,
+                       research_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate image using DALL-E API"""
         if not self.api_key:
             return self._generate_placeholder_image(description)
@@ -49,53 +141,50 @@ class ImageGenerationAgent:
         image_size = size or self.default_size
         
         # Optimize the prompt
-        optimized_prompt = self.optimize_prompt(description)
+        optimized_prompt = self.optimize_prompt(description, research_data)
         
         try:
             # Call DALL-E API
-            response = self.client.images.generate(
+            response = self._images_call(
+                self.client.images.generate,
                 model=self.model,
                 prompt=optimized_prompt,
                 size=image_size,
                 quality=self.quality,
                 n=1,
             )
-            
-            # Get the image URL
-            image_url = response.data[0].url
-            
-            # Optional: Download and convert to base64 for local storage
-            # image_data = self._download_image(image_url)
-            
-            return {
-                "image_url": image_url,
-                "prompt": optimized_prompt,
-                "original_request": description,
-                "size": image_size,
-                "model": self.model,
-                "quality": self.quality,
-                "type": "image",
-                "revised_prompt": response.data[0].revised_prompt if hasattr(response.data[0], 'revised_prompt') else optimized_prompt
-            }
-            
+            return self._image_result(response, optimized_prompt, description, image_size)
         except Exception as e:
-            error_message = str(e)
-            print(f"DALL-E API Error: {error_message}")
-            
-            # Return error info with placeholder
-            return {
-                "error": error_message,
-                "image_url": self._generate_placeholder_svg(description, error=True),
-                "prompt": optimized_prompt,
-                "original_request": description,
-                "size": image_size,
-                "type": "image"
-            }
+            return self._image_error_result(e, optimized_prompt, description, image_size)
+    
+    async def generate_image_async(self, description: str, size: str = None,
+                                   research_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async variant of generate_image"""
+        if not self.api_key:
+            return self._generate_placeholder_image(description)
+        
+        image_size = size or self.default_size
+        optimized_prompt = await self.optimize_prompt_async(description, research_data)
+        
+        try:
+            response = await self._images_call_async(
+                self.async_client.images.generate,
+                model=self.model,
+                prompt=optimized_prompt,
+                size=image_size,
+                quality=self.quality,
+                n=1,
+            )
+            return self._image_result(response, optimized_prompt, description, image_size)
+        except Exception as e:
+            return self._image_error_result(e, optimized_prompt, description, image_size)
     
     def _download_image(self, url: str) -> str:
         """Download image and convert to base64"""
         try:
-            response = requests.get(url, timeout=30)
+            with span("http.image_download", "http") as current:
+                response = requests.get(url, timeout=30)
+                current.set(status_code=response.status_code)
             response.raise_for_status()
             
             # Convert to base64
@@ -105,6 +194,21 @@ class ImageGenerationAgent:
             print(f"Image download error: {e}")
             return url
     
+    async def _download_image_async(self, url: str) -> str:
+        """Async variant of _download_image"""
+        try:
+            async with httpx.AsyncClient(timeout=30) as client:
+                with span("http.image_download", "http") as current:
+                    response = await client.get(url)
+                    current.set(status_code=response.status_code)
+                response.raise_for_status()
+            
+            image_base64 = base64.b64encode(response.content).decode()
+            return f"data:image/png;base64,{image_base64}"
+        except Exception as e:
+            print(f"Image download error: {e}")
+            return url
+    
     def _generate_placeholder_image(self, description: str) -> Dict[str, Any]:
         """Generate placeholder when API key is missing"""
         svg_image = self._generate_placeholder_svg(description, error=False)
@@ -151,7 +255,8 @@ class ImageGenerationAgent:
             image_bytes = response.content
             
             # Generate variations
-            response = self.client.images.create_variation(
+            response = self._images_call(
+                self.client.images.create_variation,
                 image=image_bytes,
                 n=n,
                 size="1024x1024"
@@ -180,7 +285,8 @@ class ImageGenerationAgent:
             mask_response = requests.get(mask_url)
             
             # Generate edit
-            response = self.client.images.edit(
+            response = self._images_call(
+                self.client.images.edit,
                 image=image_response.content,
                 mask=mask_response.content,
                 prompt=prompt,
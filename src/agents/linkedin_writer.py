@@ -1,35 +1,59 @@
 """
 LinkedIn Post Writer Agent - Generates engaging professional social content
 """
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, Any, List, Iterator, AsyncIterator, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import asyncio
+import re
 from langchain_core.messages import HumanMessage, SystemMessage
+from src.utils.content_metrics import DEFAULT_METRICS_BUDGET_MS, linkedin_metrics
+from src.utils.content_repair import RepairEdit, apply_edits, apply_edits_async
+from src.utils.prompt_budget import PromptBudget
+from src.utils.quality_validation import NO_HASHTAGS, POST_TOO_LONG, POST_TOO_SHORT
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 
 class LinkedInWriterAgent:
     """Creates engaging LinkedIn posts"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI", prompt_budget: Optional[PromptBudget] = None,
+                 fast_llm: Optional["ChatOpenAI"] = None, metrics_budget_ms: float = DEFAULT_METRICS_BUDGET_MS):
         self.llm = llm
+        # Hashtags are short and run on the cheaper model when one is given
+        self.fast_llm = fast_llm or llm
+        # A post only needs the headline findings of the research report
+        self.prompt_budget = prompt_budget or PromptBudget(max_context_tokens=600)
+        # Wall-clock allowance for scoring the finished post (0 disables scoring)
+        self.metrics_budget_ms = metrics_budget_ms
     
-    def generate_hashtags(self, topic: str) -> List[str]:
-        """Generate relevant hashtags"""
+    def _hashtag_messages(self, topic: str) -> List[Any]:
         system_prompt = """Generate 5-7 professional hashtags for LinkedIn. 
         Return as comma-separated list without # symbols."""
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Topic: {topic}")
         ]
-        
-        response = self.llm.invoke(messages)
-        hashtags = [f"#{tag.strip().replace('#', '')}" for tag in response.content.split(",")]
+    
+    @staticmethod
+    def _parse_hashtags(text: str) -> List[str]:
+        hashtags = [f"#{tag.strip().replace('#', '')}" for tag in text.split(",")]
         return hashtags[:7]
     
-    def write_post(self, topic: str, tone: str = "professional") -> Dict[str, Any]:
-        """Generate LinkedIn post"""
-        hashtags = self.generate_hashtags(topic)
-        
+    def generate_hashtags(self, topic: str) -> List[str]:
+        """Generate relevant hashtags"""
+        response = self.fast_llm.invoke(self._hashtag_messages(topic))
+        return self._parse_hashtags(response.content)
+    
+    async def generate_hashtags_async(self, topic: str) -> List[str]:
+        """Async variant of generate_hashtags"""
+        response = await self.fast_llm.ainvoke(self._hashtag_messages(topic))
+        return self._parse_hashtags(response.content)
+    
+    def _post_messages(self, topic: str, tone: str, research_data: Dict[str, Any] = None) -> List[Any]:
         system_prompt = f"""You are a LinkedIn content expert. Create an engaging post that:
         - Starts with a hook (emoji + compelling statement)
         - Uses short paragraphs for readability
@@ -39,25 +63,133 @@ class LinkedInWriterAgent:
         - Stays under 1300 characters
         - Uses emojis strategically"""
         
-        user_prompt = f"""Topic: {topic}
+        research_context = ""
+        if research_data and research_data.get('content'):
+            paragraphs = re.split(r"\n\s*\n", research_data['content'])
+            packed = self.prompt_budget.fit(paragraphs, system_prompt, topic)
+            if packed:
+                research_context = f"\n\nResearch Context:\n{packed}"
+        
+        user_prompt = f"""Topic: {topic}{research_context}
 
 Create a high-engagement LinkedIn post."""
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        
-        response = self.llm.invoke(messages)
-        
+    
+    def _post_result(self, body: str, hashtags: List[str]) -> Dict[str, Any]:
         # Add hashtags
-        content = response.content.strip() + "\n\n" + " ".join(hashtags)
+        content = body.strip() + "\n\n" + " ".join(hashtags)
         
         return {
             "content": content,
             "hashtags": hashtags,
             "character_count": len(content),
-            "engagement_score": 78,
+            "engagement_score": None,
+            **linkedin_metrics(content, self.metrics_budget_ms),
             "ideal_length": len(content) < 1300,
             "type": "linkedin"
         }
+    
+    def write_post(self, topic: str, tone: str = "professional",
+                   research_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Generate LinkedIn post"""
+        # Hashtags and body are independent, so fetch them concurrently (in this run's trace context)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            hashtags_future = pool.submit(copy_context().run, self.generate_hashtags, topic)
+            response = self.llm.invoke(self._post_messages(topic, tone, research_data))
+            hashtags = hashtags_future.result()
+        return self._post_result(response.content, hashtags)
+    
+    async def write_post_async(self, topic: str, tone: str = "professional",
+                               research_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async variant of write_post"""
+        hashtags, response = await asyncio.gather(
+            self.generate_hashtags_async(topic),
+            self.llm.ainvoke(self._post_messages(topic, tone, research_data))
+        )
+        return self._post_result(response.content, hashtags)
+    
+    def stream_post(self, topic: str, tone: str = "professional",
+                    research_data: Dict[str, Any] = None) -> Iterator[Union[str, Dict[str, Any]]]:
+        """Yield post text chunks as they are generated, then the final result dict"""
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            hashtags_future = pool.submit(copy_context().run, self.generate_hashtags, topic)
+            chunks = []
+            for chunk in self.llm.stream(self._post_messages(topic, tone, research_data)):
+                chunks.append(chunk.content)
+                yield chunk.content
+            hashtags = hashtags_future.result()
+        yield "\n\n" + " ".join(hashtags)
+        yield self._post_result("".join(chunks), hashtags)
+    
+    async def astream_post(self, topic: str, tone: str = "professional",
+                           research_data: Dict[str, Any] = None) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Async variant of stream_post"""
+        hashtags_task = asyncio.ensure_future(self.generate_hashtags_async(topic))
+        chunks = []
+        try:
+            async for chunk in self.llm.astream(self._post_messages(topic, tone, research_data)):
+                chunks.append(chunk.content)
+                yield chunk.content
+            hashtags = await hashtags_task
+        finally:
+            hashtags_task.cancel()
+        yield "\n\n" + " ".join(hashtags)
+        yield self._post_result("".join(chunks), hashtags)
+    
+    @staticmethod
+    def _split_post(draft: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """(body, hashtags) of a finished post"""
+        hashtags = draft.get("hashtags") or []
+        content, tag_line = draft["content"], " ".join(hashtags)
+        if hashtags and content.endswith(tag_line):
+            content = content[:-len(tag_line)]
+        return content.strip(), hashtags
+    
+    def _body_edit(self, name: str, topic: str, body: str, instruction: str) -> RepairEdit:
+        system_prompt = """You are a LinkedIn content expert editing an existing post.
+        Keep its hook, voice, facts and emojis. Return only the post text, without hashtags."""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Topic: {topic}\n\nCurrent post:\n{body}\n\n{instruction}")
+        ]
+        # A rewritten post is capped at ~1300 characters, i.e. ~350 tokens
+        return RepairEdit(name, lambda draft, answer: (answer.strip(), draft[1]), messages, self.llm, 350)
+    
+    def _repair_edits(self, topic: str, draft: Dict[str, Any], issues: List[str]) -> List[RepairEdit]:
+        body, _ = self._split_post(draft)
+        edits = []
+        if POST_TOO_LONG in issues:
+            edits.append(self._body_edit("condensed", topic, body,
+                                         "Condense this post to under 1300 characters."))
+        if POST_TOO_SHORT in issues:
+            edits.append(self._body_edit("expanded", topic, body,
+                                         "Expand this post to 600-1200 characters: keep the hook, add 3 key "
+                                         "takeaways in short paragraphs and end with a question."))
+        if NO_HASHTAGS in issues:
+            edits.append(RepairEdit("hashtags", lambda draft, answer: (draft[0], self._parse_hashtags(answer)),
+                                    self._hashtag_messages(topic), self.fast_llm, 40))
+        return edits
+    
+    def repair_post(self, topic: str, draft: Dict[str, Any], issues: List[str],
+                    token_budget: int) -> Dict[str, Any]:
+        """Fix a post's validation issues in place instead of rewriting it.
+        
+        The result carries the edits made (``repairs``) and the LLM tokens they
+        used (``repair_tokens``, at most `token_budget`).
+        """
+        (body, hashtags), applied, used = apply_edits(self._split_post(draft), self._repair_edits(topic, draft, issues),
+                                                      token_budget)
+        return dict(self._post_result(body, hashtags), repairs=applied, repair_tokens=used)
+    
+    async def repair_post_async(self, topic: str, draft: Dict[str, Any], issues: List[str],
+                                token_budget: int) -> Dict[str, Any]:
+        """Async variant of repair_post"""
+        (body, hashtags), applied, used = await apply_edits_async(
+            self._split_post(draft), self._repair_edits(topic, draft, issues), token_budget
+        )
+        return dict(self._post_result(body, hashtags), repairs=applied, repair_tokens=used)
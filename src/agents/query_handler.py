@@ -1,16 +1,31 @@
 """
 Query Handler Agent - Routes requests to appropriate specialized agents
 """
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from src.core.routing_engine import RoutingEngine
+from src.core.routing_cache import RoutingCache, normalize_query
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+# Formats a single campaign request can ask for, in presentation order
+CAMPAIGN_FORMATS = ("research", "blog", "linkedin", "image")
+# Keyword weight at which a format counts as explicitly requested ("post" alone does not)
+FORMAT_MENTION_SCORE = 2.0
 
 
 class QueryHandlerAgent:
     """Routes user queries to appropriate content generation agents"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI", routing_engine: Optional[RoutingEngine] = None,
+                 confidence_threshold: float = 0.6, routing_cache: Optional[RoutingCache] = None):
         self.llm = llm
+        self.routing_engine = routing_engine or RoutingEngine()
+        # The LLM is only consulted when the local engine is less sure than this
+        self.confidence_threshold = confidence_threshold
+        self.routing_cache = routing_cache
         self.agent_capabilities = {
             "research": ["research", "analyze", "investigate", "study", "explore", "find information"],
             "blog": ["blog", "article", "post", "write", "essay", "guide", "tutorial"],
@@ -19,38 +34,93 @@ class QueryHandlerAgent:
             "strategist": ["organize", "format", "structure", "outline"]
         }
     
+    def _routing_messages(self, query: str) -> List[Any]:
+        system_prompt = """You are a query routing expert. Determine the primary content type 
+            the user wants to create. Return ONLY one word: research, blog, linkedin, or image."""
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=query)
+        ]
+    
+    def _routing_result(self, query: str, decision: Dict[str, Any],
+                        llm_choice: Optional[str] = None) -> Dict[str, Any]:
+        primary_agent = decision["primary_agent"]
+        method = decision["method"]
+        if llm_choice is not None:
+            choice = llm_choice.strip().lower()
+            if choice in self.agent_capabilities:
+                primary_agent = choice
+                method = "llm"
+        
+        return {
+            "primary_agent": primary_agent,
+            "query": query,
+            "confidence": round(decision["confidence"], 3),
+            "method": method
+        }
+    
+    def _needs_llm(self, decision: Dict[str, Any]) -> bool:
+        # A query with no routing signal at all defaults to research, as before
+        return decision["method"] != "default" and decision["confidence"] < self.confidence_threshold
+    
+    def _cache_key(self, query: str) -> str:
+        """Intent template plus any routing signal hiding in the topic phrase"""
+        template, topic = normalize_query(query)
+        topic_scores = self.routing_engine.keyword_scores(topic) if topic else {}
+        if not topic_scores:
+            return template
+        signals = ",".join(f"{agent}:{score:g}" for agent, score in sorted(topic_scores.items()))
+        return f"{template}|{signals}"
+    
+    def _cached_route(self, query: str) -> Optional[Dict[str, Any]]:
+        if self.routing_cache is None:
+            return None
+        cached = self.routing_cache.get(self._cache_key(query))
+        if cached is None:
+            return None
+        return {
+            "primary_agent": cached["primary_agent"],
+            "query": query,
+            "confidence": cached["confidence"],
+            "method": "cache"
+        }
+    
+    def _remember(self, query: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        if self.routing_cache is not None:
+            self.routing_cache.put(self._cache_key(query), result)
+        return result
+    
     def route_query(self, query: str) -> Dict[str, Any]:
         """Determine which agent(s) should handle the query"""
-        query_lower = query.lower()
+        cached = self._cached_route(query)
+        if cached is not None:
+            return cached
         
-        # Check for explicit agent mentions
-        detected_agents = []
-        for agent, keywords in self.agent_capabilities.items():
-            if any(keyword in query_lower for keyword in keywords):
-                detected_agents.append(agent)
+        decision = self.routing_engine.classify(query)
         
-        # Default to research if no specific agent detected
-        if not detected_agents:
-            detected_agents = ["research"]
+        # Use LLM only for decisions the local engine is unsure about
+        if self._needs_llm(decision):
+            response = self.llm.invoke(self._routing_messages(query))
+            return self._remember(query, self._routing_result(query, decision, response.content))
         
-        # Use LLM for complex routing decisions
-        if len(detected_agents) > 1:
-            system_prompt = """You are a query routing expert. Determine the primary content type 
-            the user wants to create. Return ONLY one word: research, blog, linkedin, or image."""
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=query)
-            ]
-            
-            response = self.llm.invoke(messages)
-            primary_agent = response.content.strip().lower()
-            
-            if primary_agent in self.agent_capabilities:
-                detected_agents = [primary_agent]
+        return self._remember(query, self._routing_result(query, decision))
+    
+    async def route_query_async(self, query: str) -> Dict[str, Any]:
+        """Async variant of route_query"""
+        cached = self._cached_route(query)
+        if cached is not None:
+            return cached
         
-        return {
-            "primary_agent": detected_agents[0],
-            "query": query,
-            "confidence": 0.85
-        }
+        decision = self.routing_engine.classify(query)
+        
+        if self._needs_llm(decision):
+            response = await self.llm.ainvoke(self._routing_messages(query))
+            return self._remember(query, self._routing_result(query, decision, response.content))
+        
+        return self._remember(query, self._routing_result(query, decision))
+    
+    def detect_formats(self, query: str) -> List[str]:
+        """Every output format the query explicitly asks for (e.g. blog + LinkedIn post + image)"""
+        scores = self.routing_engine.keyword_scores(query)
+        return [f for f in CAMPAIGN_FORMATS if scores.get(f, 0) >= FORMAT_MENTION_SCORE]
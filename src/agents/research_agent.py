@@ -1,64 +1,183 @@
 """
 Deep Research Agent - Conducts comprehensive web research and analysis
 """
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, Any, List, Iterator, AsyncIterator, Optional, Union
 from langchain_core.messages import HumanMessage, SystemMessage
-import requests
+from src.core.search_client import SearchClient, SearchError
+from src.utils.prompt_budget import PromptBudget
+from src.utils.search_results import drop_near_duplicates, rank_results
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+import asyncio
 import os
+import time
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+# Local sub-query expansion: no extra LLM round-trip before the searches start
+SUB_QUERY_TEMPLATES = [
+    "{topic}",
+    "{topic} statistics and data",
+    "{topic} latest trends",
+    "{topic} case studies",
+    "{topic} challenges and risks",
+    "{topic} best practices",
+    "{topic} expert analysis",
+    "{topic} future outlook",
+]
 
 
 class DeepResearchAgent:
     """Conducts comprehensive research using web search"""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI", search_client: Optional[SearchClient] = None,
+                 deep: bool = False, fan_out: int = 4, latency_budget: float = 10.0,
+                 max_sources: int = 10, llm_query_expansion: bool = False,
+                 prompt_budget: Optional[PromptBudget] = None, fast_llm: Optional["ChatOpenAI"] = None):
         self.llm = llm
-        self.serp_api_key = os.getenv("SERP_API_KEY", "")
+        # Sub-query expansion runs on the cheaper model when one is given
+        self.fast_llm = fast_llm or llm
+        self.serp_api_key = search_client.api_key if search_client else os.getenv("SERP_API_KEY", "")
+        self.search_client = search_client or SearchClient(api_key=self.serp_api_key)
+        # Deep mode fans the topic out into several concurrent searches
+        self.deep = deep
+        self.fan_out = fan_out
+        self.latency_budget = latency_budget
+        self.max_sources = max_sources
+        self.llm_query_expansion = llm_query_expansion
+        # Caps how many search-result tokens go into the synthesis prompt
+        self.prompt_budget = prompt_budget or PromptBudget(max_context_tokens=3000)
+    
+    def _mock_results(self, query: str, num_results: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": f"Research Source {i+1}",
+                "link": f"https://example.com/article{i+1}",
+                "snippet": f"Relevant information about {query}..."
+            }
+            for i in range(num_results)
+        ]
     
     def search_web(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """Perform web search using SERP API"""
         if not self.serp_api_key:
             # Return mock data if no API key
-            return [
-                {
-                    "title": f"Research Source {i+1}",
-                    "link": f"https://example.com/article{i+1}",
-                    "snippet": f"Relevant information about {query}..."
-                }
-                for i in range(num_results)
-            ]
+            return self._mock_results(query, num_results)
         
         try:
-            url = "https://serpapi.com/search"
-            params = {
-                "q": query,
-                "api_key": self.serp_api_key,
-                "num": num_results
-            }
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            return data.get("organic_results", [])[:num_results]
-        except Exception as e:
+            return self.search_client.search(query, num_results)
+        except SearchError as e:
+            # Research can still be synthesized without sources
             print(f"Search error: {e}")
             return []
     
-    def conduct_research(self, topic: str) -> Dict[str, Any]:
-        """Conduct comprehensive research on a topic"""
-        # Perform web search
-        search_results = self.search_web(topic)
+    async def search_web_async(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """Async variant of search_web using a non-blocking HTTP client"""
+        if not self.serp_api_key:
+            return self._mock_results(query, num_results)
+        
+        try:
+            return await self.search_client.asearch(query, num_results)
+        except SearchError as e:
+            print(f"Search error: {e}")
+            return []
+    
+    def _expansion_messages(self, topic: str, count: int) -> List[Any]:
+        system_prompt = f"""You are a research planner. Break the topic into {count} distinct
+        web search queries that together cover it thoroughly. Return one query per line."""
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Topic: {topic}")
+        ]
+    
+    @staticmethod
+    def _parse_queries(topic: str, text: str, count: int) -> List[str]:
+        queries = [topic]
+        for line in text.splitlines():
+            query = line.strip().lstrip("-*0123456789. ").strip()
+            if query and query.lower() not in (q.lower() for q in queries):
+                queries.append(query)
+        return queries[:count]
+    
+    def expand_queries(self, topic: str, fan_out: Optional[int] = None) -> List[str]:
+        """Expand a topic into sub-queries; the original topic always comes first"""
+        count = max(1, fan_out or self.fan_out)
+        if self.llm_query_expansion and count > 1:
+            try:
+                response = self.fast_llm.invoke(self._expansion_messages(topic, count - 1))
+                return self._parse_queries(topic, response.content, count)
+            except Exception as e:
+                print(f"Query expansion error: {e}")
+        return [template.format(topic=topic) for template in SUB_QUERY_TEMPLATES[:count]]
+    
+    async def expand_queries_async(self, topic: str, fan_out: Optional[int] = None) -> List[str]:
+        """Async variant of expand_queries"""
+        count = max(1, fan_out or self.fan_out)
+        if self.llm_query_expansion and count > 1:
+            try:
+                response = await self.fast_llm.ainvoke(self._expansion_messages(topic, count - 1))
+                return self._parse_queries(topic, response.content, count)
+            except Exception as e:
+                print(f"Query expansion error: {e}")
+        return [template.format(topic=topic) for template in SUB_QUERY_TEMPLATES[:count]]
+    
+    def _merge_sources(self, result_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return drop_near_duplicates(rank_results(result_lists))[:self.max_sources]
+    
+    def deep_search(self, topic: str, fan_out: Optional[int] = None,
+                    latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Run sub-query searches concurrently within a latency budget, then dedupe and rank"""
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        queries = self.expand_queries(topic, fan_out)
+        start = time.perf_counter()
+        
+        pool = ThreadPoolExecutor(max_workers=len(queries))
+        # Each search runs in a copy of this context so its spans join the current trace
+        futures = [pool.submit(copy_context().run, self.search_web, query) for query in queries]
+        done, _ = wait(futures, timeout=budget)
+        # Searches still running when the budget expires are abandoned
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+        result_lists = [f.result() for f in futures if f in done and not f.exception()]
+        return {
+            "sources": self._merge_sources(result_lists),
+            "sub_queries": queries,
+            "searches_completed": len(result_lists),
+            "search_time": round(time.perf_counter() - start, 3)
+        }
+    
+    async def deep_search_async(self, topic: str, fan_out: Optional[int] = None,
+                                latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Async variant of deep_search"""
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        queries = await self.expand_queries_async(topic, fan_out)
+        start = time.perf_counter()
         
+        # Sub-query searches share one connection pool, closed once they are done
+        async with self.search_client.async_session():
+            tasks = [asyncio.ensure_future(self.search_web_async(query)) for query in queries]
+            done, pending = await asyncio.wait(tasks, timeout=budget)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        result_lists = [t.result() for t in tasks if t in done and not t.exception()]
+        return {
+            "sources": self._merge_sources(result_lists),
+            "sub_queries": queries,
+            "searches_completed": len(result_lists),
+            "search_time": round(time.perf_counter() - start, 3)
+        }
+    
+    def _research_messages(self, topic: str, search_results: List[Dict[str, Any]]) -> List[Any]:
         # Synthesize research using LLM
         system_prompt = """You are an expert researcher. Analyze the provided search results 
         and create a comprehensive research report with key insights, analysis, and sources."""
         
-        search_context = "\n\n".join([
-            f"Source {i+1}: {result.get('title', '')}\n{result.get('snippet', '')}"
-            for i, result in enumerate(search_results)
-        ])
-        
-        user_prompt = f"""Research Topic: {topic}
+        prompt_template = """Research Topic: {topic}
 
 Search Results:
 {search_context}
@@ -70,16 +189,84 @@ Create a detailed research report with:
 4. Sources and References
 5. Recommendations"""
         
-        messages = [
+        # Results arrive best-first, so the budget keeps the top sources whole
+        snippets = [
+            f"Source {i+1}: {result.get('title', '')}\n{result.get('snippet', '')}"
+            for i, result in enumerate(search_results)
+        ]
+        search_context = self.prompt_budget.fit(
+            snippets, system_prompt, prompt_template.format(topic=topic, search_context="")
+        )
+        user_prompt = prompt_template.format(topic=topic, search_context=search_context)
+        
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        
-        response = self.llm.invoke(messages)
-        
+    
+    @staticmethod
+    def _research_result(content: str, topic: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
-            "content": response.content,
+            "content": content,
             "sources": search_results,
             "topic": topic,
             "type": "research"
         }
+    
+    def conduct_deep_research(self, topic: str, fan_out: Optional[int] = None,
+                              latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Research a topic from several concurrent sub-query searches"""
+        search = self.deep_search(topic, fan_out, latency_budget)
+        response = self.llm.invoke(self._research_messages(topic, search["sources"]))
+        result = self._research_result(response.content, topic, search["sources"])
+        result.update({k: v for k, v in search.items() if k != "sources"})
+        return result
+    
+    async def conduct_deep_research_async(self, topic: str, fan_out: Optional[int] = None,
+                                          latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Async variant of conduct_deep_research"""
+        search = await self.deep_search_async(topic, fan_out, latency_budget)
+        response = await self.llm.ainvoke(self._research_messages(topic, search["sources"]))
+        result = self._research_result(response.content, topic, search["sources"])
+        result.update({k: v for k, v in search.items() if k != "sources"})
+        return result
+    
+    def conduct_research(self, topic: str) -> Dict[str, Any]:
+        """Conduct comprehensive research on a topic"""
+        if self.deep:
+            return self.conduct_deep_research(topic)
+        
+        # Perform web search
+        search_results = self.search_web(topic)
+        response = self.llm.invoke(self._research_messages(topic, search_results))
+        return self._research_result(response.content, topic, search_results)
+    
+    async def conduct_research_async(self, topic: str) -> Dict[str, Any]:
+        """Async variant of conduct_research"""
+        if self.deep:
+            return await self.conduct_deep_research_async(topic)
+        
+        search_results = await self.search_web_async(topic)
+        response = await self.llm.ainvoke(self._research_messages(topic, search_results))
+        return self._research_result(response.content, topic, search_results)
+    
+    def stream_research(self, topic: str) -> Iterator[Union[str, Dict[str, Any]]]:
+        """Yield report text chunks as they are generated, then the final result dict"""
+        search_results = self.deep_search(topic)["sources"] if self.deep else self.search_web(topic)
+        chunks = []
+        for chunk in self.llm.stream(self._research_messages(topic, search_results)):
+            chunks.append(chunk.content)
+            yield chunk.content
+        yield self._research_result("".join(chunks), topic, search_results)
+    
+    async def astream_research(self, topic: str) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Async variant of stream_research"""
+        if self.deep:
+            search_results = (await self.deep_search_async(topic))["sources"]
+        else:
+            search_results = await self.search_web_async(topic)
+        chunks = []
+        async for chunk in self.llm.astream(self._research_messages(topic, search_results)):
+            chunks.append(chunk.content)
+            yield chunk.content
+        yield self._research_result("".join(chunks), topic, search_results)
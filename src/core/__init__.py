@@ -3,5 +3,6 @@ ContentAlchemy Core Package
 """
 from .config import Config
 from .router import WorkflowRouter
+from .cache import CachedLLM, create_cache_backend
 
-__all__ = ['Config', 'WorkflowRouter']
+__all__ = ['Config', 'WorkflowRouter', 'CachedLLM', 'create_cache_backend']
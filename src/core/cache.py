@@ -0,0 +1,284 @@
+"""
+Content-addressed LLM response cache shared by every agent
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from src.core.telemetry import annotate
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage
+
+
+def make_cache_key(model: str, temperature: float, messages: List[Any], **kwargs: Any) -> str:
+    """Hash model, temperature, extra invoke kwargs and the message list into a key"""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            [getattr(m, "type", type(m).__name__), getattr(m, "content", str(m))]
+            for m in messages
+        ],
+        "kwargs": kwargs,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Key/value store with per-entry TTL"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """The value stored under `key`, or None when missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Store `value`; `ttl` seconds overrides the backend default (0: no expiry)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() in a worker thread, so disk or network I/O never blocks the event loop"""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with TTL eviction"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[int] = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # No I/O, so the async variants skip the thread hop
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.set(key, value, ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache that survives restarts"""
+
+    def __init__(self, path: str = ".cache/llm_cache.sqlite", ttl: Optional[int] = 3600):
+        self.path = path
+        self.ttl = ttl
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+class RedisCache(CacheBackend):
+    """Redis-backed cache shared across processes and replicas"""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl: Optional[int] = 3600,
+                 prefix: str = "contentalchemy:llm:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisCache requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl:
+            self.client.setex(self.prefix + key, ttl, value)
+        else:
+            self.client.set(self.prefix + key, value)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def create_cache_backend(cache_config) -> CacheBackend:
+    """Build the backend selected by a CacheConfig"""
+    backend = cache_config.backend.lower()
+    if backend == "memory":
+        return MemoryCache(max_size=cache_config.max_size, ttl=cache_config.ttl)
+    if backend == "sqlite":
+        return SQLiteCache(path=cache_config.path, ttl=cache_config.ttl)
+    if backend == "redis":
+        return RedisCache(url=cache_config.redis_url, ttl=cache_config.ttl)
+    raise ValueError(f"Unknown cache backend '{cache_config.backend}'")
+
+
+class CachedLLM:
+    """Wraps a chat model so identical prompts are answered from cache"""
+
+    def __init__(self, llm: Any, backend: CacheBackend, ttl: Optional[int] = None):
+        self.llm = llm
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything the cache does not handle goes straight to the wrapped model
+        return getattr(self.llm, name)
+
+    def _key(self, messages: List[Any], **kwargs: Any) -> str:
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "")
+        temperature = getattr(self.llm, "temperature", None)
+        return make_cache_key(str(model), temperature, messages, **kwargs)
+
+    def _lookup(self, key: str) -> Optional["AIMessage"]:
+        return self._hit(self.backend.get(key))
+
+    async def _alookup(self, key: str) -> Optional["AIMessage"]:
+        return self._hit(await self.backend.aget(key))
+
+    def _hit(self, cached: Optional[str]) -> Optional["AIMessage"]:
+        """Count a lookup and decode the cached answer, if any"""
+        annotate(cache_hit=cached is not None)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Imported here so the cache module stays cheap to import
+        from langchain_core.messages import AIMessage
+        return AIMessage(content=json.loads(cached)["content"])
+
+    def _store(self, key: str, content: str) -> None:
+        self.backend.set(key, json.dumps({"content": content}), self.ttl)
+
+    async def _astore(self, key: str, content: str) -> None:
+        await self.backend.aset(key, json.dumps({"content": content}), self.ttl)
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        key = self._key(messages, **kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(messages, **kwargs)
+        self._store(key, response.content)
+        return response
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        key = self._key(messages, **kwargs)
+        cached = await self._alookup(key)
+        if cached is not None:
+            return cached
+        response = await self.llm.ainvoke(messages, **kwargs)
+        await self._astore(key, response.content)
+        return response
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[Any]:
+        key = self._key(messages, **kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in self.llm.stream(messages, **kwargs):
+            chunks.append(chunk.content)
+            yield chunk
+        self._store(key, "".join(chunks))
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        key = self._key(messages, **kwargs)
+        cached = await self._alookup(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.llm.astream(messages, **kwargs):
+            chunks.append(chunk.content)
+            yield chunk
+        await self._astore(key, "".join(chunks))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters used to size the cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,150 @@
+"""
+Workflow checkpointers so failed or interrupted runs can resume by run ID
+"""
+import asyncio
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+PRUNE_INTERVAL = 3600.0  # seconds between retention passes in a long-running process
+
+
+class SyncBackedSaver(BaseCheckpointSaver):
+    """Adds async methods to a sync-only checkpointer (e.g. SqliteSaver) by delegation.
+
+    The async methods run the sync ones in a worker thread, so a slow disk
+    never blocks the event loop ainvoke()/astream() are running on. `prune`,
+    when given, runs on creation and then at most every PRUNE_INTERVAL seconds
+    after a write.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, prune: Optional[Callable[[], Any]] = None):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.prune = prune
+        self._pruned_at = time.monotonic()
+        if prune is not None:
+            prune()
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.saver.get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: Dict[str, Any]) -> RunnableConfig:
+        result = self.saver.put(config, checkpoint, metadata, new_versions)
+        if self.prune is not None and time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+            self._pruned_at = time.monotonic()
+            self.prune()
+        return result
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        self.saver.put_writes(config, writes, task_id)
+
+    def get_next_version(self, current: Optional[Any], channel: Any) -> Any:
+        return self.saver.get_next_version(current, channel)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: Dict[str, Any]) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id)
+
+
+def _checkpoint_id_at(timestamp: float) -> str:
+    """Smallest checkpoint ID (a time-ordered UUIDv6) created at `timestamp`"""
+    ticks = int(timestamp * 10_000_000) + 0x01B21DD213814000  # 100ns since the UUID epoch
+    return str(uuid.UUID(int=((ticks >> 12) & 0xFFFFFFFFFFFF) << 80 | (0x6000 | ticks & 0x0FFF) << 64))
+
+
+def prune_sqlite_checkpoints(saver, max_age_days: float = 0, keep_last: int = 0) -> int:
+    """Delete old checkpoints from a SqliteSaver; returns how many were removed.
+
+    Runs whose newest checkpoint is older than `max_age_days` are dropped
+    whole, and `keep_last` caps the checkpoints kept per run (newest first).
+    0 disables a rule. Checkpoint IDs sort by creation time, so age is
+    compared on the ID itself.
+    """
+    removed = 0
+    with saver.lock, saver.cursor() as cur:
+        if max_age_days > 0:
+            cutoff = _checkpoint_id_at(time.time() - max_age_days * 86400)
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id IN ("
+                " SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?)",
+                (cutoff,),
+            )
+            removed += cur.rowcount
+        if keep_last > 0:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                " SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                "  PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position"
+                "  FROM checkpoints) WHERE position > ?)",
+                (keep_last,),
+            )
+            removed += cur.rowcount
+        if removed:
+            cur.execute(
+                "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints AS c"
+                " WHERE c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns"
+                " AND c.checkpoint_id = writes.checkpoint_id)"
+            )
+    return removed
+
+
+def create_sqlite_checkpointer(path: str, max_age_days: float = 0, keep_last: int = 0) -> BaseCheckpointSaver:
+    """SQLite checkpointer usable from both invoke() and ainvoke(), pruned to the given retention"""
+    try:
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "SQLite checkpoints require 'langgraph-checkpoint-sqlite' (pip install langgraph-checkpoint-sqlite)"
+        ) from e
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # SqliteSaver serializes access with its own lock
+    conn = sqlite3.connect(path, check_same_thread=False)
+    saver = SqliteSaver(conn)
+    prune = None
+    if max_age_days > 0 or keep_last > 0:
+        prune = lambda: prune_sqlite_checkpoints(saver, max_age_days, keep_last)
+    return SyncBackedSaver(saver, prune=prune)
+
+
+def create_checkpointer(checkpoint_config) -> Optional[BaseCheckpointSaver]:
+    """Build the checkpointer selected by a CheckpointConfig; None when disabled"""
+    if not checkpoint_config.enabled:
+        return None
+    backend = checkpoint_config.backend.lower()
+    if backend == "memory":
+        return MemorySaver()
+    if backend == "sqlite":
+        return create_sqlite_checkpointer(
+            checkpoint_config.path, checkpoint_config.max_age_days, checkpoint_config.keep_last
+        )
+    raise ValueError(f"Unknown checkpoint backend '{checkpoint_config.backend}'")
@@ -2,31 +2,84 @@
 Configuration management for ContentAlchemy
 """
 import os
+import threading
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-# Try multiple possible locations
-possible_env_paths = [
-    Path(__file__).parent.parent.parent / '.env',  # From src/core/config.py -> project root
-    Path.cwd() / '.env',  # Current working directory
-    Path.cwd().parent / '.env',  # Parent of current directory
-]
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; env vars still work without it
+    yaml = None
 
-env_loaded = False
-for env_path in possible_env_paths:
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=True)
-        env_loaded = True
-        if os.getenv("DEBUG", "false").lower() == "true":
-            print(f"Loaded .env from: {env_path}")
-        break
+_env_lock = threading.Lock()
+_env_loaded = False
 
-if not env_loaded:
-    # If no .env file found, try loading from current directory anyway
-    load_dotenv(override=True)
+
+def load_env_files(reload: bool = False) -> None:
+    """Load environment variables from the first .env file found, once per process.
+    
+    Called by Config() rather than at import time, so importing this module
+    does no filesystem probing. `reload` reads the files again, e.g. after a
+    fix to .env in a long-running process.
+    """
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded and not reload:
+            return
+        _env_loaded = True
+        # Try multiple possible locations
+        possible_env_paths = [
+            Path(__file__).parent.parent.parent / '.env',  # From src/core/config.py -> project root
+            Path.cwd() / '.env',  # Current working directory
+            Path.cwd().parent / '.env',  # Parent of current directory
+        ]
+        for env_path in possible_env_paths:
+            if env_path.exists():
+                load_dotenv(dotenv_path=env_path, override=True)
+                if os.getenv("DEBUG", "false").lower() == "true":
+                    print(f"Loaded .env from: {env_path}")
+                return
+        # If no .env file found, try loading from current directory anyway
+        load_dotenv(override=True)
+
+
+CONFIG_DIR = Path(__file__).parent.parent.parent / 'config'
+
+
+def load_yaml_settings(environment: Optional[str] = None) -> Dict[str, Any]:
+    """Load config/<environment>.yaml, returning an empty dict if unavailable"""
+    environment = environment or os.getenv("CONTENTALCHEMY_ENV", "development")
+    settings_path = CONFIG_DIR / f"{environment}.yaml"
+    if yaml is None or not settings_path.exists():
+        return {}
+    with open(settings_path, "r", encoding="utf-8") as fh:
+        return yaml.safe_load(fh) or {}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return bool(default)
+    return value.lower() == "true"
+
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    """Parse "a.example.com,b.example.com" style env values"""
+    value = os.getenv(name)
+    if value is None:
+        return list(default or [])
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _env_int_map(name: str, default: Dict[str, int]) -> Dict[str, int]:
+    """Parse "image=1,campaign=2" style env values"""
+    value = os.getenv(name)
+    if not value:
+        return {key: int(limit) for key, limit in default.items()}
+    pairs = (item.split("=", 1) for item in value.split(",") if item.strip())
+    return {key.strip(): int(limit) for key, limit in pairs}
 
 
 @dataclass
@@ -35,12 +88,51 @@ class OpenAIConfig:
     model: str = "gpt-4"
     temperature: float = 0.7
     max_tokens: int = 2000
+    context_window: int = 0  # 0 looks the window up from the model name
+    # Fast tier for routing, keywords, hashtags and query expansion
+    fast_model: str = "gpt-4o-mini"
+    fast_temperature: Optional[float] = None  # None uses `temperature`
+    max_concurrency: int = 8
+    fast_max_concurrency: int = 32
+    max_connections: int = 20  # shared HTTP pool across all tiers
 
 
 @dataclass
 class SERPConfig:
     api_key: str
     num_results: int = 5
+    base_url: str = "https://serpapi.com/search"
+    timeout: float = 10.0
+    max_retries: int = 3
+    cache_ttl: int = 3600
+    # SerpApi's own request limits, separate from the OpenAI budget (0 disables a bucket)
+    requests_per_minute: int = 60
+    requests_per_hour: int = 0
+
+
+@dataclass
+class ResearchConfig:
+    deep: bool = False
+    fan_out: int = 4
+    latency_budget: float = 10.0
+    max_sources: int = 10
+    llm_query_expansion: bool = False
+    context_tokens: int = 3000  # search results packed into the synthesis prompt
+    blog_context_tokens: int = 1500  # research report packed into the blog prompt
+
+
+@dataclass
+class RateLimitConfig:
+    requests_per_minute: int = 0  # 0 disables the limit
+    requests_per_hour: int = 0
+    tokens_per_minute: int = 0  # OpenAI TPM; prompt plus max_tokens is reserved per call
+    images_per_minute: int = 0
+    max_retries: int = 5  # retries of a call the API answered with 429
+    backoff_base: float = 1.0  # seconds; jittered and doubled per retry
+    backoff_max: float = 30.0
+    backend: str = "memory"  # memory | redis (one budget shared by every replica)
+    redis_url: str = "redis://localhost:6379/0"
+    redis_prefix: str = "contentalchemy:ratelimit"
 
 
 @dataclass
@@ -50,20 +142,140 @@ class ImageConfig:
     quality: str = "standard"
 
 
+@dataclass
+class CacheConfig:
+    enabled: bool = False
+    backend: str = "memory"  # memory | sqlite | redis
+    ttl: int = 3600
+    max_size: int = 1024
+    path: str = ".cache/llm_cache.sqlite"
+    redis_url: str = "redis://localhost:6379/0"
+
+
+@dataclass
+class CheckpointConfig:
+    enabled: bool = False
+    backend: str = "sqlite"  # sqlite | memory
+    path: str = ".cache/checkpoints.sqlite"
+    max_age_days: float = 7.0  # runs untouched this long are deleted; 0 keeps them
+    keep_last: int = 0  # checkpoints kept per run, newest first; 0 keeps all (needed for full replay)
+
+
+@dataclass
+class ServiceConfig:
+    host: str = "0.0.0.0"
+    port: int = 8080
+    workers: int = 4  # generations running at once per replica
+    queue_size: int = 32  # accepted requests waiting for a worker; beyond this -> 429
+    request_timeout: float = 120.0  # seconds from acceptance, including time queued
+    max_batch_size: int = 20
+    shutdown_timeout: float = 30.0  # seconds to drain accepted work on SIGTERM
+
+
+@dataclass
+class JobsConfig:
+    backend: str = "memory"  # memory | redis
+    workers: int = 4
+    # Max running jobs per agent type; unlisted types may use every worker
+    concurrency: Dict[str, int] = field(default_factory=lambda: {"image": 1, "campaign": 2})
+    max_retries: int = 2
+    retry_backoff: float = 2.0  # seconds before the first retry, doubling after
+    result_ttl: int = 86400  # seconds finished jobs are kept (redis)
+    redis_url: str = "redis://localhost:6379/0"
+    # Hosts a job's callback_url may point at; empty disables callbacks
+    callback_hosts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MonitoringConfig:
+    enabled: bool = False  # trace runs and export metrics
+    max_traces: int = 100  # recent run traces kept in memory
+    traces_path: str = ""  # append each run's trace as a JSON line; empty disables
+
+
+@dataclass
+class QualityGateConfig:
+    enabled: bool = False  # review blog/LinkedIn drafts and repair the ones failing validation
+    max_attempts: int = 2  # repair rounds per output before it is delivered as-is
+    token_budget: int = 4000  # LLM tokens all repairs of one run may spend
+
+
+@dataclass
+class RoutingConfig:
+    confidence_threshold: float = 0.6
+    classifier_path: str = ""
+    cache_enabled: bool = False
+    cache_size: int = 5000
+    cache_path: str = ""  # persist decisions as JSON; empty keeps them in memory
+
+
 class Config:
     """Central configuration management"""
     
-    def __init__(self):
+    def __init__(self, environment: Optional[str] = None):
+        load_env_files()
+        settings = load_yaml_settings(environment)
+        self.environment = settings.get("environment", environment or "development")
+        
+        openai_settings = settings.get("openai", {})
+        fast_temperature = os.getenv("OPENAI_FAST_TEMPERATURE", openai_settings.get("fast_temperature"))
         self.openai = OpenAIConfig(
             api_key=os.getenv("OPENAI_API_KEY", ""),
             model=os.getenv("OPENAI_MODEL", "gpt-4"),
             temperature=float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
-            max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "2000"))
+            max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "2000")),
+            context_window=int(os.getenv("OPENAI_CONTEXT_WINDOW", "0")),
+            fast_model=os.getenv("OPENAI_FAST_MODEL", openai_settings.get("fast_model", "gpt-4o-mini")),
+            fast_temperature=float(fast_temperature) if fast_temperature not in (None, "") else None,
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", openai_settings.get("max_concurrency", 8))),
+            fast_max_concurrency=int(os.getenv(
+                "OPENAI_FAST_MAX_CONCURRENCY", openai_settings.get("fast_max_concurrency", 32)
+            )),
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", openai_settings.get("max_connections", 20)))
         )
         
+        serp_settings = settings.get("serp", {})
         self.serp = SERPConfig(
             api_key=os.getenv("SERP_API_KEY", ""),
-            num_results=int(os.getenv("SERP_NUM_RESULTS", "5"))
+            num_results=int(os.getenv("SERP_NUM_RESULTS", serp_settings.get("num_results", 5))),
+            base_url=os.getenv("SERP_API_URL", serp_settings.get("base_url", "https://serpapi.com/search")),
+            timeout=float(os.getenv("SERP_TIMEOUT", serp_settings.get("timeout", 10))),
+            max_retries=int(os.getenv("SERP_MAX_RETRIES", serp_settings.get("max_retries", 3))),
+            cache_ttl=int(os.getenv("SERP_CACHE_TTL", serp_settings.get("cache_ttl", 3600))),
+            requests_per_minute=int(os.getenv("SERP_REQUESTS_PER_MINUTE", serp_settings.get("requests_per_minute", 60))),
+            requests_per_hour=int(os.getenv("SERP_REQUESTS_PER_HOUR", serp_settings.get("requests_per_hour", 0)))
+        )
+        
+        research_settings = settings.get("research", {})
+        self.research = ResearchConfig(
+            deep=_env_bool("RESEARCH_DEEP", research_settings.get("deep", False)),
+            fan_out=int(os.getenv("RESEARCH_FAN_OUT", research_settings.get("fan_out", 4))),
+            latency_budget=float(os.getenv("RESEARCH_LATENCY_BUDGET", research_settings.get("latency_budget", 10.0))),
+            max_sources=int(os.getenv("RESEARCH_MAX_SOURCES", research_settings.get("max_sources", 10))),
+            llm_query_expansion=_env_bool(
+                "RESEARCH_LLM_QUERY_EXPANSION", research_settings.get("llm_query_expansion", False)
+            ),
+            context_tokens=int(os.getenv("RESEARCH_CONTEXT_TOKENS", research_settings.get("context_tokens", 3000))),
+            blog_context_tokens=int(os.getenv(
+                "RESEARCH_BLOG_CONTEXT_TOKENS", research_settings.get("blog_context_tokens", 1500)
+            ))
+        )
+        
+        rate_settings = settings.get("rate_limits", {})
+        self.rate_limits = RateLimitConfig(
+            requests_per_minute=int(os.getenv("RATE_LIMIT_PER_MINUTE", rate_settings.get("requests_per_minute", 0))),
+            requests_per_hour=int(os.getenv("RATE_LIMIT_PER_HOUR", rate_settings.get("requests_per_hour", 0))),
+            tokens_per_minute=int(os.getenv(
+                "RATE_LIMIT_TOKENS_PER_MINUTE", rate_settings.get("tokens_per_minute", 0)
+            )),
+            images_per_minute=int(os.getenv(
+                "RATE_LIMIT_IMAGES_PER_MINUTE", rate_settings.get("images_per_minute", 0)
+            )),
+            max_retries=int(os.getenv("RATE_LIMIT_MAX_RETRIES", rate_settings.get("max_retries", 5))),
+            backoff_base=float(os.getenv("RATE_LIMIT_BACKOFF_BASE", rate_settings.get("backoff_base", 1.0))),
+            backoff_max=float(os.getenv("RATE_LIMIT_BACKOFF_MAX", rate_settings.get("backoff_max", 30.0))),
+            backend=os.getenv("RATE_LIMIT_BACKEND", rate_settings.get("backend", "memory")),
+            redis_url=os.getenv("REDIS_URL", rate_settings.get("redis_url", "redis://localhost:6379/0"))
         )
         
         self.image = ImageConfig(
@@ -72,6 +284,83 @@ class Config:
             quality=os.getenv("IMAGE_QUALITY", "standard")
         )
         
+        cache_settings = settings.get("cache", {})
+        self.cache = CacheConfig(
+            enabled=_env_bool("CACHE_ENABLED", cache_settings.get("enabled", False)),
+            backend=os.getenv("CACHE_BACKEND", cache_settings.get("backend", "memory")),
+            ttl=int(os.getenv("CACHE_TTL", cache_settings.get("ttl", 3600))),
+            max_size=int(os.getenv("CACHE_MAX_SIZE", cache_settings.get("max_size", 1024))),
+            path=os.getenv("CACHE_PATH", cache_settings.get("path", ".cache/llm_cache.sqlite")),
+            redis_url=os.getenv("REDIS_URL", cache_settings.get("redis_url", "redis://localhost:6379/0"))
+        )
+        
+        routing_settings = settings.get("routing", {})
+        self.routing = RoutingConfig(
+            confidence_threshold=float(os.getenv(
+                "ROUTING_CONFIDENCE_THRESHOLD", routing_settings.get("confidence_threshold", 0.6)
+            )),
+            classifier_path=os.getenv("ROUTING_CLASSIFIER_PATH", routing_settings.get("classifier_path", "")),
+            cache_enabled=_env_bool("ROUTING_CACHE_ENABLED", routing_settings.get("cache_enabled", False)),
+            cache_size=int(os.getenv("ROUTING_CACHE_SIZE", routing_settings.get("cache_size", 5000))),
+            cache_path=os.getenv("ROUTING_CACHE_PATH", routing_settings.get("cache_path", ""))
+        )
+        
+        checkpoint_settings = settings.get("checkpoints", {})
+        self.checkpoints = CheckpointConfig(
+            enabled=_env_bool("CHECKPOINT_ENABLED", checkpoint_settings.get("enabled", False)),
+            backend=os.getenv("CHECKPOINT_BACKEND", checkpoint_settings.get("backend", "sqlite")),
+            path=os.getenv("CHECKPOINT_PATH", checkpoint_settings.get("path", ".cache/checkpoints.sqlite")),
+            max_age_days=float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", checkpoint_settings.get("max_age_days", 7.0))),
+            keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", checkpoint_settings.get("keep_last", 0)))
+        )
+        
+        service_settings = settings.get("service", {})
+        self.service = ServiceConfig(
+            host=os.getenv("SERVICE_HOST", service_settings.get("host", "0.0.0.0")),
+            port=int(os.getenv("SERVICE_PORT", service_settings.get("port", 8080))),
+            workers=int(os.getenv("SERVICE_WORKERS", service_settings.get("workers", 4))),
+            queue_size=int(os.getenv("SERVICE_QUEUE_SIZE", service_settings.get("queue_size", 32))),
+            request_timeout=float(os.getenv(
+                "SERVICE_REQUEST_TIMEOUT", service_settings.get("request_timeout", 120.0)
+            )),
+            max_batch_size=int(os.getenv("SERVICE_MAX_BATCH_SIZE", service_settings.get("max_batch_size", 20))),
+            shutdown_timeout=float(os.getenv(
+                "SERVICE_SHUTDOWN_TIMEOUT", service_settings.get("shutdown_timeout", 30.0)
+            ))
+        )
+        
+        jobs_settings = settings.get("jobs", {})
+        self.jobs = JobsConfig(
+            backend=os.getenv("JOBS_BACKEND", jobs_settings.get("backend", "memory")),
+            workers=int(os.getenv("JOBS_WORKERS", jobs_settings.get("workers", 4))),
+            concurrency=_env_int_map("JOBS_CONCURRENCY", jobs_settings.get("concurrency", {"image": 1, "campaign": 2})),
+            max_retries=int(os.getenv("JOBS_MAX_RETRIES", jobs_settings.get("max_retries", 2))),
+            retry_backoff=float(os.getenv("JOBS_RETRY_BACKOFF", jobs_settings.get("retry_backoff", 2.0))),
+            result_ttl=int(os.getenv("JOBS_RESULT_TTL", jobs_settings.get("result_ttl", 86400))),
+            redis_url=os.getenv("REDIS_URL", jobs_settings.get("redis_url", "redis://localhost:6379/0")),
+            callback_hosts=_env_list("JOBS_CALLBACK_HOSTS", jobs_settings.get("callback_hosts", []))
+        )
+        
+        monitoring_settings = settings.get("monitoring", {})
+        self.monitoring = MonitoringConfig(
+            enabled=_env_bool("MONITORING_ENABLED", monitoring_settings.get("enabled", False)),
+            max_traces=int(os.getenv("MONITORING_MAX_TRACES", monitoring_settings.get("max_traces", 100))),
+            traces_path=os.getenv("MONITORING_TRACES_PATH", monitoring_settings.get("traces_path", ""))
+        )
+        
+        quality_gate_settings = settings.get("quality_gate", {})
+        self.quality_gate = QualityGateConfig(
+            enabled=_env_bool("QUALITY_GATE_ENABLED", quality_gate_settings.get("enabled", False)),
+            max_attempts=int(os.getenv("QUALITY_GATE_MAX_ATTEMPTS", quality_gate_settings.get("max_attempts", 2))),
+            token_budget=int(os.getenv("QUALITY_GATE_TOKEN_BUDGET", quality_gate_settings.get("token_budget", 4000)))
+        )
+        
+        # Ask for keywords and blog body in one LLM round-trip
+        self.blog_single_call = os.getenv("BLOG_SINGLE_CALL", "false").lower() == "true"
+        
+        # Wall-clock allowance for scoring each finished blog/post inline (0 disables it)
+        self.metrics_budget_ms = float(os.getenv("CONTENT_METRICS_BUDGET_MS", "5"))
+        
         self.debug = os.getenv("DEBUG", "false").lower() == "true"
     
     def validate(self) -> bool:
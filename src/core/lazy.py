@@ -0,0 +1,48 @@
+"""
+Thread-safe lazily built attributes for expensive resources
+"""
+import threading
+from typing import Any, Callable, Optional
+
+
+class lazy_resource:
+    """Like functools.cached_property, but builds at most once across threads.
+
+    Shared objects (e.g. the process-wide workflow) are first touched by
+    several request threads at once; the per-instance lock keeps them from
+    each building their own copy. Assigning the attribute replaces the value,
+    which is how tests swap in fakes.
+    """
+
+    def __init__(self, builder: Callable[[Any], Any]):
+        self.builder = builder
+        self.name: Optional[str] = None
+        self.__doc__ = builder.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @staticmethod
+    def _lock(instance: Any) -> threading.RLock:
+        # Re-entrant: one resource's builder may touch another lazy resource
+        lock = instance.__dict__.get("_lazy_lock")
+        if lock is None:
+            lock = instance.__dict__.setdefault("_lazy_lock", threading.RLock())
+        return lock
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        with self._lock(instance):
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.builder(instance)
+            return instance.__dict__[self.name]
+
+
+def is_built(instance: Any, name: str) -> bool:
+    """Whether a lazy_resource attribute has been built yet"""
+    return name in instance.__dict__
@@ -0,0 +1,394 @@
+"""
+LLM registry: per-task model tiers over a shared HTTP connection pool
+
+Short classification-style calls (routing, keywords, hashtags, query expansion)
+go to a fast, cheap model; long-form generation stays on the big model.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from src.core.cache import CachedLLM, create_cache_backend
+from src.core.lazy import lazy_resource
+from src.core.rate_limit import OpenAIRateLimiter
+from src.core.telemetry import accumulate, estimate_cost, span
+from src.utils.prompt_budget import count_tokens
+
+
+FAST = "fast"
+BIG = "big"
+
+# Which tier serves each agent task
+TASK_TIERS = {
+    "routing": FAST,
+    "keywords": FAST,
+    "hashtags": FAST,
+    "query_expansion": FAST,
+    "research": BIG,
+    "blog": BIG,
+    "linkedin": BIG,
+    "image_prompt": BIG,
+    "strategy": BIG,
+}
+
+
+def create_chat_model(**kwargs: Any) -> Any:
+    """ChatOpenAI client; langchain_openai is imported on first use since it is slow to load"""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(**kwargs)
+
+
+class BoundedLLM:
+    """Caps how many calls a chat model has in flight, for both threads and event loops"""
+
+    def __init__(self, llm: Any, max_concurrency: int):
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        # asyncio semaphores belong to the loop they are first awaited on
+        self._async_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                # Drop semaphores of loops that have since been closed
+                self._async_semaphores = {l: s for l, s in self._async_semaphores.items() if not l.is_closed()}
+                semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        started = time.perf_counter()
+        with self._semaphore:
+            accumulate("queue_wait", time.perf_counter() - started)
+            yield
+
+    @asynccontextmanager
+    async def _async_slot(self) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        async with self._async_semaphore():
+            accumulate("queue_wait", time.perf_counter() - started)
+            yield
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        with self._slot():
+            return self.llm.invoke(messages, **kwargs)
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        async with self._async_slot():
+            return await self.llm.ainvoke(messages, **kwargs)
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[Any]:
+        with self._slot():
+            yield from self.llm.stream(messages, **kwargs)
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        async with self._async_slot():
+            async for chunk in self.llm.astream(messages, **kwargs):
+                yield chunk
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens OpenAI billed for a response, when the client reports it"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens")
+
+
+def _token_split(response: Any) -> Optional[Tuple[int, int]]:
+    """(prompt, completion) tokens reported for a response, if any"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and "input_tokens" in usage:
+        return usage["input_tokens"], usage.get("output_tokens", 0)
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    if "prompt_tokens" in token_usage:
+        return token_usage["prompt_tokens"], token_usage.get("completion_tokens", 0)
+    return None
+
+
+class InstrumentedLLM:
+    """Records every call as an ``llm.<tier>`` span of the current run's trace.
+
+    Spans carry prompt/completion tokens (reported usage, else counted), the
+    estimated cost, and what inner layers add: ``cache_hit`` from the cache,
+    ``queue_wait`` from the rate limiter and concurrency cap.
+    """
+
+    def __init__(self, llm: Any, tier: str, model: str):
+        self.llm = llm
+        self.tier = tier
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _span(self) -> Any:
+        return span(f"llm.{self.tier}", "llm", tier=self.tier, model=self.model)
+
+    def _record(self, current: Any, messages: List[Any], response: Any = None, text: Optional[str] = None) -> None:
+        if not current.recording:
+            return
+        split = _token_split(response)
+        if split is None:
+            if text is None:
+                text = str(getattr(response, "content", ""))
+            split = (sum(count_tokens(str(getattr(m, "content", m)), self.model) for m in messages),
+                     count_tokens(text, self.model))
+        prompt_tokens, completion_tokens = split
+        # Cache hits cost nothing
+        cost = 0.0 if current.attributes.get("cache_hit") else estimate_cost(self.model, *split)
+        current.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=round(cost, 6))
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        with self._span() as current:
+            response = self.llm.invoke(messages, **kwargs)
+            self._record(current, messages, response)
+            return response
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        with self._span() as current:
+            response = await self.llm.ainvoke(messages, **kwargs)
+            self._record(current, messages, response)
+            return response
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[Any]:
+        with self._span() as current:
+            text = []
+            for chunk in self.llm.stream(messages, **kwargs):
+                text.append(str(getattr(chunk, "content", "")))
+                yield chunk
+            self._record(current, messages, text="".join(text))
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        with self._span() as current:
+            text = []
+            async for chunk in self.llm.astream(messages, **kwargs):
+                text.append(str(getattr(chunk, "content", "")))
+                yield chunk
+            self._record(current, messages, text="".join(text))
+
+
+class RateLimitedLLM:
+    """Draws every call from the shared OpenAIRateLimiter budget and retries 429s.
+
+    A call reserves its prompt tokens plus `max_tokens` (what OpenAI counts
+    against TPM up front); the reservation is corrected to the real usage after.
+    Streams only retry a 429 raised before the first chunk.
+    """
+
+    def __init__(self, llm: Any, limiter: OpenAIRateLimiter, model: str = "gpt-4", max_tokens: int = 0):
+        self.llm = llm
+        self.limiter = limiter
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _prompt_tokens(self, messages: List[Any]) -> int:
+        return sum(count_tokens(str(getattr(m, "content", m)), self.model) for m in messages)
+
+    def _used(self, prompt_tokens: int, response: Any) -> int:
+        used = _usage_tokens(response)
+        if used is None:
+            used = prompt_tokens + count_tokens(str(getattr(response, "content", "")), self.model)
+        return used
+
+    def invoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        prompt_tokens = self._prompt_tokens(messages)
+        reserved = prompt_tokens + self.max_tokens
+        response = self.limiter.call(lambda: self.llm.invoke(messages, **kwargs), tokens=reserved)
+        self.limiter.settle(reserved, self._used(prompt_tokens, response))
+        return response
+
+    async def ainvoke(self, messages: List[Any], **kwargs: Any) -> Any:
+        prompt_tokens = self._prompt_tokens(messages)
+        reserved = prompt_tokens + self.max_tokens
+        response = await self.limiter.acall(lambda: self.llm.ainvoke(messages, **kwargs), tokens=reserved)
+        self.limiter.settle(reserved, self._used(prompt_tokens, response))
+        return response
+
+    def stream(self, messages: List[Any], **kwargs: Any) -> Iterator[Any]:
+        prompt_tokens = self._prompt_tokens(messages)
+        reserved = prompt_tokens + self.max_tokens
+
+        def start() -> Tuple[Iterator[Any], List[Any]]:
+            chunks = iter(self.llm.stream(messages, **kwargs))
+            try:
+                return chunks, [next(chunks)]
+            except StopIteration:
+                return chunks, []
+
+        chunks, first = self.limiter.call(start, tokens=reserved)
+        text = [str(getattr(chunk, "content", "")) for chunk in first]
+        yield from first
+        for chunk in chunks:
+            text.append(str(getattr(chunk, "content", "")))
+            yield chunk
+        self.limiter.settle(reserved, prompt_tokens + count_tokens("".join(text), self.model))
+
+    async def astream(self, messages: List[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        prompt_tokens = self._prompt_tokens(messages)
+        reserved = prompt_tokens + self.max_tokens
+
+        async def start() -> Tuple[AsyncIterator[Any], List[Any]]:
+            chunks = self.llm.astream(messages, **kwargs).__aiter__()
+            try:
+                return chunks, [await chunks.__anext__()]
+            except StopAsyncIteration:
+                return chunks, []
+
+        chunks, first = await self.limiter.acall(start, tokens=reserved)
+        text = [str(getattr(chunk, "content", "")) for chunk in first]
+        for chunk in first:
+            yield chunk
+        async for chunk in chunks:
+            text.append(str(getattr(chunk, "content", "")))
+            yield chunk
+        self.limiter.settle(reserved, prompt_tokens + count_tokens("".join(text), self.model))
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """AsyncClient that sends through one connection pool per running event loop.
+
+    httpx connections belong to the loop that opened them, so one shared
+    AsyncClient breaks once a second loop uses it (a later asyncio.run, a
+    thread with its own loop). Requests are still built here; send() goes to
+    the current loop's client, created on first use.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._client_kwargs = kwargs
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._loop_lock = threading.Lock()
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._loop_clients[loop] = httpx.AsyncClient(**self._client_kwargs)
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        return await self._loop_client().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close this loop's pool now and other running loops' pools on their own loop"""
+        with self._loop_lock:
+            clients = list(self._loop_clients.items())
+            self._loop_clients.clear()
+        current = asyncio.get_running_loop()
+        for loop, client in clients:
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            # Pools of finished loops hold no usable connections and go with their loop
+        await super().aclose()
+
+
+class LLMRegistry:
+    """Builds one bounded (and optionally rate-limited, cached and traced) client per tier.
+
+    Tiers configured with the same model and temperature share one underlying
+    client; every client shares the same httpx connection pools (one async
+    pool per event loop, see LoopLocalAsyncClient).
+    """
+
+    def __init__(self, config, client_factory: Optional[Callable[..., Any]] = None):
+        self.config = config
+        self.client_factory = client_factory or create_chat_model
+        limits = httpx.Limits(max_connections=config.openai.max_connections,
+                              max_keepalive_connections=config.openai.max_connections)
+        self.http_client = httpx.Client(limits=limits)
+        self.http_async_client = LoopLocalAsyncClient(limits=limits)
+        self.cache_backend = create_cache_backend(config.cache) if config.cache.enabled else None
+        # One budget for every tier (and the image agent), see OpenAIRateLimiter
+        self.rate_limiter = OpenAIRateLimiter.from_config(config.rate_limits)
+
+        self._clients: Dict[Tuple[str, float], Any] = {}
+        # Tiers are built on first use so constructing a registry stays cheap
+        self.tiers: Dict[str, Any] = {}
+
+    def _client(self, model: str, temperature: float) -> Any:
+        key = (model, temperature)
+        if key not in self._clients:
+            self._clients[key] = self.client_factory(
+                api_key=self.config.openai.api_key,
+                model=model,
+                temperature=temperature,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+            )
+        return self._clients[key]
+
+    def _build(self, model: str, temperature: float, max_concurrency: int) -> Any:
+        llm = BoundedLLM(self._client(model, temperature), max_concurrency)
+        if self.rate_limiter is not None:
+            # Outside the concurrency cap so calls waiting for budget do not hold a slot
+            llm = RateLimitedLLM(llm, self.rate_limiter, model, self.config.openai.max_tokens)
+        if self.cache_backend is not None:
+            # Cache outermost so hits never wait for a concurrency slot
+            llm = CachedLLM(llm, self.cache_backend)
+        return llm
+
+    @lazy_resource
+    def big(self) -> Any:
+        openai_config = self.config.openai
+        return self._tier(BIG, openai_config.model, openai_config.temperature, openai_config.max_concurrency)
+
+    @lazy_resource
+    def fast(self) -> Any:
+        openai_config = self.config.openai
+        temperature = openai_config.temperature if openai_config.fast_temperature is None \
+            else openai_config.fast_temperature
+        return self._tier(FAST, openai_config.fast_model or openai_config.model, temperature,
+                          openai_config.fast_max_concurrency)
+
+    def _tier(self, name: str, model: str, temperature: float, max_concurrency: int) -> Any:
+        llm = self._build(model, temperature, max_concurrency)
+        if self.config.monitoring.enabled:
+            # Outermost so cache hits are traced too
+            llm = InstrumentedLLM(llm, name, model)
+        self.tiers[name] = llm
+        return llm
+
+    def for_task(self, task: str) -> Any:
+        """Client for an agent task (see TASK_TIERS); unknown tasks get the big model"""
+        return self.fast if TASK_TIERS.get(task, BIG) == FAST else self.big
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Combined hit/miss counters across tiers (empty when caching is disabled)"""
+        tiers = [llm.llm if isinstance(llm, InstrumentedLLM) else llm for llm in list(self.tiers.values())]
+        caches = [llm for llm in tiers if isinstance(llm, CachedLLM)]
+        if not caches:
+            return {}
+        hits = sum(c.hits for c in caches)
+        misses = sum(c.misses for c in caches)
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+
+    def close(self) -> None:
+        """Close the sync connection pool; async callers should use aclose(), which closes both"""
+        self.http_client.close()
+
+    async def aclose(self) -> None:
+        """Close both shared connection pools"""
+        self.http_client.close()
+        await self.http_async_client.aclose()
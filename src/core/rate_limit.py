@@ -0,0 +1,320 @@
+"""
+Token-bucket rate limiting
+
+`RateLimiter` throttles a single upstream (SERP). `OpenAIRateLimiter` is the
+process-wide budget every OpenAI call draws from: requests/min, tokens/min and
+images/min, with a coordinated backoff when the API answers 429. Its buckets can
+live in Redis so several replicas share one budget.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from src.core.telemetry import accumulate
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, refilled at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: int) -> "TokenBucket":
+        return cls(rate=limit / 60.0, capacity=limit)
+
+    @classmethod
+    def per_hour(cls, limit: int) -> "TokenBucket":
+        return cls(rate=limit / 3600.0, capacity=limit)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now (possibly going into debt) and return seconds to wait"""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate if self.rate > 0 else float("inf")
+
+    def refund(self, tokens: float) -> None:
+        """Return tokens that were reserved but not used"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+
+class RedisTokenBucket:
+    """TokenBucket whose level lives in Redis, so every replica draws from one budget.
+
+    The refill-and-take happens in a Lua script using the Redis clock, which keeps
+    it atomic across processes and immune to clock skew between hosts.
+    """
+
+    # Returns the wait as a string: Redis truncates Lua numbers to integers
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local tokens = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local level = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    level = math.min(capacity, math.min(capacity, level + math.max(0, now - updated) * rate) - tokens)
+    redis.call('HSET', KEYS[1], 'tokens', tostring(level), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    if level >= 0 then return '0' end
+    return tostring(-level / rate)
+    """
+
+    def __init__(self, client: Any, key: str, rate: float, capacity: Optional[float] = None):
+        self.client = client
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._script = client.register_script(self.SCRIPT)
+
+    @classmethod
+    def per_minute(cls, client: Any, key: str, limit: int) -> "RedisTokenBucket":
+        return cls(client, key, rate=limit / 60.0, capacity=limit)
+
+    @classmethod
+    def per_hour(cls, client: Any, key: str, limit: int) -> "RedisTokenBucket":
+        return cls(client, key, rate=limit / 3600.0, capacity=limit)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        return float(self._script(keys=[self.key], args=[self.rate, self.capacity, tokens]))
+
+    def refund(self, tokens: float) -> None:
+        self._script(keys=[self.key], args=[self.rate, self.capacity, -tokens])
+
+
+class RateLimiter:
+    """All-of limiter over several buckets (e.g. per-minute and per-hour)"""
+
+    def __init__(self, buckets: List[TokenBucket]):
+        self.buckets = buckets
+
+    @classmethod
+    def from_config(cls, rate_limits) -> Optional["RateLimiter"]:
+        """Build from a RateLimitConfig; None when no limits are configured"""
+        buckets = []
+        if rate_limits.requests_per_minute:
+            buckets.append(TokenBucket.per_minute(rate_limits.requests_per_minute))
+        if rate_limits.requests_per_hour:
+            buckets.append(TokenBucket.per_hour(rate_limits.requests_per_hour))
+        return cls(buckets) if buckets else None
+
+    def _reserve(self, tokens: float) -> float:
+        return max((bucket.reserve(tokens) for bucket in self.buckets), default=0.0)
+
+    def refund(self, tokens: float) -> None:
+        for bucket in self.buckets:
+            bucket.refund(tokens)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available in every bucket; returns seconds waited"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for an OpenAI 429, whether raised by the SDK or wrapped by langchain"""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from the 429's Retry-After header"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _LocalPause:
+    """Deadline before which nobody in this process calls the API"""
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def hold(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self._resume_at - time.monotonic())
+
+
+class _RedisPause:
+    """Same as _LocalPause, shared by every replica through a key with a TTL"""
+
+    def __init__(self, client: Any, key: str):
+        self.client = client
+        self.key = key
+
+    def hold(self, seconds: float) -> None:
+        # Only the first 429 of a burst sets the pause; later ones fall inside it
+        self.client.set(self.key, "1", px=max(1, int(seconds * 1000)), nx=True)
+
+    def remaining(self) -> float:
+        return max(0.0, self.client.pttl(self.key) / 1000.0)
+
+
+class OpenAIRateLimiter:
+    """Shared request/token budget for every OpenAI call (chat and images).
+
+    Callers reserve their cost up front and sleep for the debt they created, so
+    the budget is handed out in arrival order: a big prompt cannot be starved by
+    a stream of small ones, and nobody jumps the queue. When the API still
+    answers 429 the whole limiter pauses for the server's Retry-After, and the
+    failed call retries after its own jittered exponential backoff.
+    """
+
+    def __init__(self, requests: Optional[RateLimiter] = None, tokens: Optional[RateLimiter] = None,
+                 images: Optional[RateLimiter] = None, max_retries: int = 5, backoff_base: float = 1.0,
+                 backoff_max: float = 30.0, pause: Any = None):
+        self.requests = requests
+        self.tokens = tokens
+        self.images = images
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pause = pause or _LocalPause()
+        self.throttled = 0  # 429s seen
+        self.waited = 0.0  # seconds callers spent waiting for budget
+
+    @classmethod
+    def from_config(cls, rate_limits) -> Optional["OpenAIRateLimiter"]:
+        """Build from a RateLimitConfig; None when no OpenAI limits are configured"""
+        if not (rate_limits.requests_per_minute or rate_limits.requests_per_hour
+                or rate_limits.tokens_per_minute or rate_limits.images_per_minute):
+            return None
+        if rate_limits.backend == "redis":
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("Redis rate limiting requires the 'redis' package (pip install redis)") from e
+            client = redis.Redis.from_url(rate_limits.redis_url, decode_responses=True)
+            prefix = rate_limits.redis_prefix
+            per_minute = lambda name, limit: RedisTokenBucket.per_minute(client, f"{prefix}:{name}", limit)
+            per_hour = lambda name, limit: RedisTokenBucket.per_hour(client, f"{prefix}:{name}", limit)
+            pause = _RedisPause(client, f"{prefix}:pause")
+        elif rate_limits.backend == "memory":
+            per_minute = lambda name, limit: TokenBucket.per_minute(limit)
+            per_hour = lambda name, limit: TokenBucket.per_hour(limit)
+            pause = None
+        else:
+            raise ValueError(f"Unknown rate limit backend: {rate_limits.backend}")
+
+        def limiter(*specs):
+            buckets = [make(name, limit) for make, name, limit in specs if limit]
+            return RateLimiter(buckets) if buckets else None
+
+        return cls(
+            requests=limiter((per_minute, "requests_minute", rate_limits.requests_per_minute),
+                             (per_hour, "requests_hour", rate_limits.requests_per_hour)),
+            tokens=limiter((per_minute, "tokens_minute", rate_limits.tokens_per_minute)),
+            images=limiter((per_minute, "images_minute", rate_limits.images_per_minute)),
+            max_retries=rate_limits.max_retries,
+            backoff_base=rate_limits.backoff_base,
+            backoff_max=rate_limits.backoff_max,
+            pause=pause,
+        )
+
+    def _reserve(self, tokens: float, image: bool) -> float:
+        wait = self.pause.remaining()
+        for limiter, cost in ((self.requests, 1), (self.tokens, tokens), (self.images, 1 if image else 0)):
+            if limiter is not None and cost:
+                wait = max(wait, limiter._reserve(cost))
+        self.waited += wait
+        return wait
+
+    def acquire(self, tokens: float = 0, image: bool = False) -> float:
+        """Block until one request (and `tokens` tokens, or one image) fits the budget"""
+        wait = self._reserve(tokens, image)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 0, image: bool = False) -> float:
+        wait = self._reserve(tokens, image)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, reserved: float, used: Optional[float]) -> None:
+        """Correct a token reservation once the real usage is known"""
+        if self.tokens is None or used is None or used == reserved:
+            return
+        if used < reserved:
+            self.tokens.refund(reserved - used)
+        else:
+            self.tokens._reserve(used - reserved)
+
+    def _throttled(self, error: BaseException, attempt: int, tokens: float) -> float:
+        """Record a 429 and return how long this caller should back off"""
+        self.throttled += 1
+        accumulate("throttled", 1)
+        if tokens and self.tokens is not None:
+            self.tokens.refund(tokens)
+        self.pause.hold(retry_after(error) or self.backoff_base)
+        # Full jitter so callers throttled together do not retry together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0, image: bool = False) -> Any:
+        """Run `fn` inside the budget, retrying 429s up to `max_retries` times"""
+        for attempt in range(self.max_retries + 1):
+            accumulate("queue_wait", self.acquire(tokens, image))
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                delay = self._throttled(e, attempt, tokens)
+                time.sleep(delay)
+                accumulate("queue_wait", delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], tokens: float = 0, image: bool = False) -> Any:
+        for attempt in range(self.max_retries + 1):
+            accumulate("queue_wait", await self.acquire_async(tokens, image))
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                delay = self._throttled(e, attempt, tokens)
+                await asyncio.sleep(delay)
+                accumulate("queue_wait", delay)
+
+    def stats(self) -> dict:
+        return {"throttled": self.throttled, "waited": round(self.waited, 3), "paused": self.pause.remaining()}
@@ -0,0 +1,135 @@
+"""
+Routing decision memoization keyed on normalized intent templates
+
+"Write a blog about X" and "write a blog about Y" share the template
+"write a blog", so repeated intents are routed by a dictionary lookup.
+
+A persisted cache file records the `version` it was written under (a hash of
+the routing rules and settings); entries from any other version are dropped
+on load, so edited rules never serve stale decisions.
+"""
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+# Everything after the first topic preposition is treated as the topic noun phrase
+TOPIC_PATTERN = re.compile(r"\b(?:about|on|for|regarding|covering|around|in|of)\b")
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> Tuple[str, str]:
+    """Split a query into (intent template, topic phrase)"""
+    text = WHITESPACE_PATTERN.sub(" ", NON_WORD_PATTERN.sub(" ", query.lower())).strip()
+    match = TOPIC_PATTERN.search(text)
+    if not match or match.start() == 0:
+        return text, ""
+    return text[:match.start()].strip(), text[match.start():].strip()
+
+
+# Persistent caches still alive at exit; one atexit hook flushes them all
+_persistent_caches: "weakref.WeakSet[RoutingCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_persistent_caches() -> None:
+    for cache in list(_persistent_caches):
+        cache.flush()
+
+
+class RoutingCache:
+    """Bounded LRU of template -> routing decision, persisted as JSON"""
+
+    def __init__(self, max_size: int = 5000, path: Optional[str] = None, flush_every: int = 20,
+                 version: str = ""):
+        self.max_size = max_size
+        self.path = path
+        self.flush_every = flush_every
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = 0
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            _persistent_caches.add(self)
+
+    def get(self, template: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            decision = self._entries.get(template)
+            if decision is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(template)
+            self.hits += 1
+            return dict(decision)
+
+    def put(self, template: str, decision: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[template] = {
+                "primary_agent": decision["primary_agent"],
+                "confidence": decision.get("confidence"),
+            }
+            self._entries.move_to_end(template)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            should_flush = self.path and self._dirty >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as e:
+            print(f"Routing cache load error: {e}")
+            return
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            # Written under other routing rules (or an older file format)
+            return
+        entries = data.get("entries") or {}
+        with self._lock:
+            for template, decision in list(entries.items())[-self.max_size:]:
+                self._entries[template] = decision
+
+    def flush(self) -> None:
+        """Write entries to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = 0
+        target = Path(self.path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per writer, so concurrent flushes never interleave
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=target.parent, prefix=f"{target.name}.",
+                                         suffix=".tmp", delete=False) as fh:
+            json.dump({"version": self.version, "entries": snapshot}, fh)
+        try:
+            os.replace(fh.name, target)
+        except OSError:
+            os.unlink(fh.name)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,157 @@
+"""
+Local query routing engine - decides the target agent without an LLM call
+
+Weighted keyword rules are compiled into one Aho–Corasick matcher and scored
+in a single pass over the query's words. An optional TF-IDF + logistic
+regression classifier (scikit-learn) can be trained, persisted to disk and
+consulted when keywords are ambiguous.
+
+Train a classifier from a JSONL file of {"query": ..., "agent": ...} rows:
+    python -m src.core.routing_engine train examples.jsonl models/router.pkl
+"""
+import hashlib
+import json
+import math
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.keyword_matcher import compile_keywords
+
+
+# (keyword phrase, weight) per agent; matched on whole words, a trailing "*" matches any word ending
+DEFAULT_ROUTING_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "research": [
+        ("research*", 3.0), ("analys*", 2.0), ("analyz*", 2.0), ("investigat*", 2.0), ("study*", 1.5),
+        ("studies", 1.5), ("explore*", 1.5), ("find information*", 2.5), ("report*", 1.5), ("trend*", 1.0),
+    ],
+    "blog": [
+        ("blog*", 3.0), ("article*", 3.0), ("essay*", 2.5), ("guide*", 2.0),
+        ("tutorial*", 2.0), ("post", 0.5), ("posts", 0.5), ("write*", 0.5),
+    ],
+    "linkedin": [
+        ("linkedin*", 4.0), ("professional post", 2.5), ("professional posts", 2.5), ("social*", 2.0),
+        ("networking*", 2.0),
+    ],
+    "image": [
+        ("image*", 3.0), ("picture*", 3.0), ("illustration*", 3.0), ("photo*", 3.0),
+        ("graphic*", 2.5), ("visual*", 2.0),
+    ],
+    "strategist": [
+        ("organise*", 2.0), ("organize*", 2.0), ("format*", 2.0), ("structure*", 2.0), ("outline*", 2.0),
+    ],
+}
+
+DEFAULT_AGENT = "research"
+DEFAULT_CONFIDENCE = 0.5
+# Total keyword weight at which evidence is considered ~86% saturated
+EVIDENCE_SCALE = 1.5
+
+
+class RoutingClassifier:
+    """TF-IDF + logistic regression intent classifier persisted with pickle"""
+
+    def __init__(self, pipeline: Any):
+        self.pipeline = pipeline
+
+    @classmethod
+    def train(cls, queries: Sequence[str], labels: Sequence[str]) -> "RoutingClassifier":
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.pipeline import make_pipeline
+        except ImportError as e:
+            raise ImportError("RoutingClassifier requires scikit-learn (pip install scikit-learn)") from e
+
+        pipeline = make_pipeline(
+            TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+            LogisticRegression(max_iter=1000),
+        )
+        pipeline.fit(list(queries), list(labels))
+        return cls(pipeline)
+
+    def predict_proba(self, query: str) -> Dict[str, float]:
+        probabilities = self.pipeline.predict_proba([query])[0]
+        return dict(zip(self.pipeline.classes_, (float(p) for p in probabilities)))
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fh:
+            pickle.dump(self.pipeline, fh)
+
+    @classmethod
+    def load(cls, path: str) -> "RoutingClassifier":
+        with open(path, "rb") as fh:
+            return cls(pickle.load(fh))
+
+
+class RoutingEngine:
+    """Scores queries against weighted keyword rules, optionally backed by a classifier"""
+
+    def __init__(self, rules: Optional[Dict[str, List[Tuple[str, float]]]] = None,
+                 classifier: Optional[RoutingClassifier] = None):
+        self.rules = rules or DEFAULT_ROUTING_RULES
+        self.classifier = classifier
+        self._weights: Dict[str, Tuple[str, float]] = {
+            phrase: (agent, weight) for agent, entries in self.rules.items() for phrase, weight in entries
+        }
+        self._matcher = compile_keywords(self._weights)
+
+    def fingerprint(self, *settings: Any) -> str:
+        """Short hash of the rules (plus any settings that change decisions), for cache versioning"""
+        payload = json.dumps([sorted((agent, sorted(entries)) for agent, entries in self.rules.items()),
+                              type(self.classifier).__name__, *settings], default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+    def keyword_scores(self, query: str) -> Dict[str, float]:
+        """Sum rule weights per agent in a single scan of the query"""
+        scores: Dict[str, float] = {}
+        # Leftmost-longest, so phrases win over the words inside them
+        for _, _, phrase in self._matcher.matches(query, overlapping=False):
+            agent, weight = self._weights[phrase]
+            scores[agent] = scores.get(agent, 0.0) + weight
+        return scores
+
+    @staticmethod
+    def _confidence(scores: Dict[str, float]) -> Tuple[str, float]:
+        top_agent = max(scores, key=scores.get)
+        top = scores[top_agent]
+        share = top / sum(scores.values())
+        evidence = 1 - math.exp(-top / EVIDENCE_SCALE)
+        return top_agent, share * evidence
+
+    def classify(self, query: str) -> Dict[str, Any]:
+        """Return the best local decision: primary_agent, confidence, scores and method"""
+        scores = self.keyword_scores(query)
+        if scores:
+            agent, confidence = self._confidence(scores)
+            decision = {"primary_agent": agent, "confidence": confidence, "scores": scores, "method": "keywords"}
+        else:
+            decision = {"primary_agent": DEFAULT_AGENT, "confidence": DEFAULT_CONFIDENCE,
+                        "scores": {}, "method": "default"}
+
+        if self.classifier is not None:
+            probabilities = self.classifier.predict_proba(query)
+            agent = max(probabilities, key=probabilities.get)
+            if probabilities[agent] > decision["confidence"]:
+                decision = {"primary_agent": agent, "confidence": probabilities[agent],
+                            "scores": probabilities, "method": "classifier"}
+        return decision
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] != "train":
+        print("Usage: python -m src.core.routing_engine train <examples.jsonl> <model.pkl>")
+        return 1
+    with open(argv[1], "r", encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh if line.strip()]
+    classifier = RoutingClassifier.train([r["query"] for r in rows], [r["agent"] for r in rows])
+    classifier.save(argv[2])
+    print(f"Trained routing classifier on {len(rows)} examples -> {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+SERP API client with connection pooling, rate limiting, retries and caching
+"""
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.core.cache import MemoryCache
+from src.core.rate_limit import RateLimiter
+from src.core.telemetry import span
+
+
+SERP_API_URL = "https://serpapi.com/search"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SearchError(Exception):
+    """Raised when a search fails after all retries"""
+
+
+class SearchClient:
+    """Pooled, retrying, rate-limited SERP client with a per-query TTL cache"""
+
+    def __init__(self, api_key: str, base_url: str = SERP_API_URL, timeout: float = 10,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 rate_limiter: Optional[RateLimiter] = None, cache_ttl: int = 3600,
+                 cache_size: int = 512, pool_size: int = 10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.cache = MemoryCache(max_size=cache_size, ttl=cache_ttl) if cache_ttl else None
+        self.pool_size = pool_size
+
+        # One keep-alive session for every sync search
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Async client of the enclosing async_session() block, if any
+        self._async_session: ContextVar[Optional[httpx.AsyncClient]] = ContextVar(
+            f"serp_async_session_{id(self)}", default=None
+        )
+
+    @classmethod
+    def from_config(cls, config) -> "SearchClient":
+        return cls(
+            api_key=config.serp.api_key,
+            base_url=config.serp.base_url,
+            timeout=config.serp.timeout,
+            max_retries=config.serp.max_retries,
+            rate_limiter=RateLimiter.from_config(config.serp),
+            cache_ttl=config.serp.cache_ttl,
+        )
+
+    def _params(self, query: str, num_results: int) -> Dict[str, Any]:
+        return {"q": query, "api_key": self.api_key, "num": num_results}
+
+    @staticmethod
+    def _cache_key(query: str, num_results: int) -> str:
+        return f"{num_results}:{query.strip().lower()}"
+
+    def _cached(self, query: str, num_results: int) -> Optional[List[Dict[str, Any]]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(query, num_results))
+        return json.loads(cached) if cached is not None else None
+
+    def _store(self, query: str, num_results: int, results: List[Dict[str, Any]]) -> None:
+        if self.cache is not None:
+            self.cache.set(self._cache_key(query, num_results), json.dumps(results))
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponential backoff with full jitter, honoring Retry-After when given"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """Return organic results for a query, raising SearchError after max_retries"""
+        cached = self._cached(query, num_results)
+        if cached is not None:
+            return cached
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                with span("http.serp", "http", attempt=attempt) as current:
+                    response = self.session.get(self.base_url, params=self._params(query, num_results),
+                                                timeout=self.timeout)
+                    current.set(status_code=response.status_code)
+            except requests.RequestException as e:
+                last_error = e
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as e:
+                        raise SearchError(str(e)) from e
+                    results = self._organic_results(response, num_results)
+                    self._store(query, num_results, results)
+                    return results
+                last_error = SearchError(f"HTTP {response.status_code} from search API")
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+            if attempt < self.max_retries:
+                time.sleep(delay)
+
+        raise SearchError(f"Search failed after {self.max_retries + 1} attempts: {last_error}")
+
+    @asynccontextmanager
+    async def async_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Pool connections for every asearch awaited inside the block, closing them on exit.
+        
+        httpx async clients are bound to one event loop and cannot be closed once
+        it is gone, so the client lives for a block rather than on the instance.
+        Nested blocks (and tasks started inside one) share the outer client.
+        """
+        client = self._async_session.get()
+        if client is not None:
+            yield client
+            return
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+        token = self._async_session.set(client)
+        try:
+            yield client
+        finally:
+            self._async_session.reset(token)
+            await client.aclose()
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """Async variant of search sharing the cache, limiter and retry policy"""
+        cached = self._cached(query, num_results)
+        if cached is not None:
+            return cached
+
+        last_error = None
+        async with self.async_session() as client:
+            for attempt in range(self.max_retries + 1):
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire_async()
+                try:
+                    with span("http.serp", "http", attempt=attempt) as current:
+                        response = await client.get(self.base_url, params=self._params(query, num_results))
+                        current.set(status_code=response.status_code)
+                except httpx.HTTPError as e:
+                    last_error = e
+                    delay = self._backoff(attempt)
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        try:
+                            response.raise_for_status()
+                        except httpx.HTTPStatusError as e:
+                            raise SearchError(str(e)) from e
+                        results = self._organic_results(response, num_results)
+                        self._store(query, num_results, results)
+                        return results
+                    last_error = SearchError(f"HTTP {response.status_code} from search API")
+                    delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                if attempt < self.max_retries:
+                    await asyncio.sleep(delay)
+
+        raise SearchError(f"Search failed after {self.max_retries + 1} attempts: {last_error}")
+
+    @staticmethod
+    def _organic_results(response: Any, num_results: int) -> List[Dict[str, Any]]:
+        """Organic results of a successful response; a malformed body is a SearchError"""
+        try:
+            results = response.json().get("organic_results", [])
+            if not isinstance(results, list):
+                raise TypeError(f"organic_results is a {type(results).__name__}")
+            return results[:num_results]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise SearchError(f"Malformed response from search API: {e}") from e
+
+    def close(self) -> None:
+        self.session.close()
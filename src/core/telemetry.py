@@ -0,0 +1,345 @@
+"""
+Run tracing and metrics
+
+Every workflow run is a trace; graph nodes, LLM calls, image calls and HTTP
+requests made while it runs are child spans. The current span lives in a
+context variable, so the layers that learn something about a call (the cache,
+the rate limiter, the concurrency cap) annotate it without being handed a
+tracer. Outside a traced run `span()` is a no-op.
+
+Finished traces are kept in memory as OpenTelemetry-style span lists and
+optionally appended to a JSONL file; spans also feed Prometheus metrics.
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# USD per 1K prompt / completion tokens, matched by prefix (specific names first)
+MODEL_PRICES = [
+    ("gpt-4o-mini", 0.00015, 0.0006),
+    ("gpt-4o", 0.0025, 0.01),
+    ("gpt-4-turbo", 0.01, 0.03),
+    ("gpt-4-32k", 0.06, 0.12),
+    ("gpt-4", 0.03, 0.06),
+    ("gpt-3.5-turbo", 0.0005, 0.0015),
+]
+
+# USD per generated image
+IMAGE_PRICES = {
+    ("dall-e-3", "hd"): 0.08,
+    ("dall-e-3", "standard"): 0.04,
+    ("dall-e-2", "standard"): 0.02,
+}
+
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRICS = {
+    "contentalchemy_span_duration_seconds": ("histogram", "Wall time of runs, graph nodes, LLM and HTTP calls"),
+    "contentalchemy_runs_total": ("counter", "Workflow runs by outcome"),
+    "contentalchemy_llm_tokens_total": ("counter", "OpenAI tokens by model and direction"),
+    "contentalchemy_llm_cost_usd_total": ("counter", "Estimated OpenAI spend by model"),
+    "contentalchemy_llm_cache_total": ("counter", "LLM cache lookups by result"),
+    "contentalchemy_queue_wait_seconds_total": ("counter", "Time calls waited for rate-limit budget or a slot"),
+    "contentalchemy_http_requests_total": ("counter", "Outbound HTTP requests by target and status"),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD for a chat completion; 0 for unknown models"""
+    for prefix, prompt_price, completion_price in MODEL_PRICES:
+        if model.startswith(prefix):
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+    return 0.0
+
+
+def estimate_image_cost(model: str, quality: str = "standard", n: int = 1) -> float:
+    return IMAGE_PRICES.get((model, quality), 0.0) * n
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    recording = True
+
+    def __init__(self, telemetry: "Telemetry", trace: "Trace", name: str, kind: str,
+                 parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.telemetry = telemetry
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.error = ""
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.spans.append(self)
+        self.telemetry._record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        start = int(self.start_time * 1e9)
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": start,
+            "end_time_unix_nano": start + int(self.duration * 1e9),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": dict(self.attributes),
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside a traced run"""
+
+    recording = False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("contentalchemy_span", default=None)
+
+
+class Trace:
+    """Spans of one workflow run, in the order they finished"""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda s: s.start_time)
+        return {"trace_id": self.trace_id, "spans": [s.to_dict() for s in spans]}
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for a diagnostics view"""
+        calls = [s for s in self.spans if "prompt_tokens" in s.attributes]
+        root = next((s for s in self.spans if s.parent_id is None), None)
+        return {
+            "trace_id": self.trace_id,
+            "duration": root.duration if root else 0.0,
+            "llm_calls": len(calls),
+            "prompt_tokens": sum(s.attributes["prompt_tokens"] for s in calls),
+            "completion_tokens": sum(s.attributes.get("completion_tokens", 0) for s in calls),
+            "cost_usd": round(sum(s.attributes.get("cost_usd", 0.0) for s in self.spans), 6),
+            "cache_hits": sum(1 for s in calls if s.attributes.get("cache_hit")),
+            "queue_wait": round(sum(s.attributes.get("queue_wait", 0.0) for s in self.spans), 3),
+        }
+
+
+def _enter(span: Span) -> Any:
+    return _current_span.set(span)
+
+
+def _exit(token: Any) -> None:
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # A generator closed from another context; its context is discarded anyway
+        pass
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+    """Child span of the current one; a no-op outside a traced run"""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(parent.telemetry, parent.trace, name, kind, parent.span_id, attributes)
+    token = _enter(child)
+    error = None
+    try:
+        yield child
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _exit(token)
+        child.finish(error)
+
+
+def traced(func: Callable, name: str, kind: str = "internal") -> Callable:
+    """Run a sync or async callable inside span(name); its signature is kept for introspection"""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, kind):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(name, kind):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def annotate(**attributes: Any) -> None:
+    """Set attributes on the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def accumulate(key: str, amount: float) -> None:
+    """Add to a numeric attribute of the current span, if any"""
+    current = _current_span.get()
+    if current is not None and amount:
+        current.add(key, amount)
+
+
+def current_trace_id() -> str:
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None else ""
+
+
+class Telemetry:
+    """Starts traces for workflow runs and aggregates their spans into metrics"""
+
+    def __init__(self, enabled: bool = True, max_traces: int = 100, traces_path: str = ""):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self.traces_path = traces_path
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, monitoring) -> "Telemetry":
+        return cls(enabled=monitoring.enabled, max_traces=monitoring.max_traces,
+                   traces_path=monitoring.traces_path)
+
+    @contextmanager
+    def trace(self, name: str, trace_id: str = "", **attributes: Any) -> Iterator[Any]:
+        """Root span of a run; spans opened while it is current join its trace"""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        root = Span(self, Trace(trace_id or uuid.uuid4().hex), name, "run", None, attributes)
+        token = _enter(root)
+        error = None
+        try:
+            yield root
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _exit(token)
+            root.finish(error)
+            self._keep(root.trace)
+
+    def _keep(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            self._traces.move_to_end(trace.trace_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        if self.traces_path:
+            path = Path(self.traces_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        trace = self._traces.get(trace_id)
+        return trace.to_dict() if trace is not None else None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Summaries of the latest traces, newest first"""
+        with self._lock:
+            traces = list(self._traces.values())[-limit:]
+        return [trace.summary() for trace in reversed(traces)]
+
+    def _count(self, metric: str, amount: float, **labels: Any) -> None:
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def _observe(self, metric: str, value: float, **labels: Any) -> None:
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        # Bucket counts, then sum and count
+        series = self._histograms.setdefault(key, [0.0] * (len(DURATION_BUCKETS) + 2))
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _record(self, span: Span) -> None:
+        attributes = span.attributes
+        with self._lock:
+            self._observe("contentalchemy_span_duration_seconds", span.duration, kind=span.kind, name=span.name)
+            if span.parent_id is None:
+                self._count("contentalchemy_runs_total", 1, status="error" if span.error else "ok")
+            model = attributes.get("model", "")
+            if "prompt_tokens" in attributes:
+                self._count("contentalchemy_llm_tokens_total", attributes["prompt_tokens"], model=model, type="prompt")
+                self._count("contentalchemy_llm_tokens_total", attributes.get("completion_tokens", 0),
+                            model=model, type="completion")
+            if attributes.get("cost_usd"):
+                self._count("contentalchemy_llm_cost_usd_total", attributes["cost_usd"], model=model)
+            if "cache_hit" in attributes:
+                self._count("contentalchemy_llm_cache_total", 1, result="hit" if attributes["cache_hit"] else "miss")
+            if attributes.get("queue_wait"):
+                self._count("contentalchemy_queue_wait_seconds_total", attributes["queue_wait"], name=span.name)
+            if span.kind == "http":
+                self._count("contentalchemy_http_requests_total", 1, name=span.name,
+                            status=attributes.get("status_code", "error"))
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+        lines = []
+        for name, (metric_type, description) in METRICS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value:g}")
+            for (metric, labels), series in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, series):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', f'{bound:g}'),))} {count:g}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {series[-1]:g}")
+                lines.append(f"{name}_sum{_labels(labels)} {series[-2]:g}")
+                lines.append(f"{name}_count{_labels(labels)} {series[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
@@ -0,0 +1,139 @@
+"""
+Bulk scoring for content libraries
+
+score_many() re-scores thousands of documents at once. Each document is read
+once (one TextAnalysis plus one keyword scan) into a row of raw counts, in
+worker processes when there are enough documents; every score, density and
+quality flag is then computed column-wise with NumPy. The rules mirror
+ContentOptimizer and QualityValidator exactly, so a ScoreTable row matches
+the per-document results.
+
+    table = score_many(archive, ["content strategy", "seo"], workers=8)
+    table["seo_score"].mean(), table.to_dataframe()
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+
+from .keyword_matcher import compile_keywords
+from .text_analysis import TextAnalysis
+
+# Raw counts gathered per document, in column order
+COUNT_COLUMNS = (
+    "word_count", "character_count", "line_breaks", "h1_count", "h2_count", "h3_count", "paragraph_breaks",
+    "link_count", "emoji_count", "hashtag_count", "long_paragraphs", "has_question",
+)
+DEFAULT_CHUNK_SIZE = 256
+
+
+def _count_rows(documents: Sequence[str], keywords: Tuple[str, ...]) -> np.ndarray:
+    """One row of COUNT_COLUMNS plus per-keyword counts for each document"""
+    matcher = compile_keywords(keywords)
+    rows = np.zeros((len(documents), len(COUNT_COLUMNS) + len(keywords)), dtype=np.int64)
+    for row, content in zip(rows, documents):
+        # Not analyze(): an archive pass would only churn the memo
+        analysis = TextAnalysis(content)
+        row[:len(COUNT_COLUMNS)] = (
+            analysis.word_count, analysis.char_count, analysis.line_breaks, analysis.heading_counts[1],
+            analysis.heading_counts[2], analysis.heading_counts[3], analysis.paragraph_breaks,
+            analysis.link_count, analysis.emoji_count, len(analysis.hashtags),
+            sum(1 for _, words in analysis.paragraph_words if words > 150), analysis.has_question,
+        )
+        if keywords:
+            row[len(COUNT_COLUMNS):] = list(matcher.counts(analysis.tokens).values())
+    return rows
+
+
+def _chunks(documents: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    for start in range(0, len(documents), size):
+        yield documents[start:start + size]
+
+
+@dataclass
+class ScoreTable:
+    """Columnar scores; row i of every column belongs to documents[i]"""
+
+    columns: Dict[str, np.ndarray]
+    keywords: Tuple[str, ...]
+    keyword_density: np.ndarray  # shape (documents, keywords), percent of words
+
+    def __len__(self) -> int:
+        return len(self.columns["word_count"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def to_dataframe(self) -> Any:
+        """pandas DataFrame with one density column per keyword"""
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("ScoreTable.to_dataframe requires pandas (pip install pandas)") from e
+
+        frame = pd.DataFrame(self.columns)
+        for i, keyword in enumerate(self.keywords):
+            frame[f"density[{keyword}]"] = self.keyword_density[:, i]
+        return frame
+
+
+def _score(counts: np.ndarray, keywords: Tuple[str, ...]) -> ScoreTable:
+    columns = {name: counts[:, i] for i, name in enumerate(COUNT_COLUMNS)}
+    words = columns["word_count"]
+    chars = columns["character_count"]
+    h2 = columns["h2_count"]
+    emoji = columns["emoji_count"]
+    hashtags = columns["hashtag_count"]
+
+    keyword_counts = counts[:, len(COUNT_COLUMNS):]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        density = np.where(words[:, None] > 0, keyword_counts / words[:, None] * 100, 0.0)
+
+    # ContentOptimizer.optimize_for_seo / optimize_for_linkedin
+    in_range = ((density > 0.5) & (density < 2.5)).any(axis=1)
+    seo = 30 * (words > 1000) + 20 * (h2 >= 3) + 30 * in_range + 20 * (columns["paragraph_breaks"] >= 5)
+    columns["seo_score"] = np.minimum(seo, 100)
+    columns["header_count"] = h2 + columns["h3_count"]
+    columns["engagement_score"] = (25 * (chars < 1300) + 20 * (columns["line_breaks"] >= 5)
+                                   + 25 * ((emoji >= 3) & (emoji <= 7)) + 30 * ((hashtags >= 3) & (hashtags <= 7)))
+
+    # QualityValidator.validate_blog_quality: issues cost 15, warnings 5
+    blog_issues = {"blog_too_short": words < 800, "blog_missing_h1": columns["h1_count"] == 0}
+    blog_warnings = {"blog_too_long": words > 3000, "blog_few_h2": h2 < 3,
+                     "blog_no_links": columns["link_count"] == 0, "blog_long_paragraphs": columns["long_paragraphs"] > 0}
+    # QualityValidator.validate_linkedin_quality: issues cost 20, warnings 5
+    linkedin_issues = {"linkedin_too_long": chars > 3000, "linkedin_too_short": chars < 100}
+    linkedin_warnings = {"linkedin_no_hashtags": hashtags == 0, "linkedin_too_many_hashtags": hashtags > 10,
+                         "linkedin_no_emoji": emoji == 0, "linkedin_no_question": columns["has_question"] == 0}
+    columns.update(blog_issues, **blog_warnings, **linkedin_issues, **linkedin_warnings)
+
+    blog_issue_count = sum(blog_issues.values())
+    linkedin_issue_count = sum(linkedin_issues.values())
+    columns["blog_issue_count"] = blog_issue_count
+    columns["blog_quality_score"] = np.maximum(100 - 15 * blog_issue_count - 5 * sum(blog_warnings.values()), 0)
+    columns["linkedin_issue_count"] = linkedin_issue_count
+    columns["linkedin_quality_score"] = np.maximum(
+        100 - 20 * linkedin_issue_count - 5 * sum(linkedin_warnings.values()), 0)
+    return ScoreTable(columns=columns, keywords=keywords, keyword_density=density)
+
+
+def score_many(documents: Sequence[str], keywords: Sequence[str] = (), workers: Optional[int] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> ScoreTable:
+    """Score every document for SEO, LinkedIn engagement and blog/LinkedIn quality.
+
+    Documents are split into chunks of `chunk_size` and counted across
+    `workers` processes (default: one per CPU); small batches stay in-process.
+    """
+    documents = list(documents)
+    keywords = tuple(dict.fromkeys(keywords))
+    workers = workers or os.cpu_count() or 1
+    chunks = list(_chunks(documents, max(1, chunk_size)))
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            parts: List[np.ndarray] = list(executor.map(_count_rows, chunks, [keywords] * len(chunks)))
+    else:
+        parts = [_count_rows(chunk, keywords) for chunk in chunks]
+    counts = np.concatenate(parts) if parts else np.zeros((0, len(COUNT_COLUMNS) + len(keywords)), dtype=np.int64)
+    return _score(counts, keywords)
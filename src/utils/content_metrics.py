@@ -0,0 +1,70 @@
+"""
+Inline content metrics for agent results
+
+Writers score their own output while it is still in memory: SEO and quality
+for blogs, engagement and quality for LinkedIn posts. The scorers share one
+memoized TextAnalysis, so the stage costs well under a millisecond for a
+typical draft. It still runs under a wall-clock budget: scorers are run in
+order and whatever is left once the budget is spent is skipped (and listed
+in `metrics_skipped`). The stage reports its own cost as `metrics_ms`.
+"""
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .content_optimization import ContentOptimizer
+from .quality_validation import QualityValidator
+
+DEFAULT_METRICS_BUDGET_MS = 5.0
+
+
+def run_metrics(steps: Sequence[Tuple[str, Callable[[], Dict[str, Any]]]], budget_ms: float) -> Dict[str, Any]:
+    """Run (name, scorer) steps in order until `budget_ms` is spent; a budget of 0 skips them all"""
+    start = perf_counter()
+    deadline = start + budget_ms / 1000
+    metrics: Dict[str, Any] = {}
+    skipped: List[str] = []
+    for name, step in steps:
+        if perf_counter() >= deadline:
+            skipped.append(name)
+            continue
+        metrics.update(step())
+    metrics["metrics_ms"] = round((perf_counter() - start) * 1000, 3)
+    if skipped:
+        metrics["metrics_skipped"] = skipped
+    return metrics
+
+
+def blog_metrics(content: str, keywords: List[str], budget_ms: float = DEFAULT_METRICS_BUDGET_MS) -> Dict[str, Any]:
+    """SEO score, keyword density, quality issues and meta description of a blog draft"""
+    def seo() -> Dict[str, Any]:
+        result = ContentOptimizer.optimize_for_seo(content, keywords)
+        return {
+            "seo_score": result["seo_score"],
+            "keyword_density": {kw: round(density, 2) for kw, density in result["keyword_density"].items()},
+            "header_count": result["header_count"],
+        }
+
+    def quality() -> Dict[str, Any]:
+        result = QualityValidator.validate_blog_quality(content)
+        return {"quality_score": result["quality_score"], "quality_issues": result["issues"],
+                "quality_warnings": result["warnings"]}
+
+    def meta() -> Dict[str, Any]:
+        return {"meta_description": ContentOptimizer.extract_meta_description(content)}
+
+    return run_metrics([("seo", seo), ("quality", quality), ("meta_description", meta)], budget_ms)
+
+
+def linkedin_metrics(content: str, budget_ms: float = DEFAULT_METRICS_BUDGET_MS) -> Dict[str, Any]:
+    """Engagement score and quality issues of a LinkedIn post"""
+    def engagement() -> Dict[str, Any]:
+        result = ContentOptimizer.optimize_for_linkedin(content)
+        return {"engagement_score": result["engagement_score"], "emoji_count": result["emoji_count"],
+                "hashtag_count": result["hashtag_count"]}
+
+    def quality() -> Dict[str, Any]:
+        result = QualityValidator.validate_linkedin_quality(content)
+        return {"quality_score": result["quality_score"], "quality_issues": result["issues"],
+                "quality_warnings": result["warnings"]}
+
+    return run_metrics([("engagement", engagement), ("quality", quality)], budget_ms)
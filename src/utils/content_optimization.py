@@ -4,6 +4,8 @@ Content optimization utilities
 from typing import Dict, Any, List
 import re
 
+from .text_analysis import analyze
+
 
 class ContentOptimizer:
     """Optimize content for various platforms and purposes"""
@@ -11,17 +13,18 @@ class ContentOptimizer:
     @staticmethod
     def optimize_for_seo(content: str, keywords: List[str]) -> Dict[str, Any]:
         """Optimize content for SEO"""
+        analysis = analyze(content)
         # Calculate keyword density
-        word_count = len(content.split())
-        keyword_counts = {kw: content.lower().count(kw.lower()) for kw in keywords}
+        word_count = analysis.word_count
+        keyword_counts = analysis.keyword_counts(keywords)
         keyword_density = {
             kw: (count / word_count * 100) if word_count > 0 else 0
             for kw, count in keyword_counts.items()
         }
         
         # Check for headers
-        h2_count = len(re.findall(r'^##\s', content, re.MULTILINE))
-        h3_count = len(re.findall(r'^###\s', content, re.MULTILINE))
+        h2_count = analysis.heading_counts[2]
+        h3_count = analysis.heading_counts[3]
         
         # Calculate SEO score
         seo_score = 0
@@ -31,7 +34,7 @@ class ContentOptimizer:
             seo_score += 20
         if any(d > 0.5 and d < 2.5 for d in keyword_density.values()):
             seo_score += 30
-        if content.count('\n\n') >= 5:  # Paragraph breaks
+        if analysis.paragraph_breaks >= 5:
             seo_score += 20
         
         return {
@@ -45,10 +48,11 @@ class ContentOptimizer:
     @staticmethod
     def optimize_for_linkedin(content: str) -> Dict[str, Any]:
         """Optimize content for LinkedIn"""
-        char_count = len(content)
-        line_breaks = content.count('\n')
-        emoji_count = len(re.findall(r'[\U0001F300-\U0001F9FF]', content))
-        hashtag_count = len(re.findall(r'#\w+', content))
+        analysis = analyze(content)
+        char_count = analysis.char_count
+        line_breaks = analysis.line_breaks
+        emoji_count = analysis.emoji_count
+        hashtag_count = len(analysis.hashtags)
         
         engagement_score = 0
         if char_count < 1300:
@@ -72,7 +76,7 @@ class ContentOptimizer:
     def extract_meta_description(content: str, max_length: int = 160) -> str:
         """Extract or generate meta description"""
         # Try to find first paragraph
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+        paragraphs = analyze(content).paragraphs
         if paragraphs:
             first_para = paragraphs[0]
             # Remove markdown
@@ -0,0 +1,73 @@
+"""
+Targeted repairs for drafts that fail quality validation
+
+Rather than regenerating a whole draft, a writer turns each repairable
+validation finding into a RepairEdit: a short prompt about the failing part
+(with the draft as context) plus a function splicing the answer back in. Some
+edits need no LLM at all, e.g. promoting a plain first line to the H1 title.
+
+`apply_edits` runs a writer's edits in order within a token budget. An edit
+whose estimated cost (prompt plus expected answer) does not fit what is left
+is skipped, so a repair never spends more than the run allows.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .prompt_budget import count_tokens
+
+
+@dataclass
+class RepairEdit:
+    name: str  # short label reported in the result, e.g. "title" or "expanded: Pricing"
+    apply: Callable[[Any, str], Any]  # (draft, LLM answer) -> repaired draft
+    messages: Optional[List[Any]] = None  # None: deterministic edit, no LLM call
+    llm: Any = None
+    completion_tokens: int = 0  # expected answer size, for the budget check
+
+    def estimate(self) -> int:
+        """Tokens this edit is expected to cost"""
+        if self.messages is None:
+            return 0
+        return sum(count_tokens(message.content) for message in self.messages) + self.completion_tokens
+
+
+def spent_tokens(edit: RepairEdit, response: Any) -> int:
+    """Tokens an edit's call used: the provider's count when reported, else counted locally"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return edit.estimate() - edit.completion_tokens + count_tokens(response.content)
+
+
+def apply_edits(draft: Any, edits: Sequence[RepairEdit], token_budget: int) -> Tuple[Any, List[str], int]:
+    """Apply edits in order within `token_budget`; returns (draft, applied edit names, tokens used)"""
+    applied: List[str] = []
+    used = 0
+    for edit in edits:
+        if edit.messages is None:
+            draft = edit.apply(draft, "")
+        elif used + edit.estimate() > token_budget:
+            continue
+        else:
+            response = edit.llm.invoke(edit.messages)
+            used += spent_tokens(edit, response)
+            draft = edit.apply(draft, response.content)
+        applied.append(edit.name)
+    return draft, applied, used
+
+
+async def apply_edits_async(draft: Any, edits: Sequence[RepairEdit], token_budget: int) -> Tuple[Any, List[str], int]:
+    """Async variant of apply_edits"""
+    applied: List[str] = []
+    used = 0
+    for edit in edits:
+        if edit.messages is None:
+            draft = edit.apply(draft, "")
+        elif used + edit.estimate() > token_budget:
+            continue
+        else:
+            response = await edit.llm.ainvoke(edit.messages)
+            used += spent_tokens(edit, response)
+            draft = edit.apply(draft, response.content)
+        applied.append(edit.name)
+    return draft, applied, used
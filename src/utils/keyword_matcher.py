@@ -0,0 +1,139 @@
+"""
+Multi-keyword matching in one pass (Aho–Corasick over words)
+
+A KeywordMatcher compiles a set of keyword phrases into an Aho–Corasick
+automaton whose alphabet is words rather than characters. Matches therefore
+always start and end on word boundaries ("post" does not match inside
+"poster"), and every keyword is counted in a single scan of the text. A
+trailing "*" turns the last word of a phrase into a stem: "investigat*"
+matches "investigate" and "investigating".
+
+compile_keywords() caches one matcher per keyword set.
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+import string
+
+# Everything \w does not match becomes a word separator (ASCII plus common typographic marks)
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation.replace("_", "") + "—–‘’“”…«»•·"})
+
+Match = Tuple[int, int, str]  # (first token, token count, keyword)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, split the way `\\w+` would for ordinary prose"""
+    return text.lower().translate(_SEPARATORS).split()
+
+
+class KeywordMatcher:
+    """Compiled Aho–Corasick automaton over word tokens for a fixed keyword set"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[str, int], ...]] = [()]
+        self._stems: Dict[int, set] = {}  # stem length -> stems, for mapping words onto stem symbols
+        self._words: set = set()
+        for keyword in self.keywords:
+            self._add(keyword)
+        self._stem_lengths = sorted(self._stems, reverse=True)
+        self._link()
+
+    def _add(self, keyword: str) -> None:
+        words = tokenize(keyword)
+        if keyword.rstrip().endswith("*") and words:
+            words[-1] += "*"
+            self._stems.setdefault(len(words[-1]) - 1, set()).add(words[-1][:-1])
+        if not words:
+            return
+        state = 0
+        for word in words:
+            self._words.add(word)
+            if word not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][word] = len(self._goto) - 1
+            state = self._goto[state][word]
+        self._output[state] += ((keyword, len(words)),)
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also reports its suffixes' keywords"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def _symbol(self, token: str) -> str:
+        # Exact keyword words win; otherwise the longest stem the token starts with
+        if token in self._words:
+            return token
+        for length in self._stem_lengths:
+            if token[:length] in self._stems[length]:
+                return token[:length] + "*"
+        return token
+
+    def _scan(self, text: Union[str, Sequence[str]]) -> List[Match]:
+        """Every keyword occurrence, in the order the automaton reports them"""
+        tokens = tokenize(text) if isinstance(text, str) else text
+        if self._stems:
+            tokens = map(self._symbol, tokens)
+        goto, fail, output = self._goto, self._fail, self._output
+        from_root = goto[0].get
+        found: List[Match] = []
+        state = 0
+        for index, token in enumerate(tokens):
+            if state:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            else:
+                # The automaton idles at the root until a keyword's first word
+                state = from_root(token, 0)
+            if state and output[state]:
+                found.extend((index - size + 1, size, keyword) for keyword, size in output[state])
+        return found
+
+    def matches(self, text: Union[str, Sequence[str]], overlapping: bool = True) -> List[Match]:
+        """Every keyword occurrence as (first token, token count, keyword), ordered by position.
+
+        With overlapping=False, occurrences are chosen leftmost-longest, so a
+        phrase hides the keywords inside it ("professional post" is not also "post").
+        """
+        found = sorted(self._scan(text), key=lambda match: (match[0], -match[1]))
+        if overlapping:
+            return found
+        chosen: List[Match] = []
+        next_free = 0
+        for match in found:
+            if match[0] >= next_free:
+                chosen.append(match)
+                next_free = match[0] + match[1]
+        return chosen
+
+    def counts(self, text: Union[str, Sequence[str]], overlapping: bool = True) -> Dict[str, int]:
+        """Occurrences of every keyword (zero included) in one pass over the text"""
+        totals = dict.fromkeys(self.keywords, 0)
+        found = self._scan(text) if overlapping else self.matches(text, overlapping=False)
+        for _, _, keyword in found:
+            totals[keyword] += 1
+        return totals
+
+
+@lru_cache(maxsize=128)
+def _compile(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def compile_keywords(keywords: Iterable[str]) -> KeywordMatcher:
+    """Shared matcher for a keyword set; building the automaton happens once per set"""
+    return _compile(tuple(keywords))
@@ -0,0 +1,169 @@
+"""
+Token-budgeted prompt assembly
+
+Tokens are counted with tiktoken when its encodings are available, otherwise
+with a ~4 characters per token estimate.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+import math
+import re
+
+
+CHARS_PER_TOKEN = 4
+ELLIPSIS = "..."
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Matched by prefix, so keep more specific names ahead of their base model
+MODEL_CONTEXT_WINDOWS = [
+    ("gpt-4o", 128000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4-1106", 128000),
+    ("gpt-4-0125", 128000),
+    ("gpt-4-32k", 32768),
+    ("gpt-4", 8192),
+    ("gpt-3.5-turbo-instruct", 4096),
+    ("gpt-3.5-turbo", 16385),
+]
+
+SENTENCE_END_PATTERN = re.compile(r"[.!?](?=\s)")
+WHITESPACE_PATTERN = re.compile(r"[ \t]+")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None when tiktoken cannot provide one"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        # Encodings are downloaded on first use and may be unreachable offline
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Number of tokens `text` costs for `model`"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def model_context_window(model: str) -> int:
+    """Total context size for a model name, falling back to 8k for unknown models"""
+    for prefix, window in MODEL_CONTEXT_WINDOWS:
+        if model.startswith(prefix):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _cut(text: str, max_tokens: int, model: str) -> str:
+    """Longest prefix of `text` within `max_tokens`, ignoring boundaries"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """Cut text to at most `max_tokens`, preferring a sentence or word boundary"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    cut = _cut(text, max_tokens, model)
+
+    # Only back off to a boundary when that keeps most of the allowance
+    sentence_ends = [m.end() for m in SENTENCE_END_PATTERN.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] >= len(cut) // 2:
+        return cut[:sentence_ends[-1]]
+    # A word-boundary cut ends in an ellipsis, whose tokens come out of the same budget
+    shorter = _cut(text, max_tokens - count_tokens(ELLIPSIS, model), model)
+    space = shorter.rfind(" ")
+    if space >= len(cut) // 2:
+        truncated = shorter[:space] + ELLIPSIS
+        if count_tokens(truncated, model) <= max_tokens:
+            return truncated
+    return cut
+
+
+def compress_whitespace(text: str) -> str:
+    """Collapse runs of spaces and blank lines, which cost tokens but carry nothing"""
+    lines = [WHITESPACE_PATTERN.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+class PromptBudget:
+    """Token allowance for the variable part of a prompt"""
+
+    def __init__(self, model: str = "gpt-4", max_completion_tokens: int = 2000,
+                 context_window: Optional[int] = None, max_context_tokens: Optional[int] = None,
+                 safety_margin: int = 64):
+        self.model = model
+        self.max_completion_tokens = max_completion_tokens
+        self.context_window = context_window or model_context_window(model)
+        # Hard cap on packed context, independent of how much room the model has
+        self.max_context_tokens = max_context_tokens
+        self.safety_margin = safety_margin
+
+    @classmethod
+    def from_config(cls, config, max_context_tokens: Optional[int] = None) -> "PromptBudget":
+        return cls(
+            model=config.openai.model,
+            max_completion_tokens=config.openai.max_tokens,
+            context_window=config.openai.context_window or None,
+            max_context_tokens=max_context_tokens,
+        )
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def available(self, *fixed_parts: str) -> int:
+        """Tokens left for packed context once the fixed prompt and completion are reserved"""
+        room = (self.context_window - self.max_completion_tokens - self.safety_margin
+                - sum(self.count(part) for part in fixed_parts))
+        if self.max_context_tokens:
+            room = min(room, self.max_context_tokens)
+        return max(0, room)
+
+    def pack(self, snippets: Iterable[str], budget: int, separator: str = "\n\n",
+             min_tokens: int = 24) -> List[str]:
+        """Greedily keep snippets in the given (highest-value first) order.
+
+        A snippet that does not fit is truncated into the remaining room when at
+        least `min_tokens` are left, and dropped otherwise.
+        """
+        packed: List[str] = []
+        used = 0
+        separator_tokens = self.count(separator)
+        for snippet in snippets:
+            snippet = compress_whitespace(snippet)
+            if not snippet:
+                continue
+            overhead = separator_tokens if packed else 0
+            room = budget - used - overhead
+            cost = self.count(snippet)
+            if cost <= room:
+                packed.append(snippet)
+                used += overhead + cost
+            elif room >= min_tokens:
+                packed.append(truncate_to_tokens(snippet, room, self.model))
+                used += overhead + room
+        return packed
+
+    def fit(self, snippets: Sequence[str], *fixed_parts: str, separator: str = "\n\n") -> str:
+        """Pack snippets into whatever room the fixed prompt parts leave and join them"""
+        return separator.join(self.pack(snippets, self.available(*fixed_parts), separator))
@@ -1,8 +1,16 @@
 """
 Quality validation utilities
 """
-from typing import Dict, Any, List
-import re
+from typing import Dict, Any
+
+from .text_analysis import analyze
+
+# Findings the workflow's quality gate knows how to repair
+BLOG_TOO_SHORT = "Content too short (minimum 800 words)"
+MISSING_H1 = "Missing H1 title"
+POST_TOO_LONG = "Post too long (LinkedIn limit is 3000 characters)"
+POST_TOO_SHORT = "Post too short (minimum 100 characters)"
+NO_HASHTAGS = "No hashtags found"
 
 
 class QualityValidator:
@@ -13,29 +21,29 @@ class QualityValidator:
         """Validate blog post quality"""
         issues = []
         warnings = []
+        analysis = analyze(content)
         
-        word_count = len(content.split())
+        word_count = analysis.word_count
         if word_count < 800:
-            issues.append("Content too short (minimum 800 words)")
+            issues.append(BLOG_TOO_SHORT)
         elif word_count > 3000:
             warnings.append("Content very long (consider splitting)")
         
         # Check for headers
-        if not re.search(r'^#\s', content, re.MULTILINE):
-            issues.append("Missing H1 title")
+        if not analysis.heading_counts[1]:
+            issues.append(MISSING_H1)
         
-        h2_count = len(re.findall(r'^##\s', content, re.MULTILINE))
+        h2_count = analysis.heading_counts[2]
         if h2_count < 3:
             warnings.append("Consider adding more H2 headers")
         
         # Check for links (basic markdown links)
-        link_count = len(re.findall(r'\[.*?\]\(.*?\)', content))
+        link_count = analysis.link_count
         if link_count == 0:
             warnings.append("No links found (consider adding references)")
         
         # Paragraph length check
-        paragraphs = [p for p in content.split('\n\n') if p.strip()]
-        long_paragraphs = [p for p in paragraphs if len(p.split()) > 150]
+        long_paragraphs = [words for _, words in analysis.paragraph_words if words > 150]
         if long_paragraphs:
             warnings.append(f"{len(long_paragraphs)} paragraphs are too long")
         
@@ -57,26 +65,27 @@ class QualityValidator:
         issues = []
         warnings = []
         
-        char_count = len(content)
+        analysis = analyze(content)
+        char_count = analysis.char_count
         if char_count > 3000:
-            issues.append("Post too long (LinkedIn limit is 3000 characters)")
+            issues.append(POST_TOO_LONG)
         elif char_count < 100:
-            issues.append("Post too short (minimum 100 characters)")
+            issues.append(POST_TOO_SHORT)
         
         # Check for hashtags
-        hashtags = re.findall(r'#\w+', content)
+        hashtags = analysis.hashtags
         if len(hashtags) == 0:
-            warnings.append("No hashtags found")
+            warnings.append(NO_HASHTAGS)
         elif len(hashtags) > 10:
             warnings.append("Too many hashtags (keep under 10)")
         
         # Check for emojis
-        emoji_count = len(re.findall(r'[\U0001F300-\U0001F9FF]', content))
+        emoji_count = analysis.emoji_count
         if emoji_count == 0:
             warnings.append("Consider adding emojis for engagement")
         
         # Check for question (engagement)
-        if '?' not in content:
+        if not analysis.has_question:
             warnings.append("Consider ending with a question for engagement")
         
         quality_score = 100
@@ -0,0 +1,76 @@
+"""
+Search result deduplication and ranking for multi-query research
+"""
+from typing import Any, Dict, List, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import re
+
+
+TRACKING_PARAMS = {"gclid", "fbclid", "ref", "mc_cid", "mc_eid"}
+TRACKING_PREFIXES = ("utm_",)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: no scheme, www, fragment, tracking params or trailing slash.
+    
+    Only the host is case-folded; paths and queries may be case-sensitive.
+    """
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    host = netloc[4:] if netloc.startswith("www.") else netloc
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query) if not _is_tracking_param(k)
+    ))
+    path = parts.path.rstrip("/")
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def rank_results(result_lists: Sequence[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """Merge per-query result lists with reciprocal rank fusion, deduplicating by URL.
+
+    A source found by several sub-queries accumulates score from each list, so
+    broadly relevant pages float to the top.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results):
+            key = normalize_url(result.get("link", "")) or result.get("title", "")
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {"result": result, "score": 0.0, "hits": 0}
+            entry["score"] += 1.0 / (k + rank + 1)
+            entry["hits"] += 1
+    ranked = sorted(merged.values(), key=lambda e: -e["score"])
+    return [dict(e["result"], relevance=round(e["score"], 6), hits=e["hits"]) for e in ranked]
+
+
+def drop_near_duplicates(results: List[Dict[str, Any]], threshold: float = 0.8) -> List[Dict[str, Any]]:
+    """Remove results whose snippet is a near-duplicate of a higher-ranked one"""
+    kept: List[Dict[str, Any]] = []
+    kept_shingles: List[set] = []
+    for result in results:
+        shingles = _shingles(f"{result.get('title', '')} {result.get('snippet', '')}")
+        if any(_jaccard(shingles, seen) >= threshold for seen in kept_shingles):
+            continue
+        kept.append(result)
+        kept_shingles.append(shingles)
+    return kept
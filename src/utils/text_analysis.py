@@ -0,0 +1,115 @@
+"""
+Single-pass text analysis shared by the content scorers
+
+`analyze(content)` walks the text once, line by line, and records everything
+ContentOptimizer and QualityValidator look at: words, headings, paragraphs,
+links, emoji and hashtags. Results are memoized per content, so scoring a blog
+for SEO, quality and a meta description scans it once instead of ~15 times.
+
+Counts match the regexes the scorers used before (``^##\\s``, ``#\\w+``,
+``\\[.*?\\]\\(.*?\\)``, ``content.split('\\n\\n')``, ...).
+"""
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+import re
+
+from .keyword_matcher import compile_keywords, tokenize
+
+
+EMOJI_PATTERN = re.compile(r'[\U0001F300-\U0001F9FF]')
+HASHTAG_PATTERN = re.compile(r'#\w+')
+LINK_PATTERN = re.compile(r'\[.*?\]\(.*?\)')
+
+
+class TextAnalysis:
+    """Structural facts about one text, gathered in a single pass"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.char_count = len(content)
+        self.words: List[str] = []
+        # (level, text, index of its first word) for markdown ATX headings
+        self.headings: List[Tuple[int, str, int]] = []
+        self.heading_counts: Counter = Counter()
+        # Stripped paragraphs (blocks separated by blank lines) and their (first word, word count)
+        self.paragraphs: List[str] = []
+        self.paragraph_words: List[Tuple[int, int]] = []
+        self.paragraph_breaks = 0  # non-overlapping '\n\n' occurrences
+        self.link_count = 0
+        self.emoji_count = 0
+        self.hashtags: List[str] = []
+        self.has_question = "?" in content
+        self._tokens = None
+        self._scan(content)
+
+    def _scan(self, content: str) -> None:
+        lines = content.split("\n")
+        last = len(lines) - 1
+        words = self.words
+        add_words = words.extend
+        block: List[str] = []
+        block_start = 0
+        newline_run = 0
+        for index, line in enumerate(lines):
+            if index:
+                newline_run += 1
+            if not line:
+                if block:
+                    self._close_paragraph(block, block_start)
+                    block = []
+                continue
+            self.paragraph_breaks += newline_run >> 1
+            newline_run = 0
+            if not block:
+                block_start = len(words)
+            block.append(line)
+
+            if "#" in line:
+                if line[0] == "#":
+                    level = len(line) - len(line.lstrip("#"))
+                    after = line[level:level + 1]
+                    # `^#+\s`: whitespace after the hashes, or the newline ending the line
+                    if after.isspace() or (not after and index < last):
+                        self.headings.append((level, line[level:].strip(), len(words)))
+                        self.heading_counts[level] += 1
+                self.hashtags += HASHTAG_PATTERN.findall(line)
+            if "](" in line:
+                self.link_count += len(LINK_PATTERN.findall(line))
+            if not line.isascii():
+                self.emoji_count += len(EMOJI_PATTERN.findall(line))
+            add_words(line.split())
+        self.paragraph_breaks += newline_run >> 1
+        if block:
+            self._close_paragraph(block, block_start)
+
+    def _close_paragraph(self, block: List[str], start: int) -> None:
+        text = "\n".join(block).strip()
+        if text:
+            self.paragraphs.append(text)
+            self.paragraph_words.append((start, len(self.words) - start))
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def line_breaks(self) -> int:
+        return self.content.count("\n")
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercased word tokens without punctuation, for keyword matching"""
+        if self._tokens is None:
+            self._tokens = tokenize(self.content)
+        return self._tokens
+
+    def keyword_counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """Whole-word, case-insensitive occurrences of every keyword in one pass"""
+        return compile_keywords(keywords).counts(self.tokens)
+
+
+@lru_cache(maxsize=256)
+def analyze(content: str) -> TextAnalysis:
+    """Memoized TextAnalysis; scorers called on the same text share one scan"""
+    return TextAnalysis(content)
@@ -0,0 +1,444 @@
+"""
+HTTP API service for machine clients
+
+Endpoints:
+    POST /generate  {"query": ..., "formats": [...]?}       -> final workflow result
+    POST /batch     {"queries": [...], "formats": [...]?}   -> one result per query
+    POST /stream    {"query": ..., "formats": [...]?}       -> server-sent workflow events
+    POST /jobs      {"query": ..., "formats"?, "priority"?, "callback_url"?} -> 202 + job ID
+    GET  /jobs/{id}                                         -> job status and result
+    GET  /health                                            -> queue/worker counters
+    GET  /metrics                                           -> Prometheus metrics (monitoring.enabled)
+    GET  /traces/{id}                                       -> a run's trace (id is the result's trace_id)
+
+Each replica runs a fixed number of async workers over a bounded queue.
+Requests beyond the queue get 429 so a load balancer can retry elsewhere.
+
+Usage:
+    python -m src.web_app.http_service --port 8080 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from src.agents.query_handler import CAMPAIGN_FORMATS
+from src.core.config import Config, ServiceConfig
+from src.workflow.batch import normalize_queries
+from src.workflow.jobs import JobManager, check_callback_url, result_payload
+
+
+class ServiceBusy(Exception):
+    """Raised when every worker is busy and the waiting queue is full"""
+
+
+class ServiceDraining(Exception):
+    """Raised when the service is shutting down and accepts no new work"""
+
+
+class _Job:
+    __slots__ = ("run", "deadline", "future")
+
+    def __init__(self, run: Callable[[], Awaitable[Any]], deadline: float, future: asyncio.Future):
+        self.run = run
+        self.deadline = deadline
+        self.future = future
+
+
+class WorkerPool:
+    """Fixed set of async workers draining a bounded queue of jobs.
+
+    At most `workers + queue_size` jobs are accepted at once; further
+    submissions raise ServiceBusy instead of waiting. A job's timeout counts
+    from acceptance, so time spent queued is part of its budget. Cancelling a
+    job's future cancels the job, whether it is queued or running.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 32):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue: Optional[asyncio.Queue] = None
+        self.accepting = False
+        self.pending = 0  # accepted and not yet finished
+        self.running = 0
+        self.counters = {"accepted": 0, "completed": 0, "failed": 0, "timed_out": 0, "rejected": 0}
+        self.started_at = time.monotonic()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        self.accepting = True
+        self.started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def submit(self, run: Callable[[], Awaitable[Any]], timeout: float) -> asyncio.Future:
+        """Queue one job, raising ServiceBusy/ServiceDraining instead of waiting for room"""
+        return self.submit_many([run], timeout)[0]
+
+    def submit_many(self, runs: List[Callable[[], Awaitable[Any]]], timeout: float) -> List[asyncio.Future]:
+        """Queue several jobs all-or-nothing, so a batch is never half accepted"""
+        if not self.accepting:
+            raise ServiceDraining("Service is shutting down")
+        if self.pending + len(runs) > self.capacity:
+            self.counters["rejected"] += len(runs)
+            raise ServiceBusy(f"Service is at capacity ({self.pending} of {self.capacity} requests in progress)")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        futures = []
+        for run in runs:
+            job = _Job(run, deadline, loop.create_future())
+            self.queue.put_nowait(job)
+            futures.append(job.future)
+        self.pending += len(runs)
+        self.counters["accepted"] += len(runs)
+        return futures
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.pending -= 1
+                self.queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        if job.future.done():
+            # The caller gave up (e.g. disconnected) while the job was queued
+            return
+        remaining = job.deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            self.counters["timed_out"] += 1
+            job.future.set_exception(asyncio.TimeoutError("Request timed out while queued"))
+            return
+
+        task = asyncio.ensure_future(job.run())
+        job.future.add_done_callback(lambda future: task.cancel() if future.cancelled() else None)
+        self.running += 1
+        try:
+            result = await asyncio.wait_for(task, remaining)
+        except asyncio.TimeoutError:
+            self.counters["timed_out"] += 1
+            if not job.future.done():
+                job.future.set_exception(asyncio.TimeoutError("Request timed out"))
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # The pool itself is closing
+                job.future.cancel()
+                raise
+            # Only the job was cancelled by its caller; this worker moves on
+        except Exception as e:
+            self.counters["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.counters["completed"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.running -= 1
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop accepting work and wait for accepted jobs; False if the timeout cut it short"""
+        self.accepting = False
+        if self.queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self.started_at
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.pending - self.running,
+            "queue_size": self.queue_size,
+            **self.counters,
+            "throughput": round(self.counters["completed"] / uptime, 3) if uptime > 0 else 0.0,
+        }
+
+
+WORKFLOW_KEY = web.AppKey("workflow", object)
+POOL_KEY = web.AppKey("pool", WorkerPool)
+JOBS_KEY = web.AppKey("jobs", JobManager)
+SETTINGS_KEY = web.AppKey("settings", ServiceConfig)
+
+
+def _error(exc_class: type, message: str, headers: Optional[Dict[str, str]] = None) -> web.HTTPException:
+    return exc_class(text=_dumps({"error": message}), content_type="application/json", headers=headers)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, default=str)
+
+
+async def _read_json(request: web.Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise _error(web.HTTPBadRequest, "Body must be JSON")
+    if not isinstance(body, dict):
+        raise _error(web.HTTPBadRequest, "Body must be a JSON object")
+    return body
+
+
+def _parse_formats(body: Dict[str, Any]) -> Optional[List[str]]:
+    formats = body.get("formats")
+    if formats is None:
+        return None
+    if not isinstance(formats, list) or not formats:
+        raise _error(web.HTTPBadRequest, "'formats' must be a non-empty list")
+    unsupported = [f for f in formats if f not in CAMPAIGN_FORMATS]
+    if unsupported:
+        raise _error(web.HTTPBadRequest,
+                     f"Unsupported formats: {unsupported}; choose from {', '.join(CAMPAIGN_FORMATS)}")
+    return formats
+
+
+def _parse_query(body: Dict[str, Any]) -> str:
+    query = body.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise _error(web.HTTPBadRequest, "'query' must be a non-empty string")
+    return query
+
+
+def _generate(workflow: Any, query: str, formats: Optional[List[str]]) -> Callable[[], Awaitable[Any]]:
+    if formats:
+        return lambda: workflow.arun_campaign(query, formats)
+    return lambda: workflow.arun(query)
+
+
+def _submit(request: web.Request, runs: List[Callable[[], Awaitable[Any]]]) -> List[asyncio.Future]:
+    """Queue jobs, turning a full queue into 429 and shutdown into 503"""
+    try:
+        return request.app[POOL_KEY].submit_many(runs, request.app[SETTINGS_KEY].request_timeout)
+    except ServiceBusy as e:
+        raise _error(web.HTTPTooManyRequests, str(e), headers={"Retry-After": "1"})
+    except ServiceDraining as e:
+        raise _error(web.HTTPServiceUnavailable, str(e))
+
+
+async def generate(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    query, formats = _parse_query(body), _parse_formats(body)
+
+    future = _submit(request, [_generate(request.app[WORKFLOW_KEY], query, formats)])[0]
+    try:
+        state = await future
+    except asyncio.TimeoutError as e:
+        raise _error(web.HTTPGatewayTimeout, str(e))
+    except Exception as e:
+        raise _error(web.HTTPInternalServerError, str(e))
+    return web.json_response(result_payload(state), dumps=_dumps)
+
+
+async def batch(request: web.Request) -> web.Response:
+    body = await _read_json(request)
+    settings = request.app[SETTINGS_KEY]
+    queries = body.get("queries")
+    if not isinstance(queries, list) or not queries:
+        raise _error(web.HTTPBadRequest, "'queries' must be a non-empty list")
+    if len(queries) > settings.max_batch_size:
+        raise _error(web.HTTPBadRequest, f"At most {settings.max_batch_size} queries per batch")
+    try:
+        items = normalize_queries(queries)
+    except (ValueError, AttributeError) as e:
+        raise _error(web.HTTPBadRequest, str(e))
+    formats = _parse_formats(body)
+
+    workflow = request.app[WORKFLOW_KEY]
+    futures = _submit(request, [_generate(workflow, item["query"], formats) for item in items])
+    outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+    results = []
+    for item, outcome in zip(items, outcomes):
+        record = {"id": item["id"], "query": item["query"]}
+        if isinstance(outcome, BaseException):
+            # One failed topic does not fail the batch
+            record.update(result=None, error=str(outcome))
+        else:
+            record.update(result=result_payload(outcome), error=outcome.get("error") or None)
+        results.append(record)
+    return web.json_response({"results": results}, dumps=_dumps)
+
+
+async def stream(request: web.Request) -> web.StreamResponse:
+    """Workflow events as server-sent events; the final event is `done` (or `error`)"""
+    body = await _read_json(request)
+    query, formats = _parse_query(body), _parse_formats(body)
+
+    workflow = request.app[WORKFLOW_KEY]
+    events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+    async def produce() -> None:
+        async for event in workflow.astream(query, formats):
+            events.put_nowait(event)
+
+    future = _submit(request, [produce])[0]
+    future.add_done_callback(lambda _: events.put_nowait(None))
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    try:
+        while (event := await events.get()) is not None:
+            await response.write(f"event: {event['event']}\ndata: {_dumps(event)}\n\n".encode())
+        if not future.cancelled() and future.exception() is not None:
+            error = {"event": "error", "error": str(future.exception())}
+            await response.write(f"event: error\ndata: {_dumps(error)}\n\n".encode())
+    finally:
+        # A disconnected client frees its queue slot if the job has not started
+        future.cancel()
+    await response.write_eof()
+    return response
+
+
+async def submit_job(request: web.Request) -> web.Response:
+    """Queue a generation in the background; poll GET /jobs/{id} or pass a callback_url"""
+    body = await _read_json(request)
+    query, formats = _parse_query(body), _parse_formats(body)
+    priority = body.get("priority", 0)
+    if not isinstance(priority, int):
+        raise _error(web.HTTPBadRequest, "'priority' must be an integer")
+    if not request.app[POOL_KEY].accepting:
+        raise _error(web.HTTPServiceUnavailable, "Service is shutting down")
+    jobs = request.app[JOBS_KEY]
+    callback_url = body.get("callback_url")
+    if callback_url is not None:
+        try:
+            check_callback_url(callback_url, jobs.callback_hosts)
+        except ValueError as e:
+            raise _error(web.HTTPBadRequest, str(e))
+    # Routing may consult the LLM, so classify the job off the event loop
+    job_id = await asyncio.to_thread(jobs.submit, query, formats, priority, callback_url)
+    return web.json_response({"job_id": job_id, "status": "queued"}, status=202,
+                             headers={"Location": f"/jobs/{job_id}"})
+
+
+async def get_job(request: web.Request) -> web.Response:
+    job = await asyncio.to_thread(request.app[JOBS_KEY].get, request.match_info["job_id"])
+    if job is None:
+        raise _error(web.HTTPNotFound, "Unknown job")
+    return web.json_response(job, dumps=_dumps)
+
+
+async def health(request: web.Request) -> web.Response:
+    """Queue and worker counters; 503 while draining so load balancers stop routing here"""
+    pool = request.app[POOL_KEY]
+    status = "ok" if pool.accepting else "draining"
+    return web.json_response({"status": status, **pool.stats()}, status=200 if pool.accepting else 503)
+
+
+async def metrics(request: web.Request) -> web.Response:
+    """Run/LLM/HTTP metrics from the workflow's telemetry plus this replica's queue gauges"""
+    lines = [request.app[WORKFLOW_KEY].telemetry.prometheus()]
+    for name, value in request.app[POOL_KEY].stats().items():
+        lines.append(f"# TYPE contentalchemy_service_{name} gauge\ncontentalchemy_service_{name} {value:g}\n")
+    return web.Response(text="".join(lines), content_type="text/plain", charset="utf-8")
+
+
+async def get_trace(request: web.Request) -> web.Response:
+    trace = request.app[WORKFLOW_KEY].telemetry.get_trace(request.match_info["trace_id"])
+    if trace is None:
+        raise _error(web.HTTPNotFound, "Unknown trace (only the most recent monitoring.max_traces are kept)")
+    return web.json_response(trace, dumps=_dumps)
+
+
+def create_app(workflow: Any, settings: Optional[ServiceConfig] = None,
+               jobs: Optional[JobManager] = None) -> web.Application:
+    """aiohttp application serving `workflow` (anything with arun/arun_campaign/astream).
+    
+    The /jobs endpoints are only mounted when a JobManager is given, /metrics and
+    /traces when the workflow has telemetry enabled.
+    """
+    settings = settings or ServiceConfig()
+    app = web.Application()
+    app[WORKFLOW_KEY] = workflow
+    app[SETTINGS_KEY] = settings
+    app[POOL_KEY] = WorkerPool(settings.workers, settings.queue_size)
+    if jobs is not None:
+        app[JOBS_KEY] = jobs
+
+    async def on_startup(app: web.Application) -> None:
+        await app[POOL_KEY].start()
+        warm_up = getattr(app[WORKFLOW_KEY], "warm_up", None)
+        if warm_up is not None:
+            # Build agents and the graph off the event loop before taking traffic
+            await asyncio.to_thread(warm_up)
+        if jobs is not None:
+            jobs.start()
+
+    async def on_shutdown(app: web.Application) -> None:
+        await app[POOL_KEY].drain(settings.shutdown_timeout)
+        if jobs is not None:
+            # Running jobs finish; queued ones stay queued (and survive restarts with Redis)
+            await asyncio.to_thread(jobs.stop, settings.shutdown_timeout)
+        aclose = getattr(app[WORKFLOW_KEY], "aclose", None)
+        if aclose is not None:
+            # After draining, so no accepted request loses its LLM connections
+            await aclose()
+
+    async def on_cleanup(app: web.Application) -> None:
+        await app[POOL_KEY].close()
+
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/generate", generate)
+    app.router.add_post("/batch", batch)
+    app.router.add_post("/stream", stream)
+    app.router.add_get("/health", health)
+    if jobs is not None:
+        app.router.add_post("/jobs", submit_job)
+        app.router.add_get("/jobs/{job_id}", get_job)
+    telemetry = getattr(workflow, "telemetry", None)
+    if telemetry is not None and telemetry.enabled:
+        app.router.add_get("/metrics", metrics)
+        app.router.add_get("/traces/{trace_id}", get_trace)
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the ContentAlchemy workflow over HTTP")
+    parser.add_argument("--host", help="Bind address (default: service.host)")
+    parser.add_argument("--port", type=int, help="Port (default: service.port)")
+    parser.add_argument("--workers", type=int, help="Concurrent generations (default: service.workers)")
+    parser.add_argument("--queue-size", type=int, help="Waiting requests before 429 (default: service.queue_size)")
+    args = parser.parse_args(argv)
+
+    from src.workflow.langgraph_workflow import get_workflow
+
+    config = Config()
+    if not config.validate():
+        return 1
+    settings = config.service
+    for field in ("host", "port", "workers", "queue_size"):
+        if getattr(args, field) is not None:
+            setattr(settings, field, getattr(args, field))
+
+    # run_app handles SIGINT/SIGTERM: stop listening, finish in-flight requests, then drain the pool
+    workflow = get_workflow(config)
+    jobs = JobManager.from_config(workflow, config.jobs)
+    web.run_app(create_app(workflow, settings, jobs), host=settings.host, port=settings.port,
+                shutdown_timeout=settings.shutdown_timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
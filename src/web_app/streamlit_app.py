@@ -9,8 +9,22 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 import streamlit as st
-from src.workflow.langgraph_workflow import ContentAlchemyWorkflow
-from src.core.config import Config
+from src.workflow.langgraph_workflow import ContentAlchemyWorkflow, get_workflow
+from src.core.config import Config, load_env_files
+
+
+@st.cache_resource(show_spinner=False)
+def load_workflow() -> ContentAlchemyWorkflow:
+    """One workflow shared by every browser session; its agents are built on first use.
+    
+    An invalid config raises instead of returning, so nothing is cached and a
+    later rerun picks up the fixed environment or .env file.
+    """
+    load_env_files(reload=True)
+    config = Config()
+    if not config.validate():
+        raise ValueError("OPENAI_API_KEY is not set")
+    return get_workflow(config)
 
 
 def format_metadata_value(value):
@@ -29,6 +43,35 @@ def format_metadata_value(value):
         return str(value)
 
 
+def render_diagnostics(workflow: ContentAlchemyWorkflow, trace_id: str):
+    """Where the time, tokens and money of one run went (needs monitoring.enabled)"""
+    trace = workflow.telemetry.get_trace(trace_id)
+    if trace is None:
+        st.caption("Trace no longer kept in memory.")
+        return
+    spans = trace["spans"]
+    root = next(s for s in spans if s["parent_span_id"] is None)
+    calls = [s["attributes"] for s in spans if "prompt_tokens" in s["attributes"]]
+    col_a, col_b = st.columns(2)
+    col_a.metric("Wall time", f"{root['duration_ms'] / 1000:.2f}s")
+    col_b.metric("Est. cost", f"${sum(s['attributes'].get('cost_usd', 0.0) for s in spans):.4f}")
+    col_a.metric("LLM calls", len(calls))
+    col_b.metric("Tokens", sum(c["prompt_tokens"] + c.get("completion_tokens", 0) for c in calls))
+    st.dataframe([
+        {
+            "span": s["name"],
+            "kind": s["kind"],
+            "ms": s["duration_ms"],
+            "queue wait ms": round(s["attributes"].get("queue_wait", 0.0) * 1000, 1),
+            "tokens in/out": (f"{s['attributes']['prompt_tokens']}/{s['attributes'].get('completion_tokens', 0)}"
+                              if "prompt_tokens" in s["attributes"] else ""),
+            "cache": {True: "hit", False: "miss"}.get(s["attributes"].get("cache_hit"), ""),
+            "status": s["status"].get("message", "ok"),
+        }
+        for s in spans
+    ], use_container_width=True, hide_index=True)
+
+
 def main():
     st.set_page_config(
         page_title="ContentAlchemy",
@@ -73,13 +116,12 @@ def main():
     st.markdown('<div class="sub-header">AI-Powered Content Marketing Assistant</div>', unsafe_allow_html=True)
     
     # Initialize workflow
-    if 'workflow' not in st.session_state:
-        config = Config()
-        if not config.validate():
-            st.error("⚠️ Please set OPENAI_API_KEY in your environment variables")
-            st.info("Create a .env file with: OPENAI_API_KEY=your_key_here")
-            st.stop()
-        st.session_state.workflow = ContentAlchemyWorkflow(config)
+    try:
+        workflow = load_workflow()
+    except ValueError:
+        st.error("⚠️ Please set OPENAI_API_KEY in your environment variables")
+        st.info("Create a .env file with: OPENAI_API_KEY=your_key_here")
+        st.stop()
     
     # Initialize chat history
     if 'messages' not in st.session_state:
@@ -108,6 +150,12 @@ def main():
         if st.button("🗑️ Clear Chat"):
             st.session_state.messages = []
             st.rerun()
+        
+        trace_ids = [m["trace_id"] for m in st.session_state.messages if m.get("trace_id")]
+        if workflow.telemetry.enabled and trace_ids:
+            st.divider()
+            with st.expander("🩺 Diagnostics (last run)"):
+                render_diagnostics(workflow, trace_ids[-1])
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -141,12 +189,22 @@ def main():
             # Add user message
             st.session_state.messages.append({"role": "user", "content": prompt})
             
-            # Generate response
+            # Generate response, rendering tokens in the preview panel as they arrive
+            with col2:
+                live_preview = st.empty()
             with st.spinner("🤖 Generating content..."):
                 try:
-                    result = st.session_state.workflow.run(prompt)
+                    result = None
+                    streamed_text = ""
+                    for event in workflow.stream(prompt):
+                        if event["event"] == "token":
+                            streamed_text += event["text"]
+                            live_preview.markdown(streamed_text + "▌")
+                        elif event["event"] == "done":
+                            result = event["data"]
+                    live_preview.empty()
                     
-                    response_content = result.get("content", {})
+                    response_content = result.get("content", {}) if result else {}
                     
                     if response_content:
                         content_type = response_content.get('type', 'content')
@@ -154,13 +212,15 @@ def main():
                         st.session_state.messages.append({
                             "role": "assistant",
                             "content": f"✅ I've generated your {content_type}. Check the preview panel!",
-                            "data": response_content
+                            "data": response_content,
+                            "trace_id": result.get("trace_id")
                         })
                     else:
                         st.session_state.messages.append({
                             "role": "assistant",
                             "content": "❌ Sorry, I couldn't generate content. Please try again.",
-                            "data": None
+                            "data": None,
+                            "trace_id": result.get("trace_id") if result else None
                         })
                 except Exception as e:
                     st.session_state.messages.append({
@@ -190,8 +250,8 @@ def main():
                 st.info(f"📌 Type: {content_type.capitalize()}")
                 
                 # Display metadata in a nice format
-                metadata_keys = ["word_count", "read_time", "seo_score", "keywords", "hashtags", 
-                                "character_count", "engagement_score", "ideal_length", "sources", 
+                metadata_keys = ["word_count", "read_time", "seo_score", "quality_score", "quality_issues",
+                                "keywords", "hashtags", "character_count", "engagement_score", "ideal_length", "sources", 
                                 "topic", "prompt", "original_request", "size"]
                 
                 metadata_found = False
@@ -1,6 +1,6 @@
 """
 ContentAlchemy Workflow Package
 """
-from .langgraph_workflow import ContentAlchemyWorkflow
+from .langgraph_workflow import ContentAlchemyWorkflow, get_workflow
 
-__all__ = ['ContentAlchemyWorkflow']
+__all__ = ['ContentAlchemyWorkflow', 'get_workflow']
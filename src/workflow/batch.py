@@ -0,0 +1,145 @@
+"""
+Batch generation for content calendars
+
+Usage:
+    python -m src.workflow.batch topics.jsonl -o results.jsonl --max-concurrency 8
+"""
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+QUERY_FIELDS = ("query", "prompt", "topic", "body", "title")
+ID_FIELDS = ("id", "request_id")
+
+
+def _normalize_item(item: Any, index: int) -> Dict[str, Any]:
+    """Turn a raw string or record into {'id', 'query'}"""
+    if isinstance(item, str):
+        return {"id": index, "query": item}
+    query = next((item[f] for f in QUERY_FIELDS if item.get(f)), None)
+    if query is None:
+        raise ValueError(f"Row {index} has none of the query fields {QUERY_FIELDS}")
+    item_id = next((item[f] for f in ID_FIELDS if item.get(f) not in (None, "")), index)
+    return {"id": item_id, "query": query}
+
+
+def normalize_queries(items: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Turn raw strings or records into [{'id', 'query'}], ids defaulting to position"""
+    return [_normalize_item(item, i) for i, item in enumerate(items)]
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """Read queries from a JSONL or CSV file"""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(fh))
+        else:
+            rows = [json.loads(line) for line in fh if line.strip()]
+    return normalize_queries(rows)
+
+
+class BatchStats:
+    """Progress and throughput counters for a batch run"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsed": round(elapsed, 3),
+            "throughput": round(self.completed / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+
+def iter_batch(run: Callable[[str], Dict[str, Any]], queries: Iterable[Any],
+               max_concurrency: int = 4, stats: Optional[BatchStats] = None) -> Iterator[Dict[str, Any]]:
+    """Run queries on a bounded worker pool, yielding records as they finish"""
+    items = [dict(_normalize_item(q, i), index=i) for i, q in enumerate(queries)]
+    stats = stats or BatchStats(len(items))
+
+    def _run_one(item: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        record = {"index": item["index"], "id": item["id"], "query": item["query"]}
+        try:
+            result = run(item["query"])
+            record["result"] = result
+            record["error"] = result.get("error") or None
+        except Exception as e:
+            # One failed topic must not take down the rest of the calendar
+            record["result"] = None
+            record["error"] = str(e)
+        record["elapsed"] = round(time.perf_counter() - start, 3)
+        return record
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = [pool.submit(_run_one, item) for item in items]
+        for future in as_completed(futures):
+            record = future.result()
+            stats.record(record["error"] is None)
+            yield record
+
+
+def _print_progress(record: Dict[str, Any], stats: BatchStats) -> None:
+    snapshot = stats.as_dict()
+    status = "ok" if record["error"] is None else f"failed: {record['error']}"
+    print(
+        f"[{snapshot['completed']}/{snapshot['total']}] {record['id']} {status} "
+        f"({record['elapsed']}s) | {snapshot['throughput']} req/s | failed {snapshot['failed']}",
+        file=sys.stderr
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate content for a batch of queries")
+    parser.add_argument("input", help="JSONL or CSV file with one query per row")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="Output JSONL path")
+    parser.add_argument("-c", "--max-concurrency", type=int, default=4, help="Worker pool size")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Suppress per-item progress")
+    args = parser.parse_args(argv)
+
+    from src.core.config import Config
+    from src.workflow.langgraph_workflow import ContentAlchemyWorkflow
+
+    config = Config()
+    if not config.validate():
+        return 1
+
+    queries = load_queries(args.input)
+    workflow = ContentAlchemyWorkflow(config)
+    stats = BatchStats(len(queries))
+
+    with open(args.output, "w", encoding="utf-8") as out:
+        for record in iter_batch(workflow.run, queries, args.max_concurrency, stats):
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            if not args.quiet:
+                _print_progress(record, stats)
+
+    print(json.dumps(stats.as_dict()), file=sys.stderr)
+    return 0 if stats.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
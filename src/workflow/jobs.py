@@ -0,0 +1,378 @@
+"""
+Background jobs for long-running generations
+
+submit() returns a job ID at once; worker threads pull jobs in priority order
+and run them through the workflow. Results are polled with get()/wait() or
+pushed to listeners and per-job callback URLs.
+
+Each agent type (research, blog, linkedin, image, campaign) has its own
+concurrency cap, so a burst of slow image jobs cannot occupy every worker
+while text jobs wait.
+"""
+import heapq
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+
+JOB_TYPES = ("research", "blog", "linkedin", "image", "campaign")
+TERMINAL_STATUSES = ("succeeded", "failed")
+RESULT_FIELDS = ("query", "run_id", "trace_id", "routing_info", "content", "outputs", "errors", "messages", "error")
+
+
+def result_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a final workflow state a client needs (research_data is inside content)"""
+    return {field: state.get(field) for field in RESULT_FIELDS if field in state}
+
+
+def check_callback_url(url: Any, allowed_hosts: Iterable[str]) -> str:
+    """Return `url` if job results may be POSTed to it, else raise ValueError.
+
+    The server makes the request, so only http(s) URLs on an allowlisted host
+    are accepted; with no hosts configured, callbacks are disabled.
+    """
+    allowed = {host.lower() for host in allowed_hosts}
+    if not allowed:
+        raise ValueError("Callbacks are disabled (allow hosts with jobs.callback_hosts)")
+    if not isinstance(url, str):
+        raise ValueError("'callback_url' must be a string")
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("'callback_url' must be an http(s) URL")
+    if parts.hostname.lower() not in allowed:
+        raise ValueError(f"Callback host '{parts.hostname}' is not in jobs.callback_hosts")
+    return url
+
+
+def new_job(query: str, agent_type: str, formats: Optional[List[str]] = None, priority: int = 0,
+            callback_url: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4().hex,
+        "query": query,
+        "formats": list(formats) if formats else None,
+        "agent_type": agent_type,
+        "priority": priority,
+        "callback_url": callback_url,
+        "status": "queued",
+        "attempts": 0,
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+class MemoryJobQueue:
+    """In-process job queue: one priority heap per agent type plus a bounded job table"""
+
+    def __init__(self, max_jobs: int = 10000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._heaps: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            # Higher priority first, FIFO within a priority
+            heapq.heappush(self._heaps.setdefault(job["agent_type"], []),
+                           (-job["priority"], next(self._seq), job["id"]))
+            self._evict()
+
+    def claim(self, agent_types: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Pop the highest-priority queued job among `agent_types`, if any"""
+        with self._lock:
+            heads = [(heap[0], agent_type) for agent_type in agent_types
+                     if (heap := self._heaps.get(agent_type))]
+            if not heads:
+                return None
+            _, agent_type = min(heads)
+            _, _, job_id = heapq.heappop(self._heaps[agent_type])
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _evict(self) -> None:
+        # Forget the oldest finished jobs once the table is full
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [j for j, job in self._jobs.items() if job["status"] in TERMINAL_STATUSES]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.max_jobs:
+                return
+
+
+class RedisJobQueue:
+    """Redis-backed job queue shared by every replica.
+
+    Jobs are JSON strings under `<prefix>job:<id>`; each agent type has a
+    sorted set of queued job IDs scored by (priority, submission time).
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "contentalchemy:jobs:",
+                 result_ttl: int = 86400):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisJobQueue requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _queue_key(self, agent_type: str) -> str:
+        return f"{self.prefix}queue:{agent_type}"
+
+    @staticmethod
+    def _score(job: Dict[str, Any]) -> float:
+        # Lower scores pop first: priority dominates, submission time breaks ties
+        return -job["priority"] * 1e10 + job["created_at"]
+
+    def put(self, job: Dict[str, Any]) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self._job_key(job["id"]), json.dumps(job, default=str))
+        pipe.zadd(self._queue_key(job["agent_type"]), {job["id"]: self._score(job)})
+        pipe.execute()
+
+    def claim(self, agent_types: Iterable[str]) -> Optional[Dict[str, Any]]:
+        while True:
+            heads = []
+            for agent_type in agent_types:
+                head = self.client.zrange(self._queue_key(agent_type), 0, 0, withscores=True)
+                if head:
+                    heads.append((head[0][1], agent_type, head[0][0]))
+            if not heads:
+                return None
+            _, agent_type, job_id = min(heads)
+            # ZREM is atomic, so exactly one replica wins each job
+            if self.client.zrem(self._queue_key(agent_type), job_id):
+                return self.get(job_id)
+
+    def update(self, job: Dict[str, Any]) -> None:
+        ttl = self.result_ttl if job["status"] in TERMINAL_STATUSES else None
+        self.client.set(self._job_key(job["id"]), json.dumps(job, default=str), ex=ttl or None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._job_key(job_id))
+        return json.loads(raw) if raw else None
+
+
+def create_job_queue(jobs_config) -> Any:
+    """Build the queue backend selected by a JobsConfig"""
+    backend = jobs_config.backend.lower()
+    if backend == "memory":
+        return MemoryJobQueue()
+    if backend == "redis":
+        return RedisJobQueue(url=jobs_config.redis_url, result_ttl=jobs_config.result_ttl)
+    raise ValueError(f"Unknown job backend '{jobs_config.backend}'")
+
+
+class JobManager:
+    """Runs queued generations on worker threads with retries and per-agent caps.
+
+    `concurrency` maps agent type -> max jobs of that type running at once in
+    this process; types not listed may use every worker. `callback_hosts`
+    lists the hosts a job's callback_url may point at (none: no callbacks).
+    """
+
+    def __init__(self, workflow: Any, queue: Any = None, workers: int = 4,
+                 concurrency: Optional[Dict[str, int]] = None, max_retries: int = 2,
+                 retry_backoff: float = 2.0, poll_interval: float = 0.5,
+                 callback_hosts: Iterable[str] = ()):
+        self.workflow = workflow
+        self.queue = queue or MemoryJobQueue()
+        self.workers = max(1, workers)
+        self.concurrency = dict(concurrency or {})
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.callback_hosts = list(callback_hosts)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._running: Counter = Counter()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, workflow: Any, jobs_config) -> "JobManager":
+        return cls(
+            workflow,
+            queue=create_job_queue(jobs_config),
+            workers=jobs_config.workers,
+            concurrency=jobs_config.concurrency,
+            max_retries=jobs_config.max_retries,
+            retry_backoff=jobs_config.retry_backoff,
+            callback_hosts=jobs_config.callback_hosts,
+        )
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `callback(job)` on every status change (from a worker thread)"""
+        self._listeners.append(callback)
+
+    def _agent_type(self, query: str, formats: Optional[List[str]]) -> str:
+        if formats:
+            return formats[0] if len(formats) == 1 else "campaign"
+        # Routing is memoized and usually local, so classifying at submit time is cheap
+        agent_type = self.workflow.query_handler.route_query(query)["primary_agent"]
+        # Agents without a job type of their own (e.g. strategist) share the research cap;
+        # an unlisted type would never be claimed
+        return agent_type if agent_type in JOB_TYPES else "research"
+
+    def submit(self, query: str, formats: Optional[Iterable[str]] = None, priority: int = 0,
+               callback_url: Optional[str] = None) -> str:
+        """Queue a generation and return its job ID; higher `priority` runs first.
+
+        Raises ValueError for a callback_url outside `callback_hosts`.
+        """
+        if callback_url is not None:
+            check_callback_url(callback_url, self.callback_hosts)
+        formats = list(formats) if formats else None
+        job = new_job(query, self._agent_type(query, formats), formats, priority, callback_url)
+        self.queue.put(job)
+        self._notify()
+        return job["id"]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.queue.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job finishes (or `timeout` passes) and return its record"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return job
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return job
+            with self._wakeup:
+                self._wakeup.wait(min(self.poll_interval, remaining) if remaining is not None
+                                  else self.poll_interval)
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for running ones to finish"""
+        self._stopping.set()
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _notify(self) -> None:
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _open_types(self) -> List[str]:
+        return [t for t in JOB_TYPES if self._running[t] < self.concurrency.get(t, self.workers)]
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        # Claim and count the slot under one lock so two workers cannot overshoot a cap
+        with self._wakeup:
+            job = self.queue.claim(self._open_types())
+            if job is not None:
+                self._running[job["agent_type"]] += 1
+            return job
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            try:
+                self._process(job)
+            finally:
+                with self._wakeup:
+                    self._running[job["agent_type"]] -= 1
+                    self._wakeup.notify_all()
+
+    def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job["attempts"] > 1 and getattr(self.workflow, "checkpointer", None) is not None:
+            # A checkpointed retry continues from the node that failed instead of starting over
+            try:
+                return self.workflow.resume(job["id"])
+            except KeyError:
+                pass
+        if job["formats"]:
+            return self.workflow.run_campaign(job["query"], job["formats"], run_id=job["id"])
+        return self.workflow.run(job["query"], run_id=job["id"])
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        job.update(status="running", attempts=job["attempts"] + 1, started_at=time.time())
+        self._save(job)
+        try:
+            state = self._execute(job)
+            error = state.get("error") or None
+        except Exception as e:
+            state, error = None, str(e)
+
+        if error is None:
+            job.update(status="succeeded", result=result_payload(state), error=None, finished_at=time.time())
+            self._save(job)
+        elif job["attempts"] <= self.max_retries:
+            job.update(status="retrying", error=error)
+            self._save(job)
+            delay = self.retry_backoff * (2 ** (job["attempts"] - 1))
+            timer = threading.Timer(delay, self._requeue, args=(job,))
+            timer.daemon = True
+            timer.start()
+        else:
+            job.update(status="failed", result=result_payload(state) if state else None, error=error,
+                       finished_at=time.time())
+            self._save(job)
+
+    def _requeue(self, job: Dict[str, Any]) -> None:
+        job.update(status="queued")
+        self.queue.put(job)
+        self._notify()
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        self.queue.update(job)
+        for listener in self._listeners:
+            try:
+                listener(dict(job))
+            except Exception:
+                # A broken listener must not fail the job
+                pass
+        if job["status"] in TERMINAL_STATUSES and job.get("callback_url"):
+            self._post_callback(job)
+
+    @staticmethod
+    def _post_callback(job: Dict[str, Any]) -> None:
+        try:
+            requests.post(job["callback_url"], data=json.dumps(job, default=str),
+                          headers={"Content-Type": "application/json"}, timeout=10,
+                          allow_redirects=False)  # a redirect could leave the allowed hosts
+        except requests.RequestException:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._wakeup:
+            running = {t: n for t, n in self._running.items() if n}
+        return {"workers": self.workers, "running": running, "concurrency": self.concurrency}
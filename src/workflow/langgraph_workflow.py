@@ -1,24 +1,64 @@
 """
 LangGraph workflow implementation for multi-agent orchestration
 """
-from typing import Dict, Any, TypedDict, Annotated
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from src.agents.query_handler import QueryHandlerAgent
-from src.agents.research_agent import DeepResearchAgent
-from src.agents.blog_writer import SEOBlogWriterAgent
-from src.agents.linkedin_writer import LinkedInWriterAgent
-from src.agents.image_generator import ImageGenerationAgent
-from src.agents.content_strategist import ContentStrategistAgent
+from typing import (TYPE_CHECKING, Dict, Any, TypedDict, Annotated, Iterable, List, Iterator, AsyncIterator,
+                    Callable, Optional)
 from src.core.config import Config
+from src.core.lazy import lazy_resource
+from src.core.llm_registry import LLMRegistry, create_chat_model
+from src.core.telemetry import NOOP_SPAN, Telemetry, annotate, traced
+from src.workflow.batch import iter_batch
+import asyncio
 import operator
+import os
+import queue
+import threading
+import uuid
+
+# LangGraph, LangChain and the agents (which pull in the OpenAI SDK) take
+# over a second to import; they load when the workflow first needs them so a
+# cold web start only pays for what it renders.
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+    from langgraph.utils import RunnableCallable
+    from src.agents.blog_writer import SEOBlogWriterAgent
+    from src.agents.content_strategist import ContentStrategistAgent
+    from src.agents.image_generator import ImageGenerationAgent
+    from src.agents.linkedin_writer import LinkedInWriterAgent
+    from src.agents.query_handler import QueryHandlerAgent
+    from src.agents.research_agent import DeepResearchAgent
+    from src.core.routing_cache import RoutingCache
+    from src.core.routing_engine import RoutingEngine
+
+
+# Output formats that are written from a shared research pass
+RESEARCH_FORMATS = ("research", "blog", "linkedin")
+# Formats produced by their own graph node after research
+FORMAT_NODES = ("blog", "linkedin", "image")
+# Formats the quality gate validates and repairs (config.quality_gate)
+REVIEWED_FORMATS = ("blog", "linkedin")
+
+
+def _merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer letting parallel nodes each add their own key"""
+    return {**(left or {}), **(right or {})}
 
 
 class WorkflowState(TypedDict):
     """State for the workflow"""
     query: str
+    run_id: str
+    formats: List[str]
     messages: Annotated[list, operator.add]
     routing_info: Dict[str, Any]
+    research_data: Dict[str, Any]
+    outputs: Annotated[Dict[str, Any], _merge_dicts]
+    errors: Annotated[Dict[str, str], _merge_dicts]
+    # Quality gate: per-format {"issues", "attempts", "repairs"} and the run's repair token spend
+    quality: Dict[str, Dict[str, Any]]
+    repair_tokens: int
     content: Dict[str, Any]
     error: str
 
@@ -26,55 +66,425 @@ class WorkflowState(TypedDict):
 class ContentAlchemyWorkflow:
     """LangGraph workflow for content generation"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, checkpointer: Optional["BaseCheckpointSaver"] = None):
         self.config = config
-        self.llm = ChatOpenAI(
-            api_key=config.openai.api_key,
-            model=config.openai.model,
-            temperature=config.openai.temperature
+        # Any LangGraph checkpointer can be passed in; otherwise config.checkpoints decides
+        if checkpointer is not None:
+            self.checkpointer = checkpointer
+        # Big model for long-form, fast model for routing/keywords/hashtags
+        self.llm_registry = LLMRegistry(config, client_factory=create_chat_model)
+        # Per-run traces and metrics (config.monitoring); a no-op when disabled
+        self.telemetry = Telemetry.from_config(config.monitoring)
+        # Agents, model clients and the compiled graph are built on first use (see lazy_resource)
+    
+    @lazy_resource
+    def checkpointer(self) -> Optional["BaseCheckpointSaver"]:
+        if not self.config.checkpoints.enabled:
+            return None
+        from src.core.checkpoints import create_checkpointer
+        return create_checkpointer(self.config.checkpoints)
+    
+    @property
+    def llm(self) -> Any:
+        return self.llm_registry.big
+    
+    @property
+    def fast_llm(self) -> Any:
+        return self.llm_registry.fast
+    
+    @lazy_resource
+    def query_handler(self) -> "QueryHandlerAgent":
+        from src.agents.query_handler import QueryHandlerAgent
+        routing_engine = self._build_routing_engine(self.config)
+        return QueryHandlerAgent(
+            self.llm_registry.for_task("routing"),
+            routing_engine=routing_engine,
+            confidence_threshold=self.config.routing.confidence_threshold,
+            routing_cache=self._build_routing_cache(self.config, routing_engine)
         )
+    
+    @lazy_resource
+    def research_agent(self) -> "DeepResearchAgent":
+        from src.agents.research_agent import DeepResearchAgent
+        from src.core.search_client import SearchClient
+        from src.utils.prompt_budget import PromptBudget
+        config = self.config
+        return DeepResearchAgent(
+            self.llm,
+            search_client=SearchClient.from_config(config),
+            deep=config.research.deep,
+            fan_out=config.research.fan_out,
+            latency_budget=config.research.latency_budget,
+            max_sources=config.research.max_sources,
+            llm_query_expansion=config.research.llm_query_expansion,
+            prompt_budget=PromptBudget.from_config(config, config.research.context_tokens),
+            fast_llm=self.fast_llm
+        )
+    
+    @lazy_resource
+    def blog_writer(self) -> "SEOBlogWriterAgent":
+        from src.agents.blog_writer import SEOBlogWriterAgent
+        from src.utils.prompt_budget import PromptBudget
+        return SEOBlogWriterAgent(
+            self.llm,
+            single_call=self.config.blog_single_call,
+            prompt_budget=PromptBudget.from_config(self.config, self.config.research.blog_context_tokens),
+            fast_llm=self.fast_llm,
+            metrics_budget_ms=self.config.metrics_budget_ms
+        )
+    
+    @lazy_resource
+    def linkedin_writer(self) -> "LinkedInWriterAgent":
+        from src.agents.linkedin_writer import LinkedInWriterAgent
+        return LinkedInWriterAgent(self.llm, fast_llm=self.fast_llm, metrics_budget_ms=self.config.metrics_budget_ms)
+    
+    @lazy_resource
+    def image_generator(self) -> "ImageGenerationAgent":
+        from src.agents.image_generator import ImageGenerationAgent
+        return ImageGenerationAgent(self.llm, rate_limiter=self.llm_registry.rate_limiter)
+    
+    @lazy_resource
+    def strategist(self) -> "ContentStrategistAgent":
+        from src.agents.content_strategist import ContentStrategistAgent
+        return ContentStrategistAgent(self.llm)
+    
+    @lazy_resource
+    def workflow(self) -> "CompiledStateGraph":
+        return self._build_workflow()
+    
+    async def aclose(self) -> None:
+        """Release the shared LLM connection pools, e.g. when a server shuts down"""
+        await self.llm_registry.aclose()
+    
+    def warm_up(self) -> None:
+        """Build every lazily created component now, e.g. before a server takes traffic"""
+        for name in ("checkpointer", "query_handler", "research_agent", "blog_writer", "linkedin_writer",
+                     "image_generator", "strategist", "workflow"):
+            getattr(self, name)
+    
+    @staticmethod
+    def _build_routing_engine(config: Config) -> "RoutingEngine":
+        from src.core.routing_engine import RoutingEngine, RoutingClassifier
+        classifier = None
+        if config.routing.classifier_path and os.path.exists(config.routing.classifier_path):
+            classifier = RoutingClassifier.load(config.routing.classifier_path)
+        return RoutingEngine(classifier=classifier)
+    
+    @staticmethod
+    def _build_routing_cache(config: Config, routing_engine: "RoutingEngine") -> Optional["RoutingCache"]:
+        if not config.routing.cache_enabled:
+            return None
+        from src.core.routing_cache import RoutingCache
+        # Decisions cached under other rules, classifier or threshold are not reused
+        version = routing_engine.fingerprint(config.routing.classifier_path, config.routing.confidence_threshold)
+        return RoutingCache(max_size=config.routing.cache_size, path=config.routing.cache_path or None,
+                            version=version)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """LLM cache hit/miss counters across model tiers (empty when caching is disabled)"""
+        return self.llm_registry.cache_stats()
+    
+    def routing_cache_stats(self) -> Dict[str, Any]:
+        """Routing memo hit-rate counters (empty when disabled)"""
+        if self.query_handler.routing_cache is None:
+            return {}
+        return self.query_handler.routing_cache.stats()
+    
+    @staticmethod
+    def _routing_update(state: WorkflowState, routing_info: Dict[str, Any]) -> Dict[str, Any]:
+        formats = state.get("formats")
+        if not formats:
+            return {
+                "routing_info": routing_info,
+                "messages": [f"Routing to {routing_info['primary_agent']} agent"]
+            }
         
-        # Initialize agents
-        self.query_handler = QueryHandlerAgent(self.llm)
-        self.research_agent = DeepResearchAgent(self.llm)
-        self.blog_writer = SEOBlogWriterAgent(self.llm)
-        self.linkedin_writer = LinkedInWriterAgent(self.llm)
-        self.image_generator = ImageGenerationAgent(self.llm)
-        self.strategist = ContentStrategistAgent(self.llm)
-        
-        self.workflow = self._build_workflow()
+        # Campaigns keep the routed agent as primary (the one that streams) when it was requested
+        routing_info = dict(routing_info, formats=list(formats))
+        if routing_info["primary_agent"] not in formats:
+            routing_info["primary_agent"] = formats[0]
+        return {
+            "routing_info": routing_info,
+            "messages": [f"Running campaign: {', '.join(formats)}"]
+        }
     
-    def _route_query(self, state: WorkflowState) -> WorkflowState:
+    def _route_query(self, state: WorkflowState) -> Dict[str, Any]:
         """Route the query to appropriate agent"""
         routing_info = self.query_handler.route_query(state["query"])
-        state["routing_info"] = routing_info
-        state["messages"].append(f"Routing to {routing_info['primary_agent']} agent")
-        return state
+        return self._routing_update(state, routing_info)
     
-    def _generate_content(self, state: WorkflowState) -> WorkflowState:
-        """Generate content based on routing"""
-        agent_type = state["routing_info"]["primary_agent"]
-        query = state["query"]
+    async def _aroute_query(self, state: WorkflowState) -> Dict[str, Any]:
+        """Async variant of _route_query"""
+        routing_info = await self.query_handler.route_query_async(state["query"])
+        return self._routing_update(state, routing_info)
+    
+    def _content_handler(self, agent_type: str, use_async: bool = False):
+        """Look up the agent method that produces content for an agent type"""
+        handlers = {
+            "research": (self.research_agent.conduct_research, self.research_agent.conduct_research_async),
+            "blog": (self.blog_writer.write_blog, self.blog_writer.write_blog_async),
+            "linkedin": (self.linkedin_writer.write_post, self.linkedin_writer.write_post_async),
+            "image": (self.image_generator.generate_image, self.image_generator.generate_image_async),
+        }
+        if agent_type not in handlers:
+            return None
+        return handlers[agent_type][1 if use_async else 0]
+    
+    def _stream_handler(self, agent_type: str, use_async: bool = False):
+        """Look up the token-streaming agent method for an agent type, if any"""
+        handlers = {
+            "research": (self.research_agent.stream_research, self.research_agent.astream_research),
+            "blog": (self.blog_writer.stream_blog, self.blog_writer.astream_blog),
+            "linkedin": (self.linkedin_writer.stream_post, self.linkedin_writer.astream_post),
+        }
+        if agent_type not in handlers:
+            return None
+        return handlers[agent_type][1 if use_async else 0]
+    
+    @staticmethod
+    def _token_sink(config: Optional["RunnableConfig"]) -> Optional[Callable[[str], None]]:
+        """Token callback installed by stream()/astream(), if this run is streaming"""
+        return (config or {}).get("configurable", {}).get("token_sink")
+    
+    @staticmethod
+    def _formats(state: WorkflowState) -> List[str]:
+        """Output formats requested for this run"""
+        routing_info = state["routing_info"]
+        return routing_info.get("formats") or [routing_info["primary_agent"]]
+    
+    def _call_agent(self, agent_type: str, state: WorkflowState, config: "RunnableConfig" = None,
+                    **kwargs) -> Dict[str, Any]:
+        """Run one agent, streaming its tokens when it produces the primary output"""
+        token_sink = None
+        if agent_type == state["routing_info"]["primary_agent"]:
+            token_sink = self._token_sink(config)
+        streamer = self._stream_handler(agent_type) if token_sink else None
         
+        if streamer:
+            content = None
+            for item in streamer(state["query"], **kwargs):
+                if isinstance(item, dict):
+                    content = item
+                else:
+                    token_sink(item)
+            return content
+        return self._content_handler(agent_type)(state["query"], **kwargs)
+    
+    async def _acall_agent(self, agent_type: str, state: WorkflowState, config: "RunnableConfig" = None,
+                           **kwargs) -> Dict[str, Any]:
+        """Async variant of _call_agent"""
+        token_sink = None
+        if agent_type == state["routing_info"]["primary_agent"]:
+            token_sink = self._token_sink(config)
+        streamer = self._stream_handler(agent_type, use_async=True) if token_sink else None
+        
+        if streamer:
+            content = None
+            async for item in streamer(state["query"], **kwargs):
+                if isinstance(item, dict):
+                    content = item
+                else:
+                    token_sink(item)
+            return content
+        return await self._content_handler(agent_type, use_async=True)(state["query"], **kwargs)
+    
+    def _failure_update(self, state: WorkflowState, agent_type: str, error: Exception) -> Dict[str, Any]:
+        """Record a failed agent in state, or re-raise so a checkpointed run can resume at this node.
+        
+        A format failing next to parallel siblings is always recorded: raising
+        would discard whatever its siblings had not yet written. resume() then
+        re-runs only the recorded formats.
+        """
+        annotate(error=str(error))
+        parallel = agent_type in FORMAT_NODES and len([f for f in self._formats(state) if f in FORMAT_NODES]) > 1
+        if self.checkpointer is not None and not parallel:
+            raise error
+        return {"errors": {agent_type: str(error)}, "messages": [f"Error: {str(error)}"]}
+    
+    def _research_update(self, state: WorkflowState, research: Dict[str, Any]) -> Dict[str, Any]:
+        update = {"research_data": research, "messages": ["Research completed"]}
+        if "research" in self._formats(state):
+            update["outputs"] = {"research": research}
+        return update
+    
+    def _research(self, state: WorkflowState, config: "RunnableConfig" = None) -> Dict[str, Any]:
+        """Run research once; every downstream format node reads it from state"""
         try:
-            if agent_type == "research":
-                content = self.research_agent.conduct_research(query)
-            elif agent_type == "blog":
-                content = self.blog_writer.write_blog(query)
-            elif agent_type == "linkedin":
-                content = self.linkedin_writer.write_post(query)
-            elif agent_type == "image":
-                content = self.image_generator.generate_image(query)
-            else:
-                content = {"error": "Unknown agent type"}
-            
-            state["content"] = content
-            state["messages"].append(f"Content generated successfully")
+            research = self._call_agent("research", state, config)
         except Exception as e:
-            state["error"] = str(e)
-            state["messages"].append(f"Error: {str(e)}")
+            # Without checkpoints downstream formats are still written, just without research context
+            return self._failure_update(state, "research", e)
+        return self._research_update(state, research)
+    
+    async def _aresearch(self, state: WorkflowState, config: "RunnableConfig" = None) -> Dict[str, Any]:
+        """Async variant of _research"""
+        try:
+            research = await self._acall_agent("research", state, config)
+        except Exception as e:
+            return self._failure_update(state, "research", e)
+        return self._research_update(state, research)
+    
+    def _format_node(self, agent_type: str) -> "RunnableCallable":
+        """Graph node writing one output format from the shared research"""
+        def generate(state: WorkflowState, config: "RunnableConfig" = None) -> Dict[str, Any]:
+            try:
+                content = self._call_agent(agent_type, state, config,
+                                           research_data=state.get("research_data") or None)
+            except Exception as e:
+                return self._failure_update(state, agent_type, e)
+            return {"outputs": {agent_type: content}}
+        
+        async def agenerate(state: WorkflowState, config: "RunnableConfig" = None) -> Dict[str, Any]:
+            try:
+                content = await self._acall_agent(agent_type, state, config,
+                                                  research_data=state.get("research_data") or None)
+            except Exception as e:
+                return self._failure_update(state, agent_type, e)
+            return {"outputs": {agent_type: content}}
         
-        return state
+        return self._node(agent_type, generate, agenerate)
+    
+    def _repair_handler(self, agent_type: str, use_async: bool = False):
+        """Look up the agent method that repairs a failing output in place"""
+        handlers = {
+            "blog": (self.blog_writer.repair_blog, self.blog_writer.repair_blog_async),
+            "linkedin": (self.linkedin_writer.repair_post, self.linkedin_writer.repair_post_async),
+        }
+        return handlers[agent_type][1 if use_async else 0]
+    
+    @staticmethod
+    def _repairable_issues(agent_type: str, output: Dict[str, Any]) -> List[str]:
+        """Validation findings of one output that its writer knows how to repair"""
+        from src.utils.quality_validation import NO_HASHTAGS, QualityValidator
+        if agent_type == "blog":
+            return QualityValidator.validate_blog_quality(output["content"])["issues"]
+        report = QualityValidator.validate_linkedin_quality(output["content"])
+        return report["issues"] + [w for w in report["warnings"] if w == NO_HASHTAGS]
+    
+    def _review(self, state: WorkflowState) -> Dict[str, Any]:
+        """Validate every written blog/LinkedIn output; failing ones are routed to repair"""
+        outputs = state.get("outputs", {})
+        previous = state.get("quality") or {}
+        quality = {}
+        for agent_type in self._formats(state):
+            if agent_type in REVIEWED_FORMATS and outputs.get(agent_type):
+                entry = previous.get(agent_type) or {"attempts": 0, "repairs": []}
+                quality[agent_type] = dict(entry, issues=self._repairable_issues(agent_type, outputs[agent_type]))
+        return {"quality": quality}
+    
+    def _pending_repairs(self, state: WorkflowState) -> List[str]:
+        """Formats still failing review with attempts and token budget left"""
+        gate = self.config.quality_gate
+        if state.get("repair_tokens", 0) >= gate.token_budget:
+            return []
+        return [f for f, entry in (state.get("quality") or {}).items()
+                if entry["issues"] and entry["attempts"] < gate.max_attempts]
+    
+    def _after_review(self, state: WorkflowState) -> str:
+        return "repair" if self._pending_repairs(state) else "assemble"
+    
+    @staticmethod
+    def _repair_update(agent_type: str, result: Optional[Dict[str, Any]], update: Dict[str, Any]) -> None:
+        """Fold one format's repair (None when it failed) into the repair node's state update"""
+        entry = dict(update["quality"][agent_type])
+        entry["attempts"] += 1
+        if result is not None:
+            update["outputs"][agent_type] = result
+            update["repair_tokens"] += result["repair_tokens"]
+            entry["repairs"] = entry["repairs"] + result["repairs"]
+            update["messages"].append(f"Repaired {agent_type}: {', '.join(result['repairs']) or 'no edit within the token budget'}")
+        update["quality"][agent_type] = entry
+    
+    def _repair(self, state: WorkflowState) -> Dict[str, Any]:
+        """Fix failing outputs from their drafts, within the run's repair token budget"""
+        update = {"outputs": {}, "quality": dict(state["quality"]), "repair_tokens": state.get("repair_tokens", 0),
+                  "messages": []}
+        for agent_type in self._pending_repairs(state):
+            result = None
+            try:
+                result = self._repair_handler(agent_type)(
+                    state["query"], state["outputs"][agent_type], update["quality"][agent_type]["issues"],
+                    self.config.quality_gate.token_budget - update["repair_tokens"]
+                )
+            except Exception as e:
+                # The unrepaired draft is still delivered
+                annotate(error=str(e))
+                update["messages"].append(f"Repair of {agent_type} failed: {e}")
+            self._repair_update(agent_type, result, update)
+        return update
+    
+    async def _arepair(self, state: WorkflowState) -> Dict[str, Any]:
+        """Async variant of _repair"""
+        update = {"outputs": {}, "quality": dict(state["quality"]), "repair_tokens": state.get("repair_tokens", 0),
+                  "messages": []}
+        for agent_type in self._pending_repairs(state):
+            result = None
+            try:
+                result = await self._repair_handler(agent_type, use_async=True)(
+                    state["query"], state["outputs"][agent_type], update["quality"][agent_type]["issues"],
+                    self.config.quality_gate.token_budget - update["repair_tokens"]
+                )
+            except Exception as e:
+                annotate(error=str(e))
+                update["messages"].append(f"Repair of {agent_type} failed: {e}")
+            self._repair_update(agent_type, result, update)
+        return update
+    
+    @staticmethod
+    def _node(name: str, func: Callable, afunc: Optional[Callable] = None) -> "RunnableCallable":
+        """Graph node whose sync and async implementations each run in a telemetry span"""
+        from langgraph.utils import RunnableCallable
+        return RunnableCallable(traced(func, name, "node"), afunc and traced(afunc, name, "node"), name=name)
+    
+    @staticmethod
+    def _campaign_result(state: WorkflowState, formats: List[str]) -> Dict[str, Any]:
+        """One combined result for every format of a campaign"""
+        outputs = state.get("outputs", {})
+        errors = {f: e for f, e in state.get("errors", {}).items() if f in formats and e}
+        sections = []
+        for agent_type in formats:
+            item = outputs.get(agent_type)
+            if not item:
+                continue
+            body = item.get("content") or (f"![{state['query']}]({item['image_url']})" if item.get("image_url") else "")
+            sections.append(f"## {agent_type.title()}\n\n{body}")
+        return {
+            "content": "\n\n".join(sections),
+            "formats": formats,
+            "items": {f: outputs[f] for f in formats if f in outputs},
+            "errors": errors,
+            "research": state.get("research_data", {}),
+            "topic": state["query"],
+            "type": "campaign"
+        }
+    
+    def _assemble(self, state: WorkflowState) -> Dict[str, Any]:
+        """Expose the primary format's output (or the combined campaign) as the run's content"""
+        formats = self._formats(state)
+        if len(formats) > 1:
+            campaign = self._campaign_result(state, formats)
+            if not campaign["items"]:
+                return {"error": "; ".join(f"{f}: {e}" for f, e in campaign["errors"].items())}
+            return {"content": campaign, "messages": ["Content generated successfully"]}
+        
+        primary_agent = state["routing_info"]["primary_agent"]
+        error = state.get("errors", {}).get(primary_agent)
+        if error:
+            return {"error": error}
+        content = state.get("outputs", {}).get(primary_agent) or {"error": "Unknown agent type"}
+        return {"content": content, "messages": ["Content generated successfully"]}
+    
+    def _after_route(self, state: WorkflowState) -> List[str]:
+        formats = self._formats(state)
+        if any(f in RESEARCH_FORMATS for f in formats):
+            return ["research"]
+        return [f for f in formats if f in FORMAT_NODES] or ["assemble"]
+    
+    def _after_research(self, state: WorkflowState) -> List[str]:
+        # Independent formats fan out and run as parallel nodes; ones already written (when
+        # resume() retries failed campaign formats) are not run again
+        outputs = state.get("outputs") or {}
+        return [f for f in self._formats(state) if f in FORMAT_NODES and f not in outputs] or ["assemble"]
     
     def _should_continue(self, state: WorkflowState) -> str:
         """Determine if workflow should continue"""
@@ -82,19 +492,40 @@ class ContentAlchemyWorkflow:
             return "error"
         return "end"
     
-    def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
+    def _build_workflow(self) -> "CompiledStateGraph":
+        """Build the LangGraph workflow: route -> research -> formats (in parallel) -> assemble.
+        
+        With config.quality_gate enabled the formats feed a review node instead,
+        which loops through repair until outputs pass or attempts/tokens run out.
+        """
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(WorkflowState)
+        quality_gate = self.config.quality_gate.enabled
         
         # Add nodes
-        workflow.add_node("route", self._route_query)
-        workflow.add_node("generate", self._generate_content)
+        # Each node carries a sync and an async implementation so the same
+        # graph serves both invoke() and ainvoke()
+        workflow.add_node("route", self._node("route", self._route_query, self._aroute_query))
+        workflow.add_node("research", self._node("research", self._research, self._aresearch))
+        for agent_type in FORMAT_NODES:
+            workflow.add_node(agent_type, self._format_node(agent_type))
+        if quality_gate:
+            workflow.add_node("review", self._node("review", self._review))
+            workflow.add_node("repair", self._node("repair", self._repair, self._arepair))
+        workflow.add_node("assemble", self._node("assemble", self._assemble))
         
         # Add edges
         workflow.set_entry_point("route")
-        workflow.add_edge("route", "generate")
+        workflow.add_conditional_edges("route", self._after_route, ["research", *FORMAT_NODES, "assemble"])
+        workflow.add_conditional_edges("research", self._after_research, [*FORMAT_NODES, "assemble"])
+        for agent_type in FORMAT_NODES:
+            workflow.add_edge(agent_type, "review" if quality_gate else "assemble")
+        if quality_gate:
+            workflow.add_conditional_edges("review", self._after_review, ["repair", "assemble"])
+            workflow.add_edge("repair", "review")
         workflow.add_conditional_edges(
-            "generate",
+            "assemble",
             self._should_continue,
             {
                 "end": END,
@@ -102,17 +533,305 @@ class ContentAlchemyWorkflow:
             }
         )
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
     
-    def run(self, query: str) -> Dict[str, Any]:
-        """Execute the workflow"""
-        initial_state = {
+    @staticmethod
+    def _initial_state(query: str, formats: Optional[List[str]] = None, run_id: str = "") -> Dict[str, Any]:
+        return {
             "query": query,
+            "run_id": run_id,
+            "formats": list(formats or []),
             "messages": [],
             "routing_info": {},
+            "research_data": {},
+            "outputs": {},
+            "errors": {},
+            "quality": {},
+            "repair_tokens": 0,
             "content": {},
             "error": ""
         }
+    
+    def _new_run_id(self, run_id: Optional[str] = None) -> str:
+        if self.checkpointer is None:
+            return ""
+        return run_id or uuid.uuid4().hex
+    
+    @staticmethod
+    def _run_config(run_id: str, **configurable: Any) -> "RunnableConfig":
+        """Per-run config; the run ID is the LangGraph thread its checkpoints are stored under"""
+        if run_id:
+            configurable["thread_id"] = run_id
+        return {"configurable": configurable}
+    
+    def _failed_state(self, input_state: Optional[Dict[str, Any]], config: "RunnableConfig",
+                      error: Exception) -> Dict[str, Any]:
+        """Last checkpointed state of a failed run (or its input), with the error attached"""
+        values = self.workflow.get_state(config).values if self.checkpointer is not None else {}
+        return dict(values or input_state or {}, error=str(error))
+    
+    async def _afailed_state(self, input_state: Optional[Dict[str, Any]], config: "RunnableConfig",
+                             error: Exception) -> Dict[str, Any]:
+        values = (await self.workflow.aget_state(config)).values if self.checkpointer is not None else {}
+        return dict(values or input_state or {}, error=str(error))
+    
+    def _execute(self, input_state: Optional[Dict[str, Any]], config: "RunnableConfig") -> Dict[str, Any]:
+        try:
+            return self.workflow.invoke(input_state, config)
+        except Exception as e:
+            if self.checkpointer is None:
+                raise
+            # Completed nodes are checkpointed; resume(run_id) picks up from here
+            return self._failed_state(input_state, config, e)
+    
+    async def _aexecute(self, input_state: Optional[Dict[str, Any]], config: "RunnableConfig") -> Dict[str, Any]:
+        try:
+            return await self.workflow.ainvoke(input_state, config)
+        except Exception as e:
+            if self.checkpointer is None:
+                raise
+            return await self._afailed_state(input_state, config, e)
+    
+    @staticmethod
+    def _traced(root: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Tag a run's result with its trace ID, marking the trace failed when the run was"""
+        if not root.recording or not isinstance(result, dict):
+            return result
+        if result.get("error"):
+            root.error = result["error"]
+        return dict(result, trace_id=root.trace.trace_id)
+    
+    def run(self, query: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute the workflow.
         
-        result = self.workflow.invoke(initial_state)
-        return result
+        With checkpointing enabled the result carries a ``run_id``; if the run
+        fails part-way, ``resume(run_id)`` continues from the last completed node.
+        """
+        run_id = self._new_run_id(run_id)
+        with self.telemetry.trace("run", query=query, run_id=run_id) as root:
+            result = self._execute(self._initial_state(query, run_id=run_id), self._run_config(run_id))
+            return self._traced(root, result)
+    
+    async def arun(self, query: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute the workflow on the event loop without blocking a thread"""
+        run_id = self._new_run_id(run_id)
+        with self.telemetry.trace("run", query=query, run_id=run_id) as root:
+            result = await self._aexecute(self._initial_state(query, run_id=run_id), self._run_config(run_id))
+            return self._traced(root, result)
+    
+    def _resumable_config(self, run_id: str) -> "RunnableConfig":
+        if self.checkpointer is None:
+            raise RuntimeError("Checkpointing is disabled; set checkpoints.enabled to resume runs")
+        return self._run_config(run_id)
+    
+    @staticmethod
+    def _failed_formats(values: Dict[str, Any]) -> Dict[str, str]:
+        """Campaign formats recorded as failed (see _failure_update), cleared for a retry"""
+        outputs = values.get("outputs") or {}
+        return {f: "" for f, e in (values.get("errors") or {}).items()
+                if e and f in FORMAT_NODES and f not in outputs}
+    
+    def resume(self, run_id: str) -> Dict[str, Any]:
+        """Continue a failed or interrupted run without repeating its completed nodes.
+        
+        A finished campaign whose formats partly failed re-runs just those formats.
+        """
+        config = self._resumable_config(run_id)
+        snapshot = self.workflow.get_state(config)
+        if snapshot.created_at is None:  # reducer channels give even a missing run default values
+            raise KeyError(f"No checkpoints for run '{run_id}'")
+        if not snapshot.next:
+            failed = self._failed_formats(snapshot.values)
+            if not failed:
+                return snapshot.values
+            # Continue as if research just finished; formats already written are skipped
+            config = self.workflow.update_state(config, {"errors": failed}, as_node="research")
+        with self.telemetry.trace("resume", run_id=run_id) as root:
+            return self._traced(root, self._execute(None, config))
+    
+    async def aresume(self, run_id: str) -> Dict[str, Any]:
+        """Async variant of resume"""
+        config = self._resumable_config(run_id)
+        snapshot = await self.workflow.aget_state(config)
+        if snapshot.created_at is None:
+            raise KeyError(f"No checkpoints for run '{run_id}'")
+        if not snapshot.next:
+            failed = self._failed_formats(snapshot.values)
+            if not failed:
+                return snapshot.values
+            config = await self.workflow.aupdate_state(config, {"errors": failed}, as_node="research")
+        with self.telemetry.trace("resume", run_id=run_id) as root:
+            return self._traced(root, await self._aexecute(None, config))
+    
+    def run_history(self, run_id: str) -> List[Dict[str, Any]]:
+        """Checkpoints of a run, oldest first, for debugging and replay()"""
+        config = self._resumable_config(run_id)
+        history = [
+            {
+                "checkpoint_id": snapshot.config["configurable"]["checkpoint_id"],
+                "step": snapshot.metadata.get("step"),
+                "source": snapshot.metadata.get("source"),
+                "writes": snapshot.metadata.get("writes"),
+                "next": list(snapshot.next),
+                "created_at": snapshot.created_at,
+                "values": snapshot.values,
+            }
+            for snapshot in self.workflow.get_state_history(config)
+        ]
+        return history[::-1]
+    
+    def replay(self, run_id: str, checkpoint_id: str) -> Dict[str, Any]:
+        """Re-execute a run from one of its checkpoints (nodes after it are called again)"""
+        config = self._resumable_config(run_id)
+        config["configurable"].update(checkpoint_ns="", checkpoint_id=checkpoint_id)
+        # Forking drops the writes recorded after this checkpoint, so its next nodes really re-run
+        fork = self.workflow.update_state(config, None)
+        return self._execute(None, fork)
+    
+    def _campaign_formats(self, query: str, formats: Optional[Iterable[str]]) -> List[str]:
+        from src.agents.query_handler import CAMPAIGN_FORMATS
+        if formats is None:
+            formats = self.query_handler.detect_formats(query) or ["blog", "linkedin", "image"]
+        formats = list(dict.fromkeys(formats))
+        unsupported = [f for f in formats if f not in CAMPAIGN_FORMATS]
+        if unsupported or not formats:
+            raise ValueError(f"Unsupported campaign formats: {unsupported or formats}; "
+                             f"choose from {', '.join(CAMPAIGN_FORMATS)}")
+        return formats
+    
+    def run_campaign(self, query: str, formats: Optional[Iterable[str]] = None,
+                     run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Route and research once, then generate every format concurrently.
+        
+        `formats` defaults to the formats mentioned in the query (blog, LinkedIn
+        post and image when none are). `content` is the combined campaign result.
+        """
+        run_id = self._new_run_id(run_id)
+        initial_state = self._initial_state(query, self._campaign_formats(query, formats), run_id)
+        with self.telemetry.trace("campaign", query=query, run_id=run_id, formats=initial_state["formats"]) as root:
+            result = self._execute(initial_state, self._run_config(run_id))
+            return self._traced(root, result)
+    
+    async def arun_campaign(self, query: str, formats: Optional[Iterable[str]] = None,
+                            run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of run_campaign"""
+        run_id = self._new_run_id(run_id)
+        initial_state = self._initial_state(query, self._campaign_formats(query, formats), run_id)
+        with self.telemetry.trace("campaign", query=query, run_id=run_id, formats=initial_state["formats"]) as root:
+            result = await self._aexecute(initial_state, self._run_config(run_id))
+            return self._traced(root, result)
+
+    
+    def stream(self, query: str, formats: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Execute the workflow, yielding events as they happen.
+        
+        Events are dicts with an ``event`` key:
+        - ``node``: a LangGraph node finished (``node``, ``data`` = its state update)
+        - ``token``: a chunk of generated text (``text``)
+        - ``done``: the run finished (``data`` = final state, same shape as run())
+        """
+        # Passing formats streams a campaign; only its primary format emits tokens
+        run_id = self._new_run_id()
+        initial_state = self._initial_state(
+            query, self._campaign_formats(query, formats) if formats else None, run_id
+        )
+        events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        config = self._run_config(run_id, token_sink=lambda text: events.put({"event": "token", "text": text}))
+        
+        def _produce():
+            final_state = None
+            root = NOOP_SPAN
+            try:
+                with self.telemetry.trace("stream", query=query, run_id=run_id) as root:
+                    for mode, chunk in self.workflow.stream(
+                        initial_state, config, stream_mode=["updates", "values"]
+                    ):
+                        if mode == "values":
+                            final_state = chunk
+                            continue
+                        for node, update in chunk.items():
+                            events.put({"event": "node", "node": node, "data": update})
+                    final_state = self._traced(root, final_state)
+                events.put({"event": "done", "data": final_state})
+            except Exception as e:
+                failed_state = self._failed_state(initial_state, config, e)
+                events.put({"event": "done", "data": self._traced(root, failed_state)})
+            finally:
+                events.put(None)
+        
+        # The graph runs on a worker thread so tokens reach the caller while it runs
+        threading.Thread(target=_produce, daemon=True).start()
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+    
+    async def astream(self, query: str, formats: Optional[Iterable[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of stream()"""
+        # Passing formats streams a campaign; only its primary format emits tokens
+        run_id = self._new_run_id()
+        initial_state = self._initial_state(
+            query, self._campaign_formats(query, formats) if formats else None, run_id
+        )
+        events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        config = self._run_config(run_id, token_sink=lambda text: events.put_nowait({"event": "token", "text": text}))
+        
+        async def _produce():
+            final_state = None
+            root = NOOP_SPAN
+            try:
+                with self.telemetry.trace("stream", query=query, run_id=run_id) as root:
+                    async for mode, chunk in self.workflow.astream(
+                        initial_state, config, stream_mode=["updates", "values"]
+                    ):
+                        if mode == "values":
+                            final_state = chunk
+                            continue
+                        for node, update in chunk.items():
+                            events.put_nowait({"event": "node", "node": node, "data": update})
+                    final_state = self._traced(root, final_state)
+                events.put_nowait({"event": "done", "data": final_state})
+            except Exception as e:
+                failed_state = await self._afailed_state(initial_state, config, e)
+                events.put_nowait({"event": "done", "data": self._traced(root, failed_state)})
+            finally:
+                events.put_nowait(None)
+        
+        producer = asyncio.ensure_future(_produce())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            producer.cancel()
+    
+    def run_batch(self, queries: Iterable[Any], max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Run many queries on a bounded worker pool, isolating per-query errors.
+        
+        Returns one record per query ({'index', 'id', 'query', 'result', 'error',
+        'elapsed'}) in input order.
+        """
+        records = list(iter_batch(self.run, queries, max_concurrency))
+        return sorted(records, key=lambda r: r["index"])
+
+
+_shared_workflow: Optional[ContentAlchemyWorkflow] = None
+_shared_workflow_lock = threading.Lock()
+
+
+def get_workflow(config: Optional[Config] = None) -> ContentAlchemyWorkflow:
+    """Process-wide workflow shared by every session and request thread.
+    
+    Runs keep their state in the graph, not on the workflow, so one instance
+    (and its agents, connection pools and compiled graph) serves all callers.
+    `config` is only used by the call that creates it.
+    """
+    global _shared_workflow
+    if _shared_workflow is None:
+        with _shared_workflow_lock:
+            if _shared_workflow is None:
+                _shared_workflow = ContentAlchemyWorkflow(config or Config())
+    return _shared_workflow
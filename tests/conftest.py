@@ -4,6 +4,14 @@ import os
 from unittest.mock import Mock
 
 
+@pytest.fixture(autouse=True)
+def isolated_state_files(tmp_path, monkeypatch):
+    """Keep checkpoint and cache databases of Config()-built objects out of the working tree"""
+    monkeypatch.setenv("CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setenv("CACHE_PATH", str(tmp_path / "llm_cache.sqlite"))
+    monkeypatch.setenv("ROUTING_CACHE_PATH", "")
+
+
 @pytest.fixture(scope="session")
 def test_env():
     """Set up test environment variables"""
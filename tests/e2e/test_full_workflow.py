@@ -1,8 +1,38 @@
+import threading
+import time
 import pytest
 from types import SimpleNamespace
 
 
-def test_full_workflow_blog(monkeypatch):
+def isolated_config(workflow_module, tmp_path):
+    """Config whose routing and checkpoints do not depend on files left by earlier runs"""
+    config = workflow_module.Config()
+    config.openai.api_key = "test"
+    config.routing.cache_enabled = False
+    config.checkpoints.path = str(tmp_path / "checkpoints.sqlite")
+    return config
+
+
+class Timeline:
+    """Start/end times of the fake slow calls, to check which of them overlapped"""
+
+    def __init__(self):
+        self.intervals = {}
+        self._lock = threading.Lock()
+
+    def slow(self, name, seconds=0.2):
+        start = time.perf_counter()
+        time.sleep(seconds)
+        with self._lock:
+            self.intervals[name] = (start, time.perf_counter())
+
+    def overlapped(self, *names):
+        """True when every named call was running at one shared moment"""
+        spans = [self.intervals[name] for name in names]
+        return max(start for start, _ in spans) < min(end for _, end in spans)
+
+
+def test_full_workflow_blog(monkeypatch, tmp_path):
     from src.workflow import langgraph_workflow as workflow_module
 
     class DummyResponse:
@@ -12,6 +42,7 @@ def test_full_workflow_blog(monkeypatch):
     class DummyLLM:
         def __init__(self, *args, **kwargs):
             self.responses = [
+                "Research report on AI innovation",
                 "keyword1, keyword2, keyword3",
                 "This is a generated blog post." * 60
             ]
@@ -19,10 +50,11 @@ def test_full_workflow_blog(monkeypatch):
         def invoke(self, messages):
             return DummyResponse(self.responses.pop(0))
 
-    monkeypatch.setattr(workflow_module, "ChatOpenAI", DummyLLM)
+    # Both model tiers share one scripted client so responses pop in call order
+    llm = DummyLLM()
+    monkeypatch.setattr(workflow_module, "create_chat_model", lambda *args, **kwargs: llm)
 
-    config = workflow_module.Config()
-    config.openai.api_key = "test"
+    config = isolated_config(workflow_module, tmp_path)
 
     workflow = workflow_module.ContentAlchemyWorkflow(config)
     result = workflow.run("Write a blog about AI innovation")
@@ -30,3 +62,186 @@ def test_full_workflow_blog(monkeypatch):
     assert result["routing_info"]["primary_agent"] == "blog"
     assert result["content"]["type"] == "blog"
     assert "generated blog" in result["content"]["content"]
+
+
+@pytest.mark.asyncio
+async def test_full_workflow_blog_async(monkeypatch, tmp_path):
+    from src.workflow import langgraph_workflow as workflow_module
+
+    class DummyResponse:
+        def __init__(self, content):
+            self.content = content
+
+    class DummyAsyncLLM:
+        def __init__(self, *args, **kwargs):
+            self.responses = [
+                "Research report on AI innovation",
+                "keyword1, keyword2, keyword3",
+                "This is a generated blog post." * 60
+            ]
+
+        def invoke(self, messages):
+            raise AssertionError("async run must not use the blocking client")
+
+        async def ainvoke(self, messages):
+            return DummyResponse(self.responses.pop(0))
+
+    llm = DummyAsyncLLM()
+    monkeypatch.setattr(workflow_module, "create_chat_model", lambda *args, **kwargs: llm)
+
+    config = isolated_config(workflow_module, tmp_path)
+
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+    result = await workflow.arun("Write a blog about AI innovation")
+
+    assert result["routing_info"]["primary_agent"] == "blog"
+    assert result["content"]["type"] == "blog"
+    assert result["messages"] == [
+        "Routing to blog agent", "Research completed", "Content generated successfully"
+    ]
+    assert result["research_data"]["content"] == "Research report on AI innovation"
+
+
+def test_full_workflow_stream_emits_tokens_before_done(monkeypatch, tmp_path):
+    from src.workflow import langgraph_workflow as workflow_module
+
+    class DummyResponse:
+        def __init__(self, content):
+            self.content = content
+
+    class DummyStreamingLLM:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def invoke(self, messages):
+            return DummyResponse("keyword1, keyword2")
+
+        def stream(self, messages):
+            for token in ["# AI ", "Innovation ", "blog"]:
+                yield DummyResponse(token)
+
+    monkeypatch.setattr(workflow_module, "create_chat_model", DummyStreamingLLM)
+
+    config = isolated_config(workflow_module, tmp_path)
+
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+    events = list(workflow.stream("Write a blog about AI innovation"))
+
+    kinds = [e["event"] for e in events]
+    # Research feeds the blog but only the blog's tokens are streamed
+    assert kinds == ["node", "node", "token", "token", "token", "node", "node", "done"]
+    assert [e.get("node") for e in events if e["event"] == "node"] == ["route", "research", "blog", "assemble"]
+    final = events[-1]["data"]
+    assert final["content"]["content"] == "# AI Innovation blog"
+    assert final["content"]["word_count"] == 4
+
+
+def test_research_runs_once_and_feeds_parallel_formats(monkeypatch, tmp_path):
+    from src.workflow import langgraph_workflow as workflow_module
+    timeline = Timeline()
+
+    class DummyResponse:
+        def __init__(self, content):
+            self.content = content
+
+    class PromptAwareLLM:
+        def __init__(self, *args, **kwargs):
+            self.prompts = []
+
+        def invoke(self, messages):
+            system, user = messages[0].content, messages[-1].content
+            self.prompts.append(user)
+            if "query routing expert" in system:
+                return DummyResponse("linkedin")
+            if "expert researcher" in system:
+                return DummyResponse("Edge devices cut latency by 40%")
+            if "hashtags" in system:
+                return DummyResponse("edge, computing")
+            timeline.slow("linkedin")
+            return DummyResponse("LinkedIn post body")
+
+    monkeypatch.setattr(workflow_module, "create_chat_model", PromptAwareLLM)
+
+    config = isolated_config(workflow_module, tmp_path)
+    config.cache.enabled = False
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+
+    images = []
+
+    def slow_image(description, research_data=None):
+        timeline.slow("image")
+        images.append(research_data)
+        return {"type": "image", "image_url": "https://example.com/hero.png"}
+
+    monkeypatch.setattr(workflow.image_generator, "generate_image", slow_image)
+
+    result = workflow.run_campaign("LinkedIn post and hero image about edge computing",
+                                   formats=["linkedin", "image"])
+
+    research_calls = [p for p in workflow.llm.prompts if p.startswith("Research Topic")]
+    assert len(research_calls) == 1
+    assert images[0]["content"] == "Edge devices cut latency by 40%"
+    assert any("Edge devices cut latency" in p for p in workflow.llm.prompts if "Research Context" in p)
+    assert set(result["outputs"]) == {"linkedin", "image"}
+    assert result["routing_info"]["primary_agent"] == "linkedin"
+    # LinkedIn and image branches overlap instead of running back to back
+    assert timeline.overlapped("linkedin", "image")
+
+
+def test_campaign_shares_routing_and_research_across_formats(monkeypatch, tmp_path):
+    from src.workflow import langgraph_workflow as workflow_module
+    timeline = Timeline()
+
+    class DummyResponse:
+        def __init__(self, content):
+            self.content = content
+
+    class PromptAwareLLM:
+        def __init__(self, *args, **kwargs):
+            self.systems = []
+
+        def invoke(self, messages):
+            system = messages[0].content
+            self.systems.append(system)
+            if "query routing expert" in system:
+                return DummyResponse("blog")
+            if "expert researcher" in system:
+                return DummyResponse("Edge devices cut latency by 40%")
+            if "hashtags" in system or "SEO expert" in system:
+                return DummyResponse("edge, computing")
+            timeline.slow("linkedin" if "LinkedIn" in system else "blog")
+            return DummyResponse("Generated body")
+
+    monkeypatch.setattr(workflow_module, "create_chat_model", PromptAwareLLM)
+
+    config = isolated_config(workflow_module, tmp_path)
+    config.cache.enabled = False
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+
+    def slow_image(description, research_data=None):
+        timeline.slow("image")
+        return {"type": "image", "image_url": "https://example.com/hero.png"}
+
+    monkeypatch.setattr(workflow.image_generator, "generate_image", slow_image)
+
+    result = workflow.run_campaign("Blog + LinkedIn post + image about edge computing")
+
+    campaign = result["content"]
+    assert campaign["type"] == "campaign"
+    assert campaign["formats"] == ["blog", "linkedin", "image"]
+    assert set(campaign["items"]) == {"blog", "linkedin", "image"}
+    assert "## Linkedin" in campaign["content"] and "hero.png" in campaign["content"]
+    assert sum("expert researcher" in s for s in workflow.llm.systems) == 1
+    assert result["messages"][0] == "Running campaign: blog, linkedin, image"
+    # The three branches run at the same time
+    assert timeline.overlapped("blog", "linkedin", "image")
+
+
+def test_campaign_rejects_unknown_formats(tmp_path):
+    from src.workflow import langgraph_workflow as workflow_module
+
+    config = isolated_config(workflow_module, tmp_path)
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+
+    with pytest.raises(ValueError):
+        workflow.run_campaign("Plan my quarter", formats=["podcast"])
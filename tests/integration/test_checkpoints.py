@@ -0,0 +1,199 @@
+import threading
+import time
+import pytest
+from src.core import checkpoints as checkpoints_module
+from src.core.checkpoints import create_sqlite_checkpointer, prune_sqlite_checkpoints
+from src.workflow import langgraph_workflow as workflow_module
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FlakyLLM:
+    """Answers by prompt; the first blog-body call times out"""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = {"research": 0, "keywords": 0, "blog": 0}
+        self.failures = 1
+
+    def _answer(self, messages):
+        system = messages[0].content
+        if "query routing expert" in system:
+            return DummyResponse("blog")
+        if "expert researcher" in system:
+            self.calls["research"] += 1
+            return DummyResponse("Research report")
+        if "SEO expert" in system:
+            self.calls["keywords"] += 1
+            return DummyResponse("ai, innovation")
+        self.calls["blog"] += 1
+        if self.failures:
+            self.failures -= 1
+            time.sleep(0.1)
+            raise TimeoutError("OpenAI request timed out")
+        return DummyResponse("A finished blog post")
+
+    def invoke(self, messages):
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        return self._answer(messages)
+
+
+@pytest.fixture
+def llm():
+    return FlakyLLM()
+
+
+@pytest.fixture
+def workflow(monkeypatch, tmp_path, llm):
+    # Fast and big tiers share the scripted client
+    monkeypatch.setattr(workflow_module, "create_chat_model", lambda *args, **kwargs: llm)
+    config = workflow_module.Config()
+    config.openai.api_key = "test"
+    config.cache.enabled = False
+    config.checkpoints.enabled = True
+    config.checkpoints.backend = "sqlite"
+    config.checkpoints.path = str(tmp_path / "checkpoints.sqlite")
+    return workflow_module.ContentAlchemyWorkflow(config)
+
+
+def test_failed_run_resumes_without_repeating_research(workflow, llm):
+    failed = workflow.run("Write a blog about AI innovation")
+
+    assert "timed out" in failed["error"]
+    assert failed["research_data"]["content"] == "Research report"
+
+    resumed = workflow.resume(failed["run_id"])
+
+    assert resumed["content"]["content"] == "A finished blog post"
+    assert resumed["error"] == ""
+    assert llm.calls["research"] == 1
+    # A completed run resumes to its final state without new calls
+    assert workflow.resume(failed["run_id"])["content"] == resumed["content"]
+    assert llm.calls["blog"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_run_resumes_from_sqlite_checkpoint(workflow, llm):
+    failed = await workflow.arun("Write a blog about AI innovation")
+    resumed = await workflow.aresume(failed["run_id"])
+
+    assert resumed["content"]["type"] == "blog"
+    assert llm.calls["research"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_checkpoint_writes_leave_the_event_loop(workflow, llm, monkeypatch):
+    llm.failures = 0
+    saver = workflow.checkpointer.saver
+    threads = []
+
+    def recording(method):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in ("get_tuple", "put", "put_writes"):
+        monkeypatch.setattr(saver, name, recording(getattr(saver, name)))
+
+    result = await workflow.arun("Write a blog about AI innovation")
+
+    assert result["content"]["type"] == "blog"
+    assert threads and threading.get_ident() not in threads
+
+
+def test_history_and_replay_from_checkpoint(workflow, llm):
+    llm.failures = 0
+    result = workflow.run("Write a blog about AI innovation")
+
+    history = workflow.run_history(result["run_id"])
+    assert [h["next"] for h in history][1:] == [["route"], ["research"], ["blog"], ["assemble"], []]
+    before_blog = next(h for h in history if h["next"] == ["blog"])
+
+    replayed = workflow.replay(result["run_id"], before_blog["checkpoint_id"])
+
+    assert replayed["content"]["type"] == "blog"
+    assert llm.calls["research"] == 1
+    assert llm.calls["blog"] == 2
+
+
+def test_resume_requires_checkpointing(monkeypatch):
+    monkeypatch.setattr(workflow_module, "create_chat_model", FlakyLLM)
+    config = workflow_module.Config()
+    config.checkpoints.enabled = False
+    workflow = workflow_module.ContentAlchemyWorkflow(config)
+
+    with pytest.raises(RuntimeError):
+        workflow.resume("missing")
+
+
+def test_resume_only_reruns_the_failed_parallel_branch(workflow, llm, monkeypatch):
+    images = []
+
+    def fake_image(description, research_data=None):
+        images.append(description)
+        return {"type": "image", "image_url": "https://example.com/hero.png"}
+
+    monkeypatch.setattr(workflow.image_generator, "generate_image", fake_image)
+
+    failed = workflow.run_campaign("Blog and hero image about AI", formats=["blog", "image"])
+    # The finished sibling survives the failure
+    assert "timed out" in failed["content"]["errors"]["blog"]
+    assert set(failed["content"]["items"]) == {"image"}
+
+    resumed = workflow.resume(failed["run_id"])
+
+    assert set(resumed["content"]["items"]) == {"blog", "image"}
+    assert resumed["content"]["errors"] == {}
+    assert len(images) == 1
+    assert llm.calls["research"] == 1
+    # Nothing left to retry
+    assert workflow.resume(failed["run_id"])["content"] == resumed["content"]
+    assert llm.calls["blog"] == 2
+
+
+def test_failing_format_keeps_its_siblings_outputs(workflow, llm, monkeypatch):
+    llm.failures = 0
+
+    def failing_post(*args, **kwargs):
+        raise RuntimeError("linkedin boom")
+
+    monkeypatch.setattr(workflow.linkedin_writer, "write_post", failing_post)
+
+    result = workflow.run_campaign("AI innovation", formats=["blog", "linkedin"])
+
+    assert set(result["content"]["items"]) == {"blog"}
+    assert result["content"]["errors"] == {"linkedin": "linkedin boom"}
+
+
+def test_sqlite_checkpoints_are_pruned_by_age_and_count(workflow, llm):
+    llm.failures = 0
+    old = workflow.run("Write a blog about AI innovation")
+    time.sleep(0.5)
+    recent = workflow.run("Write a blog about AI innovation")
+    saver = workflow.checkpointer.saver
+
+    assert prune_sqlite_checkpoints(saver, max_age_days=0.4 / 86400, keep_last=2) > 0
+
+    with pytest.raises(KeyError):
+        workflow.resume(old["run_id"])
+    assert len(workflow.run_history(recent["run_id"])) == 2
+    assert workflow.resume(recent["run_id"])["content"] == recent["content"]
+    with saver.lock, saver.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM writes WHERE thread_id = ?", (old["run_id"],))
+        assert cur.fetchone() == (0,)
+
+
+def test_sqlite_checkpointer_prunes_on_open(tmp_path, monkeypatch):
+    path = str(tmp_path / "checkpoints.sqlite")
+    calls = []
+    monkeypatch.setattr(checkpoints_module, "prune_sqlite_checkpoints", lambda *args: calls.append(args[1:]))
+
+    create_sqlite_checkpointer(path)
+    create_sqlite_checkpointer(path, max_age_days=7, keep_last=20)
+
+    assert calls == [(7, 20)]
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.config import ServiceConfig
+from src.core.telemetry import Telemetry
+from src.web_app.http_service import ServiceDraining, WorkerPool, create_app
+from src.workflow.jobs import JobManager
+
+
+class FakeQueryHandler:
+    def route_query(self, query):
+        return {"primary_agent": "blog"}
+
+
+class FakeWorkflow:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.query_handler = FakeQueryHandler()
+
+    def run(self, query, run_id=None):
+        return self._state(query)
+
+    def _state(self, query, formats=None):
+        if "fail" in query:
+            raise RuntimeError("generation failed")
+        content = {"type": "campaign", "formats": formats} if formats else {"type": "blog", "content": f"About {query}"}
+        return {"query": query, "run_id": "", "routing_info": {"primary_agent": "blog"}, "content": content,
+                "research_data": {"content": "not returned"}, "messages": ["done"], "error": ""}
+
+    async def arun(self, query):
+        self.calls.append(query)
+        await asyncio.sleep(self.delay)
+        return self._state(query)
+
+    async def arun_campaign(self, query, formats=None):
+        self.calls.append(query)
+        await asyncio.sleep(self.delay)
+        return self._state(query, formats)
+
+    async def astream(self, query, formats=None):
+        yield {"event": "node", "node": "route", "data": {"messages": ["Routing to blog agent"]}}
+        for token in ("Edge ", "computing"):
+            await asyncio.sleep(self.delay)
+            yield {"event": "token", "text": token}
+        yield {"event": "done", "data": self._state(query, formats)}
+
+
+@pytest_asyncio.fixture
+async def make_client():
+    clients = []
+
+    async def _make(workflow=None, jobs=None, **settings):
+        client = TestClient(TestServer(create_app(workflow or FakeWorkflow(), ServiceConfig(**settings), jobs)))
+        await client.start_server()
+        clients.append(client)
+        return client
+
+    yield _make
+    for client in clients:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_generate_returns_result(make_client):
+    client = await make_client()
+
+    response = await client.post("/generate", json={"query": "edge computing"})
+    body = await response.json()
+
+    assert response.status == 200
+    assert body["content"]["content"] == "About edge computing"
+    assert "research_data" not in body
+
+
+@pytest.mark.asyncio
+async def test_generate_validates_input(make_client):
+    client = await make_client()
+
+    missing = await client.post("/generate", json={"formats": ["blog"]})
+    unsupported = await client.post("/generate", json={"query": "x", "formats": ["podcast"]})
+    not_json = await client.post("/generate", data="nope")
+
+    assert [missing.status, unsupported.status, not_json.status] == [400, 400, 400]
+    assert "podcast" in (await unsupported.json())["error"]
+
+
+@pytest.mark.asyncio
+async def test_saturated_service_answers_429(make_client):
+    client = await make_client(FakeWorkflow(delay=0.3), workers=1, queue_size=1)
+
+    responses = await asyncio.gather(*(client.post("/generate", json={"query": f"topic {i}"}) for i in range(4)))
+
+    statuses = sorted(r.status for r in responses)
+    assert statuses == [200, 200, 429, 429]
+    assert all(r.headers.get("Retry-After") == "1" for r in responses if r.status == 429)
+    health = await (await client.get("/health")).json()
+    assert health["rejected"] == 2 and health["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_request_times_out(make_client):
+    client = await make_client(FakeWorkflow(delay=0.5), request_timeout=0.05)
+
+    response = await client.post("/generate", json={"query": "slow topic"})
+
+    assert response.status == 504
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_failures(make_client):
+    client = await make_client(workers=2, max_batch_size=3)
+
+    response = await client.post("/batch", json={
+        "queries": ["edge computing", {"id": "b", "query": "please fail"}],
+        "formats": ["blog", "linkedin"],
+    })
+    body = await response.json()
+    too_big = await client.post("/batch", json={"queries": ["a", "b", "c", "d"]})
+
+    assert response.status == 200
+    assert [r["id"] for r in body["results"]] == [0, "b"]
+    assert body["results"][0]["result"]["content"]["formats"] == ["blog", "linkedin"]
+    assert body["results"][1]["error"] == "generation failed"
+    assert too_big.status == 400
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_server_sent_events(make_client):
+    client = await make_client()
+
+    response = await client.post("/stream", json={"query": "edge computing"})
+    text = await response.text()
+    events = [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
+
+    assert response.headers["Content-Type"].startswith("text/event-stream")
+    assert [e["event"] for e in events] == ["node", "token", "token", "done"]
+    assert events[-1]["data"]["content"]["content"] == "About edge computing"
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_accepted_then_polled(make_client):
+    workflow = FakeWorkflow()
+    client = await make_client(workflow, jobs=JobManager(workflow, workers=1, poll_interval=0.02))
+
+    response = await client.post("/jobs", json={"query": "edge computing", "priority": 3})
+    job_id = (await response.json())["job_id"]
+    for _ in range(50):
+        job = await (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] == "succeeded":
+            break
+        await asyncio.sleep(0.02)
+    missing = await client.get("/jobs/unknown")
+
+    assert response.status == 202
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+    assert job["status"] == "succeeded" and job["priority"] == 3
+    assert job["result"]["content"]["content"] == "About edge computing"
+    assert missing.status == 404
+
+
+@pytest.mark.asyncio
+async def test_job_callbacks_are_limited_to_allowed_hosts(make_client):
+    workflow = FakeWorkflow()
+    jobs = JobManager(workflow, workers=1, poll_interval=0.02, callback_hosts=["hooks.example.com"])
+    client = await make_client(workflow, jobs=jobs)
+    closed = await make_client(workflow, jobs=JobManager(workflow, workers=1, poll_interval=0.02))
+
+    allowed = await client.post("/jobs", json={"query": "AI", "callback_url": "https://hooks.example.com/done"})
+    rejected = [
+        await client.post("/jobs", json={"query": "AI", "callback_url": url})
+        for url in ("http://169.254.169.254/latest/meta-data", "file:///etc/passwd",
+                    "https://hooks.example.com@10.0.0.1/")
+    ]
+    disabled = await closed.post("/jobs", json={"query": "AI", "callback_url": "https://hooks.example.com/done"})
+
+    assert allowed.status == 202
+    assert [r.status for r in rejected] == [400, 400, 400]
+    assert "not in jobs.callback_hosts" in (await rejected[0].json())["error"]
+    assert disabled.status == 400
+
+
+@pytest.mark.asyncio
+async def test_metrics_and_traces_are_served_when_monitoring_is_on(make_client):
+    workflow = FakeWorkflow()
+    workflow.telemetry = Telemetry()
+    with workflow.telemetry.trace("run") as root:
+        pass
+    client = await make_client(workflow)
+    plain = await make_client()
+
+    metrics = await client.get("/metrics")
+    text = await metrics.text()
+    trace = await (await client.get(f"/traces/{root.trace.trace_id}")).json()
+
+    assert metrics.status == 200
+    assert 'contentalchemy_runs_total{status="ok"} 1' in text
+    assert "contentalchemy_service_queue_size 32" in text
+    assert trace["spans"][0]["name"] == "run"
+    assert (await client.get("/traces/unknown")).status == 404
+    assert (await plain.get("/metrics")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_the_workflow_connections():
+    workflow = FakeWorkflow()
+    closed = []
+
+    async def aclose():
+        closed.append(True)
+
+    workflow.aclose = aclose
+    client = TestClient(TestServer(create_app(workflow, ServiceConfig())))
+    await client.start_server()
+    await client.close()
+
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_drain_finishes_accepted_work_and_refuses_new():
+    pool = WorkerPool(workers=1, queue_size=2)
+    await pool.start()
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    futures = [pool.submit(slow, timeout=5) for _ in range(2)]
+    assert await pool.drain(timeout=2)
+    assert [f.result() for f in futures] == ["done", "done"]
+    with pytest.raises(ServiceDraining):
+        pool.submit(slow, timeout=5)
+    await pool.close()
@@ -0,0 +1,18 @@
+import json
+from benchmarks import offline
+
+
+def test_quick_offline_benchmark_writes_a_json_report(tmp_path, capsys):
+    output = tmp_path / "offline.json"
+
+    assert offline.main(["--quick", "-o", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert set(results) == {"single", "concurrent", "routing", "scoring", "bulk"}
+    assert set(results["single"]) == {"blog", "linkedin", "research", "image"}
+    assert results["concurrent"]["threads_runs_per_s"] > 0
+    assert results["scoring"]["optimize_for_seo_docs_per_s"] > 0
+    assert results["bulk"]["score_many_docs_per_s"] > 0
+    # Research went through the SERP stub, not the network
+    assert report["serp_requests"] > 0
@@ -0,0 +1,121 @@
+import pytest
+from src.workflow import langgraph_workflow as workflow_module
+
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class DraftLLM:
+    """Answers by prompt: a short draft without H1, then whatever repairs are asked for"""
+
+    def __init__(self, draft="## Why it matters\n\nA short draft about AI.", addition="## More\n\n" + "detail " * 900):
+        self.draft = draft
+        self.addition = addition
+        self.calls = {"blog": 0, "title": 0, "repair": 0, "post": 0, "hashtags": 0}
+        self.prompts = []
+
+    def _answer(self, messages):
+        system = messages[0].content
+        if "expert researcher" in system:
+            return DummyResponse("Research report")
+        if "H1 title" in system:
+            self.calls["title"] += 1
+            return DummyResponse('"AI Innovation Playbook"')
+        if "SEO expert" in system:
+            return DummyResponse("ai, innovation")
+        if "improving an existing" in system:
+            self.calls["repair"] += 1
+            self.prompts.append(messages[1].content)
+            return DummyResponse(self.addition)
+        if "editing an existing post" in system:
+            self.calls["repair"] += 1
+            return DummyResponse("🚀 AI is changing how teams work.\n\n" + "Key takeaway. " * 30 + "\n\nWhat do you see?")
+        if "hashtags" in system:
+            self.calls["hashtags"] += 1
+            return DummyResponse("AI, Innovation" if self.calls["hashtags"] > 1 else "")
+        if "LinkedIn" in system:
+            self.calls["post"] += 1
+            return DummyResponse("🚀 AI news")
+        self.calls["blog"] += 1
+        return DummyResponse(self.draft)
+
+    def invoke(self, messages):
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        return self._answer(messages)
+
+
+def build_workflow(monkeypatch, llm, **gate):
+    # Fast and big tiers share the scripted client
+    monkeypatch.setattr(workflow_module, "create_chat_model", lambda *args, **kwargs: llm)
+    config = workflow_module.Config()
+    config.openai.api_key = "test"
+    config.cache.enabled = False
+    config.checkpoints.enabled = False
+    config.quality_gate.enabled = True
+    # Score every draft fully however loaded the machine is; the tests assert on quality_issues
+    config.metrics_budget_ms = 1000
+    for name, value in gate.items():
+        setattr(config.quality_gate, name, value)
+    return workflow_module.ContentAlchemyWorkflow(config)
+
+
+def test_short_blog_is_repaired_from_its_draft(monkeypatch):
+    llm = DraftLLM()
+    workflow = build_workflow(monkeypatch, llm)
+
+    result = workflow.run("Write a blog about AI innovation")
+
+    content = result["content"]
+    assert content["content"].startswith("# AI Innovation Playbook\n\n## Why it matters\n\nA short draft about AI.")
+    assert content["word_count"] >= 800 and content["quality_issues"] == []
+    assert content["repairs"] == ["added sections: 5", "title"]
+    # The draft was sent as context and the post was never regenerated
+    assert "A short draft about AI." in llm.prompts[0]
+    assert llm.calls == {"blog": 1, "title": 1, "repair": 1, "post": 0, "hashtags": 0}
+    assert result["quality"]["blog"] == {"attempts": 1, "repairs": ["added sections: 5", "title"], "issues": []}
+    assert 0 < result["repair_tokens"] <= workflow.config.quality_gate.token_budget
+
+
+def test_repairs_stop_at_max_attempts_and_token_budget(monkeypatch):
+    llm = DraftLLM(draft="AI Innovation Today\n\n## Why it matters\n\nShort.", addition="## Extra\n\nStill short.")
+    workflow = build_workflow(monkeypatch, llm, max_attempts=3)
+
+    result = workflow.run("Write a blog about AI innovation")
+
+    assert result["quality"]["blog"]["attempts"] == 3
+    assert result["quality"]["blog"]["issues"] == ["Content too short (minimum 800 words)"]
+    assert llm.calls["repair"] == 3
+    # The plain first line became the title without an LLM call
+    assert result["content"]["content"].startswith("# AI Innovation Today\n\n")
+    assert llm.calls["title"] == 0
+
+    llm = DraftLLM()
+    workflow = build_workflow(monkeypatch, llm, token_budget=150)
+
+    result = workflow.run("Write a blog about AI innovation")
+
+    # Expanding would cost more than the whole budget, so only the cheap title edit ran
+    assert llm.calls["repair"] == 0 and llm.calls["title"] == 1
+    assert result["repair_tokens"] <= 150
+    assert result["content"]["content"].startswith("# AI Innovation Playbook")
+    assert result["content"]["quality_issues"] == ["Content too short (minimum 800 words)"]
+
+
+@pytest.mark.asyncio
+async def test_async_campaign_repairs_post_and_hashtags(monkeypatch):
+    llm = DraftLLM()
+    workflow = build_workflow(monkeypatch, llm)
+
+    result = await workflow.arun_campaign("AI innovation", formats=["linkedin"])
+
+    post = result["content"]
+    assert post["content"].startswith("🚀 AI is changing how teams work.")
+    assert post["hashtags"] == ["#AI", "#Innovation"]
+    assert post["repairs"] == ["expanded", "hashtags"]
+    assert post["quality_issues"] == []
+    assert llm.calls["post"] == 1 and llm.calls["blog"] == 0
+    assert any(message.startswith("Repaired linkedin") for message in result["messages"])
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.agents.research_agent import DeepResearchAgent
+from src.core.rate_limit import RateLimiter, TokenBucket
+from src.core.search_client import SearchClient, SearchError
+
+
+class StubSERPHandler(BaseHTTPRequestHandler):
+    """Replays queued status codes (and raw bodies), then answers 200 with organic results"""
+    statuses = []
+    bodies = []
+    requests_seen = []
+
+    def do_GET(self):
+        type(self).requests_seen.append((self.path, self.headers.get("Connection")))
+        status = type(self).statuses.pop(0) if type(self).statuses else 200
+        content_type = "application/json"
+        body = json.dumps({"organic_results": [
+            {"title": f"Result {i}", "link": f"https://example.com/{i}", "snippet": "..."} for i in range(10)
+        ]}).encode()
+        if type(self).bodies:
+            content_type, body = "text/html", type(self).bodies.pop(0).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubSERPHandler.statuses = []
+    StubSERPHandler.bodies = []
+    StubSERPHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSERPHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search"
+    server.shutdown()
+
+
+def _client(url, **kwargs):
+    defaults = {"api_key": "test", "base_url": url, "backoff_base": 0.01, "backoff_max": 0.05}
+    return SearchClient(**{**defaults, **kwargs})
+
+
+def test_search_retries_on_429_and_5xx(stub_server):
+    StubSERPHandler.statuses = [429, 503]
+    client = _client(stub_server)
+
+    results = client.search("ai trends", num_results=3)
+
+    assert len(results) == 3
+    assert len(StubSERPHandler.requests_seen) == 3
+
+
+def test_search_raises_after_exhausting_retries(stub_server):
+    StubSERPHandler.statuses = [500, 500, 500]
+    client = _client(stub_server, max_retries=2)
+
+    with pytest.raises(SearchError):
+        client.search("ai trends")
+
+
+def test_search_does_not_retry_client_errors(stub_server):
+    StubSERPHandler.statuses = [401]
+    client = _client(stub_server)
+
+    with pytest.raises(SearchError):
+        client.search("ai trends")
+    assert len(StubSERPHandler.requests_seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_responses_are_search_errors(stub_server):
+    StubSERPHandler.bodies = ["<html>Service maintenance</html>", "<html>Service maintenance</html>"]
+    client = _client(stub_server, cache_ttl=0)
+
+    with pytest.raises(SearchError, match="Malformed"):
+        client.search("ai trends")
+    with pytest.raises(SearchError, match="Malformed"):
+        await client.asearch("ai trends")
+
+    # Research carries on without sources, as for any other search failure
+    StubSERPHandler.bodies = ["<html>Service maintenance</html>"]
+    assert DeepResearchAgent(llm=None, search_client=client).search_web("ai trends") == []
+
+
+def test_search_results_are_cached_per_query(stub_server):
+    client = _client(stub_server)
+
+    client.search("AI trends")
+    client.search("ai trends ")
+
+    assert len(StubSERPHandler.requests_seen) == 1
+
+
+def test_search_honors_rate_limit(stub_server):
+    limiter = RateLimiter([TokenBucket(rate=10, capacity=1)])
+    client = _client(stub_server, rate_limiter=limiter, cache_ttl=0)
+
+    start = time.perf_counter()
+    for i in range(3):
+        client.search(f"query {i}")
+
+    assert time.perf_counter() - start >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_asearch_retries_and_caches(stub_server):
+    StubSERPHandler.statuses = [502]
+    client = _client(stub_server)
+
+    results = await client.asearch("cloud costs", num_results=2)
+    again = await client.asearch("cloud costs", num_results=2)
+
+    assert results == again
+    assert len(StubSERPHandler.requests_seen) == 2
+
+
+def test_async_clients_close_with_their_event_loop(stub_server):
+    import asyncio
+    client = _client(stub_server, cache_ttl=0)
+    sessions = []
+
+    async def research(queries):
+        async with client.async_session() as session:
+            sessions.append(session)
+            await asyncio.gather(*(client.asearch(q) for q in queries))
+
+    # A fresh event loop per item, e.g. asyncio.run per batch entry
+    for item in range(2):
+        asyncio.run(research([f"item {item} a", f"item {item} b"]))
+
+    assert len(StubSERPHandler.requests_seen) == 4
+    assert len(sessions) == 2 and all(session.is_closed for session in sessions)
+    assert client._async_session.get() is None
@@ -0,0 +1,120 @@
+import pytest
+from types import SimpleNamespace
+from src.core.telemetry import Telemetry, span
+from src.workflow import langgraph_workflow as workflow_module
+
+
+class ScriptedLLM:
+    """Answers by prompt and reports OpenAI-style token usage"""
+
+    def _answer(self, messages):
+        system = messages[0].content
+        if "expert researcher" in system:
+            content = "Research report"
+        elif "SEO expert" in system:
+            content = "ai, innovation"
+        else:
+            content = "A finished blog post"
+        usage = {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120}
+        return SimpleNamespace(content=content, usage_metadata=usage)
+
+    def invoke(self, messages):
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        return self._answer(messages)
+
+
+@pytest.fixture
+def workflow(monkeypatch):
+    monkeypatch.setattr(workflow_module, "create_chat_model", lambda *args, **kwargs: ScriptedLLM())
+    config = workflow_module.Config()
+    config.openai.api_key = "test"
+    config.openai.model = "gpt-4"
+    config.openai.fast_model = "gpt-4o-mini"
+    config.cache.enabled = True
+    config.cache.backend = "memory"
+    config.monitoring.enabled = True
+    return workflow_module.ContentAlchemyWorkflow(config)
+
+
+def test_run_is_traced_per_node_and_llm_call(workflow):
+    result = workflow.run("Write a blog about AI innovation")
+
+    trace = workflow.telemetry.get_trace(result["trace_id"])
+    spans = {s["name"]: s for s in trace["spans"]}
+    nodes = [s["name"] for s in trace["spans"] if s["kind"] == "node"]
+    llm_calls = [s for s in trace["spans"] if s["kind"] == "llm"]
+
+    assert nodes == ["route", "research", "blog", "assemble"]
+    assert spans["run"]["parent_span_id"] is None
+    assert {s["parent_span_id"] for s in llm_calls} <= {spans["research"]["span_id"], spans["blog"]["span_id"]}
+    blog_call = next(s for s in llm_calls if s["attributes"]["model"] == "gpt-4" and
+                     s["parent_span_id"] == spans["blog"]["span_id"])
+    assert blog_call["attributes"]["prompt_tokens"] == 100
+    assert blog_call["attributes"]["cost_usd"] == pytest.approx((100 * 0.03 + 20 * 0.06) / 1000)
+    assert blog_call["attributes"]["cache_hit"] is False
+    assert "queue_wait" in blog_call["attributes"]
+
+
+def test_cache_hits_are_traced_and_free(workflow):
+    workflow.run("Write a blog about AI innovation")
+    second = workflow.run("Write a blog about AI innovation")
+
+    summary = workflow.telemetry.recent(1)[0]
+
+    assert summary["trace_id"] == second["trace_id"]
+    assert summary["llm_calls"] == summary["cache_hits"] > 0
+    assert summary["cost_usd"] == 0
+
+
+def test_metrics_are_exported_for_prometheus(workflow):
+    workflow.run("Write a blog about AI innovation")
+
+    text = workflow.telemetry.prometheus()
+
+    assert 'contentalchemy_runs_total{status="ok"} 1' in text
+    assert 'contentalchemy_span_duration_seconds_count{kind="node",name="blog"} 1' in text
+    assert 'contentalchemy_llm_tokens_total{model="gpt-4",type="completion"}' in text
+    assert 'contentalchemy_llm_cache_total{result="miss"}' in text
+
+
+def test_worker_thread_calls_join_the_run_trace(workflow, monkeypatch):
+    workflow.config.research.deep = True
+    agent = workflow.research_agent
+    agent.serp_api_key = "serp-test"
+    response = SimpleNamespace(status_code=200, headers={}, raise_for_status=lambda: None,
+                               json=lambda: {"organic_results": [{"title": "AI", "link": "https://a.example"}]})
+    monkeypatch.setattr(agent.search_client.session, "get", lambda *args, **kwargs: response)
+
+    result = workflow.run_campaign("AI innovation", formats=["linkedin"])
+
+    spans = workflow.telemetry.get_trace(result["trace_id"])["spans"]
+    names = {s["name"] for s in spans}
+    linkedin = next(s for s in spans if s["name"] == "linkedin")
+    # Hashtags and sub-query searches run on pool threads but still belong to the run
+    assert "http.serp" in names
+    assert any(s["name"] == "llm.fast" and s["parent_span_id"] == linkedin["span_id"] for s in spans)
+
+
+def test_spans_are_noops_outside_a_traced_run():
+    with span("orphan", "http") as current:
+        current.set(status_code=200)
+
+    telemetry = Telemetry(enabled=False)
+    with telemetry.trace("run") as root:
+        assert not root.recording
+    assert telemetry.recent() == []
+
+
+def test_traces_are_appended_to_a_jsonl_file(tmp_path):
+    telemetry = Telemetry(traces_path=str(tmp_path / "traces.jsonl"))
+    for _ in range(2):
+        with telemetry.trace("run"):
+            with span("http.serp", "http") as current:
+                current.set(status_code=200)
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+
+    assert len(lines) == 2
+    assert 'contentalchemy_http_requests_total{name="http.serp",status="200"} 2' in telemetry.prometheus()
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+from src.workflow.batch import BatchStats, iter_batch, load_queries, main
+
+
+class DummyWorkflow:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def run(self, query):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if "fail" in query:
+            raise RuntimeError("boom")
+        return {"query": query, "content": {"type": "blog"}, "error": ""}
+
+
+def test_iter_batch_bounds_concurrency_and_isolates_errors():
+    workflow = DummyWorkflow(delay=0.05)
+    queries = ["topic 1", "please fail", "topic 3", "topic 4", "topic 5"]
+    stats = BatchStats(len(queries))
+
+    records = list(iter_batch(workflow.run, queries, max_concurrency=2, stats=stats))
+
+    assert workflow.peak == 2
+    assert len(records) == 5
+    failed = [r for r in records if r["error"]]
+    assert [r["query"] for r in failed] == ["please fail"]
+    assert stats.as_dict()["failed"] == 1
+    assert stats.as_dict()["completed"] == 5
+
+
+def test_load_queries_reads_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "topics.jsonl"
+    jsonl.write_text(
+        json.dumps({"request_id": "r1", "title": "T", "body": "Write a blog about AI"}) + "\n"
+        + json.dumps({"query": "Research cloud costs"}) + "\n"
+    )
+    csv_file = tmp_path / "topics.csv"
+    csv_file.write_text("id,query\na,Write a blog about AI\nb,Create a LinkedIn post\n")
+
+    assert load_queries(str(jsonl)) == [
+        {"id": "r1", "query": "Write a blog about AI"},
+        {"id": 1, "query": "Research cloud costs"},
+    ]
+    assert [q["id"] for q in load_queries(str(csv_file))] == ["a", "b"]
+
+
+def test_cli_streams_results_to_jsonl(tmp_path, monkeypatch):
+    from src.workflow import langgraph_workflow as workflow_module
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(workflow_module, "ContentAlchemyWorkflow", lambda config: DummyWorkflow())
+    source = tmp_path / "topics.jsonl"
+    source.write_text("\n".join(json.dumps({"query": f"topic {i}"}) for i in range(3)))
+    output = tmp_path / "out.jsonl"
+
+    exit_code = main([str(source), "-o", str(output), "-c", "2", "-q"])
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert exit_code == 0
+    assert sorted(r["query"] for r in lines) == ["topic 0", "topic 1", "topic 2"]
@@ -1,3 +1,4 @@
+import pytest
 from src.agents.blog_writer import SEOBlogWriterAgent
 
 
@@ -15,6 +16,9 @@ class DummyLLM:
         self.calls.append(messages)
         return DummyResponse(self.responses.pop(0))
 
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
 
 def test_generate_keywords_returns_limited_list():
     llm = DummyLLM(["alpha, beta, gamma, delta, epsilon, zeta"])
@@ -41,3 +45,120 @@ def test_write_blog_returns_content_and_metrics():
     assert result["keywords"][:2] == ["keyword1", "keyword2"]
     assert result["word_count"] > 0
     assert "read_time" in result
+    # One 400-word paragraph: no SEO points; short + missing H1, few H2 + no links + long paragraph
+    assert result["seo_score"] == 0
+    assert result["quality_issues"] == ["Content too short (minimum 800 words)", "Missing H1 title"]
+    assert result["quality_score"] == 55
+    assert result["meta_description"].endswith("...")
+    assert result["metrics_ms"] >= 0 and "metrics_skipped" not in result
+
+
+def test_blog_metrics_stop_at_the_time_budget():
+    llm = DummyLLM(["seo, ranking", "# SEO guide\n\nSEO ranking tips. " * 100] * 2)
+
+    unscored = SEOBlogWriterAgent(llm, metrics_budget_ms=0).write_blog("SEO")
+    scored = SEOBlogWriterAgent(llm).write_blog("SEO")
+
+    assert unscored["seo_score"] is None
+    assert unscored["metrics_skipped"] == ["seo", "quality", "meta_description"]
+    assert scored["keyword_density"] == {"seo": 33.33, "ranking": 16.67}
+
+
+@pytest.mark.asyncio
+async def test_write_blog_async_matches_sync_result():
+    blog_content = "This is a test blog post content with enough words." * 40
+    llm = DummyLLM(["keyword1, keyword2", blog_content])
+    agent = SEOBlogWriterAgent(llm)
+
+    result = await agent.write_blog_async("Test topic")
+
+    assert result["content"] == blog_content
+    assert result["keywords"] == ["keyword1", "keyword2"]
+    assert len(llm.calls) == 2
+
+
+def test_write_blog_single_call_returns_keywords_and_body():
+    llm = DummyLLM(["KEYWORDS: ai, automation, growth\n---\n# AI Blog\n\nBody text here."])
+    agent = SEOBlogWriterAgent(llm, single_call=True)
+
+    result = agent.write_blog("AI")
+
+    assert len(llm.calls) == 1
+    assert result["keywords"] == ["ai", "automation", "growth"]
+    assert result["content"] == "# AI Blog\n\nBody text here."
+
+
+class StreamingLLM(DummyLLM):
+    def stream(self, messages):
+        self.calls.append(messages)
+        for token in self.responses.pop(0).split(" "):
+            yield DummyResponse(token + " ")
+
+
+def test_stream_blog_yields_tokens_then_result():
+    llm = StreamingLLM(["alpha, beta", "One two three four"])
+    agent = SEOBlogWriterAgent(llm)
+
+    items = list(agent.stream_blog("AI"))
+
+    tokens, result = items[:-1], items[-1]
+    assert tokens == ["One ", "two ", "three ", "four "]
+    assert result["content"] == "".join(tokens)
+    assert result["word_count"] == 4
+    assert result["keywords"] == ["alpha", "beta"]
+
+
+@pytest.mark.parametrize("answer", [
+    "KEYWORDS: ai, automation\n---\n# AI Blog\n\nBody text here.",
+    "# AI Blog\n\nBody text here.",
+])
+def test_stream_blog_matches_write_blog_in_single_call_mode(answer):
+    # StreamingLLM re-adds a space after every token, so the invoked answer gets one too
+    llm = StreamingLLM([answer, answer + " "])
+    agent = SEOBlogWriterAgent(llm, single_call=True)
+
+    items = list(agent.stream_blog("AI"))
+    written = agent.write_blog("AI")
+
+    tokens, result = items[:-1], items[-1]
+    # One call each, and the keyword header is never streamed
+    assert len(llm.calls) == 2
+    assert "KEYWORDS" not in "".join(tokens)
+    assert "".join(tokens).strip() == result["content"].strip()
+    assert {k: v for k, v in result.items() if k != "metrics_ms"} == \
+        {k: v for k, v in written.items() if k != "metrics_ms"}
+
+
+@pytest.mark.asyncio
+async def test_astream_blog_honours_single_call():
+    class AsyncStreamingLLM(StreamingLLM):
+        async def astream(self, messages):
+            for chunk in self.stream(messages):
+                yield chunk
+
+    llm = AsyncStreamingLLM(["KEYWORDS: ai\n---\nBody text here."])
+    agent = SEOBlogWriterAgent(llm, single_call=True)
+
+    items = [item async for item in agent.astream_blog("AI")]
+
+    assert len(llm.calls) == 1
+    assert items[-1]["keywords"] == ["ai"] and items[-1]["content"] == "Body text here."
+
+
+def test_repair_blog_expands_only_the_thinnest_section():
+    draft = ("# AI at work\n\n## Tools\n\n" + "Tools help teams. " * 110 + "\n\n## Risks\n\nRisks exist.\n\n"
+             "## Conclusion\n\n" + "Plan ahead now. " * 80)
+    llm = DummyLLM(["## Risks\n\n" + "Bias and privacy risks need owners. " * 50])
+    agent = SEOBlogWriterAgent(llm)
+
+    result = agent.repair_blog("AI", {"content": draft, "keywords": ["ai"]},
+                               ["Content too short (minimum 800 words)"], token_budget=4000)
+
+    assert result["repairs"] == ["expanded: Risks"]
+    assert "Risks exist." not in result["content"]
+    assert result["content"].startswith("# AI at work\n\n## Tools\n\nTools help teams.")
+    assert result["content"].endswith("Plan ahead now. ")
+    assert result["word_count"] > 800 and result["quality_issues"] == []
+    assert 0 < result["repair_tokens"] <= 4000
+    # The whole draft went along as context
+    assert "Plan ahead now." in llm.calls[0][1].content
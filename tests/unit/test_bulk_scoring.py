@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from src.utils.bulk_scoring import score_many
+from src.utils.content_optimization import ContentOptimizer
+from src.utils.quality_validation import QualityValidator
+
+KEYWORDS = ["content strategy", "seo"]
+PARAGRAPH = "Our content strategy drives SEO results for growing teams every quarter. " * 12
+
+
+def documents():
+    blog = "# Guide\n\n" + "\n\n".join(f"## Part {i}\n\n{PARAGRAPH}\n\nSee [docs](https://x.io/{i})." for i in range(8))
+    long_blog = "# Long\n\n" + "\n\n".join(PARAGRAPH * 2 for _ in range(20))
+    post = "🚀 Big news!\n\nWe shipped it ✅\n\n💡 What do you think?\n\n#Launch #Product #Team"
+    in_range = "# Dense\n\n" + "\n\n".join("filler " * 99 + "SEO." for _ in range(12))
+    return [blog, long_blog, post, "", "short text without anything", "## Only h2\n" * 4 + "seo " * 900, in_range]
+
+
+def test_columns_match_the_per_document_scorers():
+    docs = documents()
+
+    table = score_many(docs, KEYWORDS, workers=1)
+
+    assert len(table) == len(docs)
+    for i, doc in enumerate(docs):
+        seo = ContentOptimizer.optimize_for_seo(doc, KEYWORDS)
+        linkedin = ContentOptimizer.optimize_for_linkedin(doc)
+        blog_quality = QualityValidator.validate_blog_quality(doc)
+        linkedin_quality = QualityValidator.validate_linkedin_quality(doc)
+        assert table["seo_score"][i] == seo["seo_score"]
+        assert table["header_count"][i] == seo["header_count"]
+        assert table.keyword_density[i].tolist() == pytest.approx(list(seo["keyword_density"].values()))
+        assert table["engagement_score"][i] == linkedin["engagement_score"]
+        assert table["blog_quality_score"][i] == blog_quality["quality_score"]
+        assert table["blog_issue_count"][i] == len(blog_quality["issues"])
+        assert table["linkedin_quality_score"][i] == linkedin_quality["quality_score"]
+        assert table["linkedin_issue_count"][i] == len(linkedin_quality["issues"])
+
+
+def test_process_pool_matches_in_process_scoring():
+    docs = documents() * 3
+
+    pooled = score_many(docs, KEYWORDS, workers=2, chunk_size=4)
+    local = score_many(docs, KEYWORDS, workers=1)
+
+    assert pooled.columns.keys() == local.columns.keys()
+    for name, column in local.columns.items():
+        assert np.array_equal(pooled[name], column), name
+    assert np.array_equal(pooled.keyword_density, local.keyword_density)
+
+
+def test_dataframe_has_a_density_column_per_keyword():
+    frame = score_many(documents(), KEYWORDS, workers=1).to_dataframe()
+
+    assert list(frame.columns[-2:]) == ["density[content strategy]", "density[seo]"]
+    assert frame["blog_missing_h1"].tolist() == [False, False, True, True, True, True, False]
+    assert score_many([], KEYWORDS).keyword_density.shape == (0, 2)
@@ -0,0 +1,182 @@
+import threading
+import pytest
+import time
+from collections import Counter
+from src.agents.query_handler import QueryHandlerAgent
+from src.workflow.jobs import JobManager, MemoryJobQueue, check_callback_url, new_job
+
+
+class FakeQueryHandler:
+    def route_query(self, query):
+        return {"primary_agent": "image" if "image" in query else "blog"}
+
+
+class FakeWorkflow:
+    def __init__(self, delays=None, failures=0, checkpointer=None):
+        self.query_handler = FakeQueryHandler()
+        self.delays = delays or {}
+        self.failures = failures
+        self.checkpointer = checkpointer
+        self.order = []
+        self.resumed = []
+        self.running = Counter()
+        self.peak = Counter()
+        self._lock = threading.Lock()
+
+    def _generate(self, query, agent_type):
+        with self._lock:
+            self.order.append(query)
+            self.running[agent_type] += 1
+            self.peak[agent_type] = max(self.peak[agent_type], self.running[agent_type])
+            fail = self.failures > 0
+            self.failures -= 1
+        time.sleep(self.delays.get(agent_type, 0.0))
+        with self._lock:
+            self.running[agent_type] -= 1
+        if fail:
+            return {"query": query, "error": "OpenAI timeout"}
+        return {"query": query, "content": {"type": agent_type, "content": f"About {query}"}, "error": ""}
+
+    def run(self, query, run_id=None):
+        return self._generate(query, self.query_handler.route_query(query)["primary_agent"])
+
+    def run_campaign(self, query, formats=None, run_id=None):
+        return self._generate(query, "campaign")
+
+    def resume(self, run_id):
+        self.resumed.append(run_id)
+        return self._generate("resumed", "blog")
+
+
+def test_memory_queue_pops_by_priority_then_fifo():
+    queue = MemoryJobQueue()
+    jobs = [new_job("low", "blog"), new_job("high", "image", priority=5), new_job("low 2", "blog")]
+    for job in jobs:
+        queue.put(job)
+
+    claimed = [queue.claim(["blog", "image"])["query"] for _ in range(3)]
+
+    assert claimed == ["high", "low", "low 2"]
+    assert queue.claim(["blog", "image"]) is None
+
+
+def test_job_runs_in_background_and_reports_status():
+    manager = JobManager(FakeWorkflow(), workers=1, poll_interval=0.05)
+    updates = []
+    manager.add_listener(lambda job: updates.append(job["status"]))
+    manager.start()
+    try:
+        job_id = manager.submit("Write a blog about edge computing")
+        job = manager.wait(job_id, timeout=2)
+    finally:
+        manager.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["agent_type"] == "blog"
+    assert job["result"]["content"]["content"] == "About Write a blog about edge computing"
+    assert updates == ["running", "succeeded"]
+
+
+def test_higher_priority_jobs_run_first():
+    workflow = FakeWorkflow()
+    manager = JobManager(workflow, workers=1, poll_interval=0.05)
+    low = manager.submit("blog low")
+    high = manager.submit("blog high", priority=10)
+    manager.start()
+    try:
+        manager.wait(low, timeout=2)
+        manager.wait(high, timeout=2)
+    finally:
+        manager.stop()
+
+    assert workflow.order == ["blog high", "blog low"]
+
+
+def test_image_cap_leaves_workers_for_text_jobs():
+    workflow = FakeWorkflow(delays={"image": 0.3, "blog": 0.05})
+    manager = JobManager(workflow, workers=3, concurrency={"image": 1}, poll_interval=0.02)
+    image_jobs = [manager.submit(f"image {i}", priority=5) for i in range(3)]
+    blog_jobs = [manager.submit(f"blog {i}") for i in range(2)]
+    manager.start()
+    try:
+        blog_done = [manager.wait(job_id, timeout=2) for job_id in blog_jobs]
+        images_pending = [manager.get(job_id)["status"] for job_id in image_jobs]
+        for job_id in image_jobs:
+            manager.wait(job_id, timeout=3)
+    finally:
+        manager.stop()
+
+    assert workflow.peak["image"] == 1
+    assert all(job["status"] == "succeeded" for job in blog_done)
+    # Text jobs finished while images were still queued behind the cap
+    assert images_pending.count("succeeded") < 3
+
+
+def test_failed_job_retries_then_succeeds():
+    workflow = FakeWorkflow(failures=1)
+    manager = JobManager(workflow, workers=1, retry_backoff=0.01, poll_interval=0.02)
+    manager.start()
+    try:
+        job = manager.wait(manager.submit("blog about retries"), timeout=2)
+    finally:
+        manager.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert workflow.resumed == []
+
+
+def test_checkpointed_retry_resumes_the_run():
+    workflow = FakeWorkflow(failures=1, checkpointer=object())
+    manager = JobManager(workflow, workers=1, retry_backoff=0.01, poll_interval=0.02)
+    manager.start()
+    try:
+        job_id = manager.submit("blog about resuming")
+        job = manager.wait(job_id, timeout=2)
+    finally:
+        manager.stop()
+
+    assert job["status"] == "succeeded"
+    assert workflow.resumed == [job_id]
+
+
+def test_job_fails_after_max_retries():
+    workflow = FakeWorkflow(failures=5)
+    manager = JobManager(workflow, workers=1, max_retries=1, retry_backoff=0.01, poll_interval=0.02)
+    manager.start()
+    try:
+        job = manager.wait(manager.submit("blog that keeps failing"), timeout=2)
+    finally:
+        manager.stop()
+
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert job["error"] == "OpenAI timeout"
+
+
+def test_agents_without_a_job_type_are_still_claimed():
+    workflow = FakeWorkflow()
+    # The local router is confident enough that no LLM is needed
+    workflow.query_handler = QueryHandlerAgent(llm=None)
+    manager = JobManager(workflow, workers=1, concurrency={"research": 1}, poll_interval=0.02)
+    manager.start()
+    try:
+        job = manager.wait(manager.submit("Organize my notes on AI"), timeout=2)
+    finally:
+        manager.stop()
+
+    assert workflow.query_handler.route_query("Organize my notes on AI")["primary_agent"] == "strategist"
+    assert job["agent_type"] == "research"
+    assert job["status"] == "succeeded"
+
+
+def test_callback_urls_must_use_an_allowed_http_host():
+    manager = JobManager(FakeWorkflow(), callback_hosts=["Hooks.example.com"])
+
+    assert check_callback_url("https://hooks.example.com/done", manager.callback_hosts)
+    for url in ("http://localhost:8080/", "ftp://hooks.example.com/", "hooks.example.com/done", 42):
+        with pytest.raises(ValueError):
+            manager.submit("Write a blog about AI", callback_url=url)
+    with pytest.raises(ValueError, match="disabled"):
+        JobManager(FakeWorkflow()).submit("Write a blog about AI", callback_url="https://hooks.example.com/")
+    assert manager.queue.claim(["blog"]) is None
@@ -0,0 +1,42 @@
+from src.core.routing_engine import RoutingEngine
+from src.utils.content_optimization import ContentOptimizer
+from src.utils.keyword_matcher import KeywordMatcher, compile_keywords, tokenize
+
+
+def test_counts_every_keyword_on_word_boundaries():
+    matcher = KeywordMatcher(["post", "content strategy", "AI"])
+
+    counts = matcher.counts("A poster about Content-Strategy... and a post on content strategy (AI, ai!). Repost.")
+
+    assert counts == {"post": 1, "content strategy": 2, "AI": 2}
+
+
+def test_failure_links_find_overlapping_phrases():
+    matcher = KeywordMatcher(["a b c", "b c d", "c", "b c"])
+
+    matches = matcher.matches("x a b c d")
+
+    assert matches == [(1, 3, "a b c"), (2, 3, "b c d"), (2, 2, "b c"), (3, 1, "c")]
+    assert matcher.matches("x a b c d", overlapping=False) == [(1, 3, "a b c")]
+
+
+def test_stems_match_word_endings_but_exact_words_win():
+    matcher = KeywordMatcher(["investigat*", "find information*", "analytics", "analy*"])
+
+    counts = matcher.counts("Investigating analytics, then analysis; we investigate to find informational gaps")
+
+    assert counts == {"investigat*": 2, "find information*": 1, "analytics": 1, "analy*": 1}
+
+
+def test_matchers_are_cached_per_keyword_set():
+    assert compile_keywords(["seo", "ranking"]) is compile_keywords(("seo", "ranking"))
+    assert compile_keywords(["seo"]) is not compile_keywords(["ranking"])
+    assert tokenize("Don't re-use #Growth") == ["don", "t", "re", "use", "growth"]
+
+
+def test_seo_density_and_routing_ignore_keywords_inside_words():
+    seo = ContentOptimizer.optimize_for_seo("Poster design posters post", ["post"])
+    scores = RoutingEngine().keyword_scores("Design a poster on a professional post about reports")
+
+    assert seo["keyword_density"]["post"] == 25.0
+    assert scores == {"linkedin": 2.5, "research": 1.5}
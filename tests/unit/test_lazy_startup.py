@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from src.core.lazy import is_built, lazy_resource
+import src.workflow.langgraph_workflow as workflow_module
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class Resource:
+    def __init__(self):
+        self.builds = 0
+
+    @lazy_resource
+    def expensive(self):
+        self.builds += 1
+        time.sleep(0.05)
+        return object()
+
+
+def test_lazy_resource_builds_once_across_threads():
+    resource = Resource()
+    assert not is_built(resource, "expensive")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        values = list(pool.map(lambda _: resource.expensive, range(8)))
+
+    assert resource.builds == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_constructing_workflow_defers_heavy_imports():
+    script = (
+        "import json, sys\n"
+        "from src.core.config import Config\n"
+        "from src.workflow.langgraph_workflow import ContentAlchemyWorkflow\n"
+        "ContentAlchemyWorkflow(Config())\n"
+        "print(json.dumps([m for m in ('langchain_openai', 'openai', 'langgraph') if m in sys.modules]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        env={"PATH": "", "OPENAI_API_KEY": "test", "CHECKPOINT_ENABLED": "false"},
+    ).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_get_workflow_is_shared_across_threads(monkeypatch):
+    created = []
+
+    class CountingWorkflow:
+        def __init__(self, config):
+            created.append(config)
+            time.sleep(0.05)
+
+    monkeypatch.setattr(workflow_module, "ContentAlchemyWorkflow", CountingWorkflow)
+    monkeypatch.setattr(workflow_module, "_shared_workflow", None)
+    barrier = threading.Barrier(4)
+
+    def fetch(_):
+        barrier.wait()
+        return workflow_module.get_workflow(config="config")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        workflows = list(pool.map(fetch, range(4)))
+
+    assert len(created) == 1
+    assert all(w is workflows[0] for w in workflows)
+
+
+def test_streamlit_does_not_cache_a_workflow_without_an_api_key(monkeypatch):
+    streamlit_app = pytest.importorskip("src.web_app.streamlit_app")
+    monkeypatch.setattr(workflow_module, "_shared_workflow", None)
+    monkeypatch.setattr(streamlit_app, "load_env_files", lambda reload=False: None)
+    streamlit_app.load_workflow.clear()
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    with pytest.raises(ValueError):
+        streamlit_app.load_workflow()
+    monkeypatch.setenv("OPENAI_API_KEY", "fixed-key")
+    workflow = streamlit_app.load_workflow()
+
+    assert workflow.config.openai.api_key == "fixed-key"
+    streamlit_app.load_workflow.clear()
@@ -1,3 +1,6 @@
+import asyncio
+import time
+import pytest
 from src.agents.linkedin_writer import LinkedInWriterAgent
 
 
@@ -15,6 +18,33 @@ class DummyLLM:
         self.calls.append(messages)
         return DummyResponse(self.responses.pop(0))
 
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+class PromptAwareLLM:
+    """Answers by prompt type, since hashtags and body are requested concurrently"""
+
+    def __init__(self, hashtags, body, delay=0.0):
+        self.hashtags = hashtags
+        self.body = body
+        self.delay = delay
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        time.sleep(self.delay)
+        if "hashtags" in messages[0].content:
+            return DummyResponse(self.hashtags)
+        return DummyResponse(self.body)
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        await asyncio.sleep(self.delay)
+        if "hashtags" in messages[0].content:
+            return DummyResponse(self.hashtags)
+        return DummyResponse(self.body)
+
 
 def test_generate_hashtags_adds_hash_symbol():
     llm = DummyLLM(["alpha, beta, gamma"])
@@ -28,10 +58,7 @@ def test_generate_hashtags_adds_hash_symbol():
 
 def test_write_post_includes_hashtags_and_metadata():
     post_body = "Here is a LinkedIn post with key insights." * 10
-    llm = DummyLLM([
-        "tag1, tag2, tag3",
-        post_body
-    ])
+    llm = PromptAwareLLM("tag1, tag2, tag3", post_body)
     agent = LinkedInWriterAgent(llm)
 
     result = agent.write_post("Leadership")
@@ -40,3 +67,50 @@ def test_write_post_includes_hashtags_and_metadata():
     assert "#tag1" in result["content"]
     assert result["character_count"] == len(result["content"])
     assert result["hashtags"][0] == "#tag1"
+
+
+def test_write_post_scores_the_final_post():
+    body = "🚀 Big launch today\n\n🔥 Faster builds\n\n🎯 Fewer bugs\n\n💡 What would you ship first?"
+    agent = LinkedInWriterAgent(PromptAwareLLM("Launch, Product, Team", body))
+
+    result = agent.write_post("Launch")
+
+    # under 1300 chars (25) + 5+ line breaks (20) + 3-7 emoji (25) + 3-7 hashtags (30)
+    assert result["engagement_score"] == 100
+    assert (result["emoji_count"], result["hashtag_count"]) == (4, 3)
+    assert result["quality_score"] == 100 and result["quality_issues"] == []
+    assert 0 <= result["metrics_ms"] < 1000
+
+
+@pytest.mark.asyncio
+async def test_write_post_async_includes_hashtags():
+    llm = PromptAwareLLM("tag1, tag2", "Async LinkedIn post body")
+    agent = LinkedInWriterAgent(llm)
+
+    result = await agent.write_post_async("Leadership")
+
+    assert result["content"].endswith("#tag1 #tag2")
+    assert result["hashtags"] == ["#tag1", "#tag2"]
+
+
+def test_write_post_runs_hashtags_and_body_concurrently():
+    llm = PromptAwareLLM("tag1, tag2", "Post body", delay=0.2)
+    agent = LinkedInWriterAgent(llm)
+
+    start = time.perf_counter()
+    agent.write_post("Leadership")
+    elapsed = time.perf_counter() - start
+
+    assert len(llm.calls) == 2
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_write_post_async_runs_calls_concurrently():
+    llm = PromptAwareLLM("tag1, tag2", "Post body", delay=0.2)
+    agent = LinkedInWriterAgent(llm)
+
+    start = time.perf_counter()
+    await agent.write_post_async("Leadership")
+
+    assert time.perf_counter() - start < 0.35
@@ -0,0 +1,112 @@
+import threading
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.core.cache import CacheBackend, CachedLLM, MemoryCache, SQLiteCache, make_cache_key
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class DummyLLM:
+    def __init__(self, model_name="gpt-4", temperature=0.7):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return DummyResponse(f"answer {len(self.calls)}")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def _messages(topic):
+    return [SystemMessage(content="You are helpful."), HumanMessage(content=f"Topic: {topic}")]
+
+
+def test_cached_llm_serves_identical_prompts_from_cache():
+    llm = DummyLLM()
+    cached = CachedLLM(llm, MemoryCache())
+
+    first = cached.invoke(_messages("AI"))
+    second = cached.invoke(_messages("AI"))
+    cached.invoke(_messages("Cloud"))
+
+    assert first.content == second.content == "answer 1"
+    assert len(llm.calls) == 2
+    assert cached.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+def test_cache_key_depends_on_model_and_temperature():
+    messages = _messages("AI")
+
+    assert make_cache_key("gpt-4", 0.7, messages) != make_cache_key("gpt-4", 0.2, messages)
+    assert make_cache_key("gpt-4", 0.7, messages) != make_cache_key("gpt-4o-mini", 0.7, messages)
+    assert make_cache_key("gpt-4", 0.7, messages) == make_cache_key("gpt-4", 0.7, _messages("AI"))
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    import src.core.cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = MemoryCache(ttl=10)
+    cache.set("a", "1")
+
+    now[0] += 11
+
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteCache(path=path).set("key", "value")
+
+    assert SQLiteCache(path=path).get("key") == "value"
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_keep_sqlite_io_off_the_event_loop(tmp_path, monkeypatch):
+    backend = SQLiteCache(path=str(tmp_path / "cache.sqlite"))
+    threads = []
+
+    def recording(method):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return method(*args)
+        return wrapper
+
+    for name in ("get", "set"):
+        monkeypatch.setattr(backend, name, recording(getattr(backend, name)))
+    llm = DummyLLM()
+    cached = CachedLLM(llm, backend)
+
+    first = await cached.ainvoke(_messages("AI"))
+    second = await cached.ainvoke(_messages("AI"))
+
+    assert first.content == second.content == "answer 1"
+    assert len(threads) == 3 and threading.get_ident() not in threads
+
+
+def test_incomplete_backends_fail_at_construction():
+    class GetOnlyCache(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.agents.blog_writer import SEOBlogWriterAgent
+from src.core.config import Config, RateLimitConfig
+from src.core.llm_registry import BoundedLLM, LLMRegistry, LoopLocalAsyncClient
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.model_name = kwargs.get("model")
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def invoke(self, messages):
+        self._enter()
+        time.sleep(0.05)
+        self._exit()
+        self.calls.append(messages)
+        return DummyResponse(f"{self.model_name} answer")
+
+    async def ainvoke(self, messages):
+        self._enter()
+        await asyncio.sleep(0.05)
+        self._exit()
+        return DummyResponse(f"{self.model_name} answer")
+
+
+def make_config(**openai):
+    config = Config()
+    config.openai.api_key = "test"
+    config.cache.enabled = False
+    config.rate_limits = RateLimitConfig()
+    for key, value in openai.items():
+        setattr(config.openai, key, value)
+    return config
+
+
+def test_tiers_use_their_models_and_share_the_http_pool():
+    registry = LLMRegistry(make_config(model="gpt-4", fast_model="gpt-4o-mini"), client_factory=FakeChatModel)
+
+    assert registry.big.model_name == "gpt-4"
+    assert registry.for_task("routing").model_name == "gpt-4o-mini"
+    assert registry.for_task("blog") is registry.big
+    assert registry.fast.llm.kwargs["http_client"] is registry.big.llm.kwargs["http_client"]
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_both_http_pools():
+    registry = LLMRegistry(make_config(), client_factory=FakeChatModel)
+
+    await registry.aclose()
+
+    assert registry.http_client.is_closed
+    assert registry.http_async_client.is_closed
+
+
+def test_async_pool_is_per_event_loop():
+    requests_seen = []
+    transport = httpx.MockTransport(lambda request: requests_seen.append(request) or httpx.Response(200))
+    client = LoopLocalAsyncClient(transport=transport)
+    pools = []
+
+    async def call():
+        pools.append(client._loop_client())
+        return (await client.get("https://api.openai.com/v1/models")).status_code
+
+    # A later asyncio.run (benchmarks, Streamlit, worker threads) gets its own pool
+    assert [asyncio.run(call()), asyncio.run(call())] == [200, 200]
+    assert len(requests_seen) == 2 and pools[0] is not pools[1]
+
+    async def close():
+        pools.append(client._loop_client())
+        await client.aclose()
+
+    asyncio.run(close())
+    assert client.is_closed and pools[-1].is_closed
+
+
+def test_identical_tiers_share_one_client():
+    registry = LLMRegistry(make_config(model="gpt-4", fast_model="gpt-4", fast_temperature=None),
+                           client_factory=FakeChatModel)
+
+    assert registry.fast.llm is registry.big.llm
+    assert registry.fast is not registry.big
+
+
+def test_bounded_llm_caps_threads_in_flight():
+    model = FakeChatModel(model="gpt-4")
+    llm = BoundedLLM(model, max_concurrency=2)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: llm.invoke([i]), range(8)))
+
+    assert model.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_bounded_llm_caps_async_calls_in_flight():
+    model = FakeChatModel(model="gpt-4")
+    llm = BoundedLLM(model, max_concurrency=3)
+
+    await asyncio.gather(*(llm.ainvoke([i]) for i in range(9)))
+
+    assert model.peak == 3
+
+
+def test_blog_keywords_run_on_fast_model():
+    big, fast = FakeChatModel(model="gpt-4"), FakeChatModel(model="gpt-4o-mini")
+    agent = SEOBlogWriterAgent(big, fast_llm=fast)
+
+    result = agent.write_blog("edge computing")
+
+    assert len(fast.calls) == 1 and len(big.calls) == 1
+    assert result["keywords"] == ["gpt-4o-mini answer"]
@@ -0,0 +1,89 @@
+import pytest
+from src.agents.blog_writer import SEOBlogWriterAgent
+from src.agents.research_agent import DeepResearchAgent
+from src.utils import prompt_budget
+from src.utils.prompt_budget import PromptBudget, count_tokens, model_context_window, truncate_to_tokens
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class DummyLLM:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return DummyResponse(self.responses.pop(0))
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    # Pin the 4-chars-per-token estimate so budgets are deterministic
+    monkeypatch.setattr(prompt_budget, "_encoding", lambda model: None)
+
+
+def test_count_and_context_window():
+    assert count_tokens("") == 0
+    assert count_tokens("x" * 40) == 10
+    assert model_context_window("gpt-4o-mini") == 128000
+    assert model_context_window("gpt-4") == 8192
+    assert model_context_window("some-local-model") == 8192
+
+
+def test_truncate_prefers_sentence_boundary():
+    text = "First sentence is here. Second one is considerably longer and will be cut off."
+    assert truncate_to_tokens(text, 8) == "First sentence is here."
+    assert truncate_to_tokens(text, 100) == text
+
+
+def test_truncate_keeps_the_ellipsis_within_budget():
+    text = "word " * 200
+    for max_tokens in range(1, 40):
+        truncated = truncate_to_tokens(text, max_tokens)
+        assert count_tokens(truncated) <= max_tokens
+    assert truncate_to_tokens(text, 20).endswith("word...")
+
+
+def test_available_reserves_completion_and_fixed_prompt():
+    budget = PromptBudget(context_window=1000, max_completion_tokens=500, safety_margin=0)
+    assert budget.available("x" * 400) == 400
+    assert PromptBudget(context_window=1000, max_completion_tokens=500,
+                        max_context_tokens=50).available() == 50
+
+
+def test_pack_keeps_best_snippets_compresses_next_and_drops_rest():
+    budget = PromptBudget()
+    snippets = ["a" * 200, "b" * 200, "c sentence. " * 20, "d" * 200]
+
+    packed = budget.pack(snippets, budget=160)
+
+    assert packed[:2] == ["a" * 200, "b" * 200]
+    assert len(packed) == 3
+    assert packed[2].startswith("c sentence.") and len(packed[2]) < 240
+
+
+def test_research_prompt_respects_budget():
+    results = [{"title": f"Source {i}", "snippet": "insight " * 100} for i in range(20)]
+    agent = DeepResearchAgent(DummyLLM([]), prompt_budget=PromptBudget(max_context_tokens=600))
+
+    prompt = agent._research_messages("edge computing", results)[1].content
+
+    assert "Source 1: Source 0" in prompt
+    assert "Source 20:" not in prompt
+    assert count_tokens(prompt) < 800
+
+
+def test_blog_prompt_gets_more_than_500_chars_of_research():
+    report = "\n\n".join(f"Section {i}: " + "finding " * 60 for i in range(40))
+    llm = DummyLLM(["kw1, kw2", "Blog body"])
+    agent = SEOBlogWriterAgent(llm, prompt_budget=PromptBudget(max_context_tokens=1500))
+
+    agent.write_blog("edge computing", research_data={"content": report})
+
+    prompt = llm.calls[1][1].content
+    assert "Section 0:" in prompt and "Section 39:" not in prompt
+    assert 2000 < len(prompt) < len(report)
@@ -26,7 +26,9 @@ def test_route_query_detects_blog():
     result = agent.route_query("Please write a blog about AI trends")
 
     assert result["primary_agent"] == "blog"
-    assert result["confidence"] == pytest.approx(0.85)
+    assert result["method"] == "keywords"
+    assert result["confidence"] >= agent.confidence_threshold
+    assert llm.calls == []  # confident local decision, no LLM round-trip
 
 
 def test_route_query_defaults_to_research():
@@ -46,3 +48,48 @@ def test_route_query_uses_llm_for_multiple_matches():
 
     assert llm.calls  # ensure LLM invoked
     assert result["primary_agent"] == "linkedin"
+
+
+def test_route_query_reports_real_confidence():
+    agent = QueryHandlerAgent(DummyLLM())
+
+    clear = agent.route_query("Create a LinkedIn post about leadership")
+    weak = agent.route_query("Write a blog about AI trends and research findings")
+
+    assert clear["confidence"] > weak["confidence"]
+    assert 0 < clear["confidence"] < 1
+
+
+def test_route_query_uses_classifier_before_llm():
+    pytest.importorskip("sklearn")
+    from src.core.routing_engine import RoutingClassifier, RoutingEngine
+
+    queries = [
+        "draft something for my professional network", "share an update with my connections",
+        "long form piece on remote work", "in-depth article on cloud costs",
+        "dig into market data on EV adoption", "what does the data say about churn",
+    ]
+    labels = ["linkedin", "linkedin", "blog", "blog", "research", "research"]
+    classifier = RoutingClassifier.train(queries, labels)
+    llm = DummyLLM()
+    agent = QueryHandlerAgent(llm, routing_engine=RoutingEngine(classifier=classifier),
+                              confidence_threshold=0.3)
+
+    result = agent.route_query("share an update with my professional connections")
+
+    assert result["primary_agent"] == "linkedin"
+    assert result["method"] == "classifier"
+    assert llm.calls == []
+
+
+def test_routing_classifier_round_trips_through_disk(tmp_path):
+    pytest.importorskip("sklearn")
+    from src.core.routing_engine import RoutingClassifier
+
+    classifier = RoutingClassifier.train(["write a blog", "make a picture"], ["blog", "image"])
+    path = str(tmp_path / "router.pkl")
+    classifier.save(path)
+
+    loaded = RoutingClassifier.load(path)
+
+    assert loaded.predict_proba("make a picture") == classifier.predict_proba("make a picture")
@@ -0,0 +1,141 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from src.agents.image_generator import ImageGenerationAgent
+from src.core.config import Config, RateLimitConfig
+from src.core.llm_registry import LLMRegistry, RateLimitedLLM
+from src.core.rate_limit import OpenAIRateLimiter, RateLimiter, TokenBucket
+
+
+class RateLimitError(Exception):
+    """Shaped like openai.RateLimitError"""
+    status_code = 429
+
+    def __init__(self, retry_after="0.01"):
+        super().__init__("Rate limit reached")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+class FlakyLLM:
+    def __init__(self, failures=0, total_tokens=None):
+        self.failures = failures
+        self.total_tokens = total_tokens
+        self.calls = 0
+
+    def _respond(self):
+        self.calls += 1
+        if self.failures > 0:
+            self.failures -= 1
+            raise RateLimitError()
+        usage = {"total_tokens": self.total_tokens} if self.total_tokens else None
+        return SimpleNamespace(content="answer", usage_metadata=usage)
+
+    def invoke(self, messages, **kwargs):
+        return self._respond()
+
+    async def ainvoke(self, messages, **kwargs):
+        return self._respond()
+
+    def stream(self, messages, **kwargs):
+        self._respond()
+        for token in ("edge ", "computing"):
+            yield SimpleNamespace(content=token)
+
+
+def make_limiter(**buckets):
+    return OpenAIRateLimiter(max_retries=3, backoff_base=0.01, backoff_max=0.02,
+                             **{name: RateLimiter([bucket]) for name, bucket in buckets.items()})
+
+
+def test_budget_is_handed_out_in_arrival_order():
+    limiter = make_limiter(requests=TokenBucket(rate=20, capacity=1))
+
+    waits = [limiter._reserve(0, image=False) for _ in range(3)]
+
+    assert waits[0] == 0.0
+    assert waits[0] < waits[1] < waits[2]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+
+
+def test_token_reservation_is_settled_to_real_usage():
+    tokens = TokenBucket(rate=1, capacity=1000)
+    llm = RateLimitedLLM(FlakyLLM(total_tokens=120), make_limiter(tokens=tokens), max_tokens=500)
+
+    llm.invoke([SimpleNamespace(content="Write about edge computing")])
+
+    # prompt + 500 max_tokens reserved up front, then corrected to the 120 used
+    assert tokens._tokens == pytest.approx(880, abs=1)
+
+
+def test_429_pauses_everyone_then_retries():
+    limiter = make_limiter(requests=TokenBucket(rate=100, capacity=100))
+    flaky = FlakyLLM(failures=2)
+    llm = RateLimitedLLM(flaky, limiter)
+
+    response = llm.invoke(["hello"])
+    streamed = "".join(chunk.content for chunk in RateLimitedLLM(FlakyLLM(failures=1), limiter).stream(["hi"]))
+
+    assert response.content == "answer"
+    assert flaky.calls == 3
+    assert streamed == "edge computing"
+    assert limiter.throttled == 3
+
+
+def test_async_calls_retry_and_give_up_after_max_retries():
+    limiter = make_limiter()
+    limiter.max_retries = 1
+
+    assert asyncio.run(RateLimitedLLM(FlakyLLM(failures=1), limiter).ainvoke(["hi"])).content == "answer"
+    with pytest.raises(RateLimitError):
+        asyncio.run(RateLimitedLLM(FlakyLLM(failures=5), limiter).ainvoke(["hi"]))
+
+
+def test_other_errors_are_not_retried():
+    limiter = make_limiter()
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call(broken)
+    assert calls == [1]
+
+
+def test_image_calls_share_the_budget(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    images = TokenBucket(rate=1, capacity=5)
+    limiter = make_limiter(images=images)
+    attempts = []
+
+    def generate(**params):
+        attempts.append(params["prompt"])
+        if len(attempts) == 1:
+            raise RateLimitError()
+        return SimpleNamespace(data=[SimpleNamespace(url="https://img", revised_prompt="")])
+
+    agent = ImageGenerationAgent(SimpleNamespace(invoke=lambda m: SimpleNamespace(content="a cat")),
+                                 rate_limiter=limiter)
+    agent.client = SimpleNamespace(images=SimpleNamespace(generate=generate))
+
+    result = agent.generate_image("cat")
+
+    assert result["image_url"] == "https://img"
+    assert attempts == ["a cat", "a cat"]
+    # Every attempt counts against images/min, including the throttled one
+    assert images._tokens == pytest.approx(3, abs=0.1)
+
+
+def test_registry_wraps_tiers_only_when_limits_are_set():
+    config = Config()
+    config.cache.enabled = False
+    config.rate_limits = RateLimitConfig(tokens_per_minute=10000)
+    limited = LLMRegistry(config, client_factory=lambda **kwargs: FlakyLLM())
+    config.rate_limits = RateLimitConfig()
+    unlimited = LLMRegistry(config, client_factory=lambda **kwargs: FlakyLLM())
+
+    assert isinstance(limited.big, RateLimitedLLM)
+    assert limited.big.limiter is limited.fast.limiter is limited.rate_limiter
+    assert unlimited.rate_limiter is None
+    assert not isinstance(unlimited.big, RateLimitedLLM)
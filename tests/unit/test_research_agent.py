@@ -0,0 +1,109 @@
+import threading
+import time
+from src.agents.research_agent import DeepResearchAgent
+from src.utils.search_results import drop_near_duplicates, normalize_url, rank_results
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class DummyLLM:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return DummyResponse("Research report")
+
+
+UNIQUE_SNIPPETS = [
+    "Latency drops when workloads move closer to users",
+    "Retailers report fewer outages after regional rollouts",
+    "Hardware costs remain the main barrier for small firms",
+    "Regulators are drafting rules for on-device data processing",
+]
+
+
+class SlowSearchClient:
+    """Returns overlapping results per sub-query after a fixed delay"""
+    api_key = "test"
+
+    def __init__(self, delay=0.2, slow_query=None):
+        self.delay = delay
+        self.slow_query = slow_query
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def search(self, query, num_results=5):
+        with self._lock:
+            index = len(self.queries)
+            self.queries.append(query)
+        time.sleep(5 if query == self.slow_query else self.delay)
+        return [
+            {"title": "Shared source", "link": "https://www.example.com/shared/?utm_source=x",
+             "snippet": "The same overview of the topic"},
+            {"title": "Finding", "link": f"https://example.org/{index}",
+             "snippet": UNIQUE_SNIPPETS[index % len(UNIQUE_SNIPPETS)]},
+        ]
+
+
+def test_normalize_url_ignores_scheme_www_tracking_and_slash():
+    assert normalize_url("https://www.Example.com/a/?utm_source=x&id=2#top") == normalize_url("http://example.com/a?id=2")
+
+
+def test_normalize_url_keeps_case_sensitive_paths_and_real_params():
+    assert normalize_url("https://example.com/Docs/API") != normalize_url("https://example.com/docs/api")
+    assert normalize_url("https://example.com/a?ID=Abc") != normalize_url("https://example.com/a?id=abc")
+    assert normalize_url("https://example.com/a?reference=2&refresh=1&ref=feed&UTM_Medium=x") == \
+        "example.com/a?reference=2&refresh=1"
+
+
+def test_rank_results_fuses_lists_and_boosts_repeated_sources():
+    ranked = rank_results([
+        [{"link": "https://a.com"}, {"link": "https://b.com"}],
+        [{"link": "https://b.com/"}, {"link": "https://c.com"}],
+    ])
+
+    assert [r["link"] for r in ranked][0] == "https://b.com"
+    assert ranked[0]["hits"] == 2
+    assert len(ranked) == 3
+
+
+def test_drop_near_duplicates_removes_syndicated_snippets():
+    results = [
+        {"title": "AI adoption", "snippet": "Enterprises doubled AI adoption in 2024 according to the survey"},
+        {"title": "AI adoption", "snippet": "Enterprises doubled AI adoption in 2024 according to the survey."},
+        {"title": "Costs", "snippet": "Cloud costs are rising fast"},
+    ]
+
+    assert len(drop_near_duplicates(results)) == 2
+
+
+def test_deep_research_searches_concurrently_and_dedupes():
+    client = SlowSearchClient(delay=0.2)
+    llm = DummyLLM()
+    agent = DeepResearchAgent(llm, search_client=client, fan_out=4)
+
+    start = time.perf_counter()
+    result = agent.conduct_deep_research("edge computing")
+    elapsed = time.perf_counter() - start
+
+    assert len(client.queries) == 4
+    assert elapsed < 0.6
+    links = [s["link"] for s in result["sources"]]
+    assert len(links) == 5  # one shared source + four unique ones
+    assert result["sources"][0]["hits"] == 4
+    assert len(llm.calls) == 1
+
+
+def test_deep_research_respects_latency_budget():
+    client = SlowSearchClient(delay=0.05, slow_query="edge computing latest trends")
+    agent = DeepResearchAgent(DummyLLM(), search_client=client, fan_out=3)
+
+    start = time.perf_counter()
+    result = agent.conduct_deep_research("edge computing", latency_budget=0.5)
+
+    assert time.perf_counter() - start < 1.5
+    assert result["searches_completed"] == 2
@@ -0,0 +1,72 @@
+from src.agents.query_handler import QueryHandlerAgent
+from src.core.routing_cache import RoutingCache, normalize_query
+from src.core.routing_engine import RoutingEngine
+
+
+class DummyResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class DummyLLM:
+    def __init__(self, responses=None):
+        self.responses = responses or ["linkedin"]
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return DummyResponse(self.responses.pop(0))
+
+
+def test_normalize_query_strips_topic_and_whitespace():
+    assert normalize_query("Write a  Blog about Quantum   Computing!") == ("write a blog", "about quantum computing")
+    assert normalize_query("Tell me something interesting") == ("tell me something interesting", "")
+
+
+def test_repeated_intent_template_skips_llm():
+    llm = DummyLLM(["linkedin"])
+    cache = RoutingCache()
+    agent = QueryHandlerAgent(llm, routing_cache=cache)
+
+    first = agent.route_query("Write a blog and LinkedIn post about productivity")
+    second = agent.route_query("Write a blog and LinkedIn post about remote teams")
+
+    assert len(llm.calls) == 1
+    assert first["primary_agent"] == second["primary_agent"] == "linkedin"
+    assert second["method"] == "cache"
+    assert cache.stats()["hits"] == 1
+
+
+def test_topic_with_routing_keywords_gets_its_own_entry():
+    agent = QueryHandlerAgent(DummyLLM(), routing_cache=RoutingCache())
+
+    agent.route_query("Tell me about cloud costs")
+    result = agent.route_query("Tell me about image compression")
+
+    assert result["primary_agent"] == "image"
+    assert result["method"] != "cache"
+
+
+def test_routing_cache_is_bounded_and_persists(tmp_path):
+    path = str(tmp_path / "routing.json")
+    cache = RoutingCache(max_size=2, path=path, flush_every=1)
+    for template in ["a", "b", "c"]:
+        cache.put(template, {"primary_agent": "blog", "confidence": 0.9})
+
+    reloaded = RoutingCache(max_size=2, path=path)
+
+    assert reloaded.get("a") is None
+    assert reloaded.get("c") == {"primary_agent": "blog", "confidence": 0.9}
+
+
+def test_persisted_entries_are_dropped_when_routing_rules_change(tmp_path):
+    path = str(tmp_path / "routing.json")
+    old_rules = RoutingEngine(rules={"blog": [("blog*", 3.0)]}).fingerprint()
+    new_rules = RoutingEngine().fingerprint()
+    cache = RoutingCache(path=path, flush_every=1, version=old_rules)
+    cache.put("write a blog", {"primary_agent": "blog", "confidence": 0.9})
+
+    assert RoutingCache(path=path, version=old_rules).get("write a blog") is not None
+    assert RoutingCache(path=path, version=new_rules).get("write a blog") is None
+    # Flushes go through a unique temp file, none left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["routing.json"]
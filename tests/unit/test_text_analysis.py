@@ -0,0 +1,92 @@
+import random
+import re
+import pytest
+from src.utils import text_analysis
+from src.utils.content_optimization import ContentOptimizer
+from src.utils.quality_validation import QualityValidator
+from src.utils.text_analysis import TextAnalysis, analyze
+
+EDGE_CASES = [
+    "",
+    "#",
+    "##\n",
+    "## Heading\n###\tSub\n#Hashtag not a heading\n####  Deep",
+    "\n\nLeading breaks\n\n\nthree newlines\n\n\n\nfour\n  \nspaces line\n\n",
+    "# Title 🚀\n\nSee [a](b) and [c](d) [broken](\nx) #one #two_three ?",
+    "word\r\n## crlf heading\r\n\r\nnext",
+]
+
+
+def reference(content):
+    """What the scorers computed with one regex or split per question"""
+    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    return {
+        "word_count": len(content.split()),
+        "h1": len(re.findall(r'^#\s', content, re.MULTILINE)),
+        "h2": len(re.findall(r'^##\s', content, re.MULTILINE)),
+        "h3": len(re.findall(r'^###\s', content, re.MULTILINE)),
+        "paragraphs": paragraphs,
+        "paragraph_words": [len(p.split()) for p in paragraphs],
+        "paragraph_breaks": content.count('\n\n'),
+        "links": len(re.findall(r'\[.*?\]\(.*?\)', content)),
+        "emoji": len(re.findall(r'[\U0001F300-\U0001F9FF]', content)),
+        "hashtags": re.findall(r'#\w+', content),
+    }
+
+
+def summary(analysis: TextAnalysis):
+    return {
+        "word_count": analysis.word_count,
+        "h1": analysis.heading_counts[1],
+        "h2": analysis.heading_counts[2],
+        "h3": analysis.heading_counts[3],
+        "paragraphs": analysis.paragraphs,
+        "paragraph_words": [count for _, count in analysis.paragraph_words],
+        "paragraph_breaks": analysis.paragraph_breaks,
+        "links": analysis.link_count,
+        "emoji": analysis.emoji_count,
+        "hashtags": analysis.hashtags,
+    }
+
+
+def random_markdown(rng):
+    pieces = ["#", "##", "###", " ", "\n", "\n\n", "\t", "word", "Key Phrase", "[x](y)", "#tag", "🚀", "?", "](", "\r"]
+    return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 60)))
+
+
+@pytest.mark.parametrize("content", EDGE_CASES)
+def test_single_pass_matches_the_regex_scorers(content):
+    assert summary(TextAnalysis(content)) == reference(content)
+
+
+def test_single_pass_matches_on_random_markdown():
+    rng = random.Random(7)
+    for _ in range(500):
+        content = random_markdown(rng)
+        assert summary(TextAnalysis(content)) == reference(content), repr(content)
+
+
+def test_word_offsets_point_at_headings_and_paragraphs():
+    analysis = TextAnalysis("# Big Title\n\nFirst paragraph here\n\n## Next part\nbody text")
+
+    assert analysis.headings == [(1, "Big Title", 0), (2, "Next part", 6)]
+    assert analysis.paragraph_words == [(0, 3), (3, 3), (6, 5)]
+    assert analysis.words[6:9] == ["##", "Next", "part"]
+    assert analysis.keyword_counts(["big title", "title"]) == {"big title": 1, "title": 1}
+
+
+def test_scorers_share_one_memoized_scan(monkeypatch):
+    scans = []
+    original = TextAnalysis._scan
+    monkeypatch.setattr(TextAnalysis, "_scan", lambda self, content: scans.append(content) or original(self, content))
+    text_analysis.analyze.cache_clear()
+    blog = "# Title\n\n" + "\n\n".join(f"## Part {i}\n\n" + "content strategy words " * 70 for i in range(4))
+
+    seo = ContentOptimizer.optimize_for_seo(blog, ["content strategy"])
+    quality = QualityValidator.validate_blog_quality(blog)
+    meta = ContentOptimizer.extract_meta_description(blog)
+
+    assert len(scans) == 1
+    assert analyze(blog) is analyze(blog)
+    assert seo["header_count"] == 4 and seo["word_count"] == quality["word_count"] == 4 * 213 + 2
+    assert quality["issues"] == [] and meta == " Title"